@@ -1,24 +1,160 @@
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet
+from django.utils import timezone
 
-from .models import Carro, Cliente, Loja_Unidade, Endereco, Vendedor
+from .models import (
+    Carro, CarroArquivado, CarroFoto, Cliente, HistoricoPreco, Loja_Unidade, Endereco, Tarefa, Venda, Vendedor,
+)
+from .pagination import PaginadorContagemEstimada
+from .sales import registrar_venda
 
-class CarroAdmin(admin.ModelAdmin):
-    list_display = ['marca', 'ano', 'modelo', 'km']
 
-class ClienteAdmin(admin.ModelAdmin):
-    list_display = ['username']
+class TabelaGrandeAdmin(admin.ModelAdmin):
+    """
+    Base para tabelas com milhões de linhas: contagem estimada na paginação
+    e sem a segunda contagem do total sem filtros.
+    """
+    paginator = PaginadorContagemEstimada
+    show_full_result_count = False
+
+
+class CarroFotoFormSet(BaseInlineFormSet):
+    # CarroFoto.clean compara cada envio com as fotos já gravadas; aqui, os
+    # envios do mesmo formulário entre si.
+    def clean(self):
+        super().clean()
+        enviadas = set()
+        for form in self.forms:
+            if not form.has_changed() or self._should_delete_form(form) or not form.instance.sha256:
+                continue
+            if form.instance.sha256 in enviadas:
+                raise ValidationError('A mesma foto foi enviada mais de uma vez.')
+            enviadas.add(form.instance.sha256)
+
+
+class CarroFotoInline(admin.TabularInline):
+    model = CarroFoto
+    formset = CarroFotoFormSet
+    fields = ['original', 'ordem', 'status']
+    readonly_fields = ['status']
+    extra = 0
+
+class HistoricoPrecoInline(admin.TabularInline):
+    # O histórico só recebe inserções, feitas ao salvar o carro.
+    model = HistoricoPreco
+    fields = ['alterado_em', 'preco_anterior', 'preco_novo']
+    readonly_fields = fields
+    ordering = ['-alterado_em']
+    can_delete = False
+    extra = 0
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+# As buscas usam lookups exatos ou de prefixo em colunas indexadas; icontains
+# faria uma varredura completa da tabela.
+
+class CarroAdmin(TabelaGrandeAdmin):
+    list_display = ['marca', 'ano', 'modelo', 'km', 'status']
+    list_filter = ['status']
+    search_fields = ['referencia__exact', 'marca__exact', 'modelo__exact']
+    readonly_fields = ['vendido_em']
+    inlines = [CarroFotoInline, HistoricoPrecoInline]
+
+class CarroArquivadoAdmin(TabelaGrandeAdmin):
+    list_display = ['marca', 'ano', 'modelo', 'preco', 'vendido_em']
+    search_fields = ['referencia__exact', 'marca__exact', 'modelo__exact']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class ClienteAdmin(TabelaGrandeAdmin):
+    list_display = ['username', 'vendedor_fk']
+    list_select_related = ['vendedor_fk']
+    search_fields = ['username__exact', 'telefone__exact']
+    autocomplete_fields = ['vendedor_fk']
 
 class Loja_UnidadeAdmin(admin.ModelAdmin):
     list_display = ['nome']
+    # Exceção à regra acima: há uma linha por unidade, então a varredura é
+    # barata e o autocomplete da loja acha qualquer parte do nome.
+    search_fields = ['nome']
+    raw_id_fields = ['endereco_fk']
 
-class EnderecoAdmin(admin.ModelAdmin):
+class EnderecoAdmin(TabelaGrandeAdmin):
     list_display = ['rua']
 
-class VendedorAdmin(admin.ModelAdmin):
-    list_display = ['username','email']
+class VendedorAdmin(TabelaGrandeAdmin):
+    list_display = ['username', 'email', 'loja_fk']
+    list_select_related = ['loja_fk']
+    # Prefixo do username (índice usuario_username_prefixo no PostgreSQL): esta
+    # busca também alimenta o autocomplete de vendedor em ClienteAdmin.
+    search_fields = ['username__istartswith', 'telefone__exact']
+    # O autocomplete pagina os resultados; username tem índice único.
+    ordering = ['username']
+    autocomplete_fields = ['loja_fk']
+
+class VendaAdmin(TabelaGrandeAdmin):
+    list_display = ['exibir_carro', 'vendedor', 'loja', 'preco_final', 'vendida_em']
+    list_select_related = ['vendedor', 'loja']
+    list_filter = ['loja']
+    raw_id_fields = ['carro', 'cliente', 'vendedor']
+    readonly_fields = ['loja', 'preco_anunciado']
+    date_hierarchy = 'vendida_em'
+
+    def get_readonly_fields(self, request, obj=None):
+        # O carro de uma venda já registrada está vendido e não pode ser trocado.
+        return self.readonly_fields + (['carro'] if obj else [])
+
+    def get_queryset(self, request):
+        # carro não tem restrição no banco (db_constraint=False): um JOIN do
+        # select_related descartaria as vendas de carros arquivados, então os
+        # carros da página vêm em uma consulta à parte.
+        return super().get_queryset(request).prefetch_related('carro')
+
+    @admin.display(description='carro', ordering='carro')
+    def exibir_carro(self, venda):
+        # Sem linha em Carro o carro foi arquivado; o prefetch guarda a
+        # ausência, então não há consulta extra.
+        try:
+            return venda.carro
+        except Carro.DoesNotExist:
+            return f'{venda.carro_id} (arquivado)'
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'carro':
+            # Só carros ainda no estoque podem ser vendidos.
+            kwargs['queryset'] = Carro.objects.all()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        # Novas vendas também marcam o carro como vendido e copiam o preço e a loja.
+        venda = registrar_venda(obj.carro, obj.cliente, obj.vendedor, obj.preco_final, obj.vendida_em)
+        obj.pk, obj.loja_id, obj.preco_anunciado = venda.pk, venda.loja_id, venda.preco_anunciado
+
+class TarefaAdmin(TabelaGrandeAdmin):
+    list_display = ['nome', 'status', 'tentativas', 'disponivel_em', 'concluida_em']
+    list_filter = ['status', 'nome']
+    readonly_fields = ['tentativas', 'reserva', 'resultado', 'erro', 'criada_em', 'concluida_em']
+    actions = ['tentar_de_novo']
+
+    @admin.action(description='Tentar de novo as tarefas selecionadas')
+    def tentar_de_novo(self, request, queryset):
+        queryset.exclude(status=Tarefa.EXECUTANDO).update(
+            status=Tarefa.PENDENTE, tentativas=0, disponivel_em=timezone.now(), concluida_em=None
+        )
 
 admin.site.register(Carro, CarroAdmin)
+admin.site.register(CarroArquivado, CarroArquivadoAdmin)
 admin.site.register(Cliente, ClienteAdmin)
 admin.site.register(Loja_Unidade, Loja_UnidadeAdmin)
 admin.site.register(Endereco, EnderecoAdmin)
-admin.site.register(Vendedor, VendedorAdmin)
\ No newline at end of file
+admin.site.register(Vendedor, VendedorAdmin)
+admin.site.register(Venda, VendaAdmin)
+admin.site.register(Tarefa, TarefaAdmin)
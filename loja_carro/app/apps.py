@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
+        from .fulltext import recriar_apos_migrar
+        post_migrate.connect(recriar_apos_migrar, sender=self)
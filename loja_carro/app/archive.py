@@ -0,0 +1,94 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Carro, CarroArquivado, HistoricoPreco
+
+CAMPOS_ARQUIVADOS = (
+    'id', 'marca', 'ano', 'modelo', 'preco', 'km', 'cor', 'opcionais', 'descricao', 'referencia',
+    'ano_fabricacao', 'ano_modelo', 'vendido_em',
+)
+CAMPOS_VENDA = ('id', 'marca', 'modelo', 'ano', 'preco', 'km', 'cor', 'referencia', 'vendido_em')
+
+
+def _historicos(ids: list) -> dict:
+    historicos = {}
+    linhas = HistoricoPreco.objects.filter(carro_id__in=ids).order_by('carro_id', 'alterado_em', 'id')
+    for carro_id, alterado_em, anterior, novo in linhas.values_list(
+        'carro_id', 'alterado_em', 'preco_anterior', 'preco_novo'
+    ):
+        historicos.setdefault(carro_id, []).append({
+            'alterado_em': alterado_em.isoformat(), 'preco_anterior': str(anterior), 'preco_novo': str(novo),
+        })
+    return historicos
+
+
+def arquivar_lote(limite: datetime.datetime, tamanho_lote: int) -> int:
+    """
+    Move para CarroArquivado, em uma transação curta, até tamanho_lote carros
+    vendidos antes de limite. Retorna quantos foram movidos.
+
+    As linhas bloqueadas por outra transação são puladas (no banco que
+    suporta SKIP LOCKED) e ficam para a próxima execução. O histórico de
+    preços é copiado para o registro arquivado; as fotos são removidas junto
+    com o carro, mas os arquivos continuam no armazenamento.
+    """
+    with transaction.atomic():
+        carros = list(
+            Carro.todos.vendidos().filter(vendido_em__lt=limite)
+            .select_for_update(skip_locked=True).order_by('vendido_em', 'id')[:tamanho_lote]
+        )
+        if not carros:
+            return 0
+        historicos = _historicos([carro.pk for carro in carros])
+        CarroArquivado.objects.bulk_create(
+            [
+                CarroArquivado(
+                    **{campo: getattr(carro, campo) for campo in CAMPOS_ARQUIVADOS},
+                    historico_precos=historicos.get(carro.pk, []),
+                )
+                for carro in carros
+            ],
+            ignore_conflicts=True,
+        )
+        Carro.todos.filter(pk__in=[carro.pk for carro in carros]).delete()
+    return len(carros)
+
+
+def arquivar_vendidos(dias: int = None, tamanho_lote: int = 500, pausa: float = 0, ao_arquivar=None) -> int:
+    """
+    Arquiva, lote a lote, os carros vendidos há mais de dias dias (padrão:
+    ARQUIVAR_VENDIDOS_DIAS). Cada lote é uma transação própria, então nenhum
+    lock dura mais que um lote; pausa (em segundos) entre lotes dá folga às
+    réplicas e às demais escritas. Retorna o total arquivado.
+    """
+    dias = settings.ARQUIVAR_VENDIDOS_DIAS if dias is None else dias
+    limite = timezone.now() - datetime.timedelta(days=dias)
+    total = 0
+    while True:
+        movidos = arquivar_lote(limite, tamanho_lote)
+        total += movidos
+        if movidos and ao_arquivar:
+            ao_arquivar(total)
+        if movidos < tamanho_lote:
+            return total
+        if pausa:
+            time.sleep(pausa)
+
+
+def vendas(desde: datetime.datetime = None, ate: datetime.datetime = None):
+    """
+    Histórico de vendas: os carros vendidos ainda em app_carro e os já
+    arquivados, como dicts com CAMPOS_VENDA, dos mais recentes para os mais antigos.
+    """
+    recentes = Carro.todos.vendidos()
+    arquivados = CarroArquivado.objects.all()
+    if desde is not None:
+        recentes, arquivados = recentes.filter(vendido_em__gte=desde), arquivados.filter(vendido_em__gte=desde)
+    if ate is not None:
+        recentes, arquivados = recentes.filter(vendido_em__lt=ate), arquivados.filter(vendido_em__lt=ate)
+    return recentes.values(*CAMPOS_VENDA).union(arquivados.values(*CAMPOS_VENDA), all=True) \
+        .order_by('-vendido_em', '-id')
@@ -0,0 +1,271 @@
+import asyncio
+import datetime
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+
+from . import callerid, carro_cache, facets
+from .models import Carro, Cliente, Endereco, FacetaCarro, Loja_Unidade, Vendedor, VendedorResumo
+from .search import buscar_carros, filtrar_carros
+from .stats import consultar_estatisticas
+
+
+def _percentil_ms(ordenadas: list, p: float) -> float:
+    indice = min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))
+    return round(ordenadas[indice] * 1000, 2)
+
+
+def resumir(latencias: list, erros: int, segundos: float) -> dict:
+    """
+    Resume uma medição: vazão em requisições por segundo e latências p50/p95/p99.
+    """
+    ordenadas = sorted(latencias)
+    resumo = {
+        'requisicoes': len(ordenadas),
+        'erros': erros,
+        'segundos': round(segundos, 3),
+        'req_por_segundo': round(len(ordenadas) / max(segundos, 1e-9), 1),
+    }
+    if ordenadas:
+        resumo.update({f'p{p}_ms': _percentil_ms(ordenadas, p) for p in (50, 95, 99)})
+    return resumo
+
+
+def _dividir(total: int, partes: int) -> list:
+    return [total // partes + (1 if i < total % partes else 0) for i in range(partes)]
+
+
+def _em_threads(obter, requisicoes: int, concorrencia: int) -> dict:
+    """
+    Faz as requisições com `concorrencia` threads, cada uma chamando obter()
+    em sequência. obter() retorna o status HTTP da resposta.
+    """
+    def trabalhar(quantidade):
+        latencias, erros = [], 0
+        try:
+            for _ in range(quantidade):
+                inicio = time.perf_counter()
+                status = obter()
+                latencias.append(time.perf_counter() - inicio)
+                erros += status >= 400
+        finally:
+            connection.close()
+        return latencias, erros
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        parciais = list(executor.map(trabalhar, _dividir(requisicoes, concorrencia)))
+    segundos = time.perf_counter() - inicio
+    return resumir([l for latencias, _ in parciais for l in latencias], sum(e for _, e in parciais), segundos)
+
+
+def medir_wsgi(caminho: str, requisicoes: int = 200, concorrencia: int = 16) -> dict:
+    """
+    Mede o caminho pelo handler WSGI dentro do processo, com uma thread por
+    requisição simultânea, como um servidor WSGI com workers em threads.
+    """
+    return _em_threads(lambda: Client().get(caminho).status_code, requisicoes, concorrencia)
+
+
+def medir_asgi(caminho: str, requisicoes: int = 200, concorrencia: int = 16) -> dict:
+    """
+    Mede o caminho pelo handler ASGI dentro do processo, com `concorrencia`
+    requisições simultâneas no mesmo laço de eventos, como um worker uvicorn.
+    """
+    async def trabalhar(cliente, quantidade, latencias):
+        erros = 0
+        for _ in range(quantidade):
+            inicio = time.perf_counter()
+            resposta = await cliente.get(caminho)
+            latencias.append(time.perf_counter() - inicio)
+            erros += resposta.status_code >= 400
+        return erros
+
+    async def executar():
+        cliente, latencias = AsyncClient(), []
+        inicio = time.perf_counter()
+        erros = await asyncio.gather(*(
+            trabalhar(cliente, quantidade, latencias) for quantidade in _dividir(requisicoes, concorrencia)
+        ))
+        return resumir(latencias, sum(erros), time.perf_counter() - inicio)
+
+    return asyncio.run(executar())
+
+
+def medir_servidor(url_base: str, caminho: str, requisicoes: int = 200, concorrencia: int = 16) -> dict:
+    """
+    Mede o caminho em um servidor já em execução (gunicorn, uvicorn, runserver).
+    """
+    url = url_base.rstrip('/') + caminho
+
+    def obter():
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resposta:
+                resposta.read()
+                return resposta.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    return _em_threads(obter, requisicoes, concorrencia)
+
+
+def cronometrar(funcao, repeticoes: int = 5) -> dict:
+    """
+    Executa funcao() uma vez para aquecer caches e depois `repeticoes`
+    vezes, medindo o tempo e o número de consultas de cada execução.
+    """
+    funcao()
+    tempos = []
+    with CaptureQueriesContext(connection) as consultas:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+    ordenados = sorted(tempos)
+    return {
+        'repeticoes': repeticoes,
+        'mediana_ms': round(statistics.median(ordenados) * 1000, 3),
+        'p95_ms': _percentil_ms(ordenados, 95),
+        'min_ms': round(ordenados[0] * 1000, 3),
+        'consultas': len(consultas) // repeticoes,
+    }
+
+
+def _parametros() -> dict:
+    """
+    Escolhe os valores usados nas consultas a partir dos próprios dados: a
+    marca e o modelo mais frequentes, uma loja com coordenadas, etc.
+    """
+    faceta = FacetaCarro.objects.filter(dimensao='marca').order_by('-total').values_list('valor', flat=True).first()
+    marca = faceta or Carro.objects.values_list('marca', flat=True).first()
+    modelo = Carro.objects.filter(marca=marca).values_list('modelo', flat=True).first()
+    endereco = Endereco.objects.filter(latitude__isnull=False).values('latitude', 'longitude', 'estado').first()
+    return {
+        'marca': marca,
+        'modelo': modelo,
+        'carro': Carro.objects.order_by('-pk').values_list('pk', flat=True).first(),
+        'coordenadas': (endereco['latitude'], endereco['longitude']) if endereco else (-27.6, -48.5),
+        'estado': endereco['estado'] if endereco else 'SC',
+        'loja': Loja_Unidade.objects.values_list('pk', flat=True).first(),
+        'telefones': [str(t) for t in Cliente.objects.values_list('telefone', flat=True)[:1000]],
+    }
+
+
+def _pagina_profunda(marca):
+    cursor = None
+    for _ in range(10):
+        _, cursor = buscar_carros({'marca': marca}, ordem='preco', cursor=cursor, limite=50)
+        if cursor is None:
+            break
+
+
+def consultas_chave(p: dict) -> dict:
+    """
+    As consultas que sustentam os endpoints e telas mais usados.
+    """
+    def detalhe_sem_cache():
+        carro_cache._lru.clear()
+        carro_cache.invalidar_carro(p['carro'])
+        carro_cache.obter_carro(p['carro'])
+
+    def facetas_sem_cache():
+        facets.invalidar_cache()
+        facets.obter_facetas()
+
+    return {
+        'busca_marca_preco': lambda: buscar_carros({'marca': p['marca']}, ordem='preco'),
+        'busca_marca_modelo_ano': lambda: buscar_carros(
+            {'marca': p['marca'], 'modelo': p['modelo'], 'ano_min': 2018, 'ano_max': 2022}, ordem='-preco'),
+        'busca_paginada_10_paginas': lambda: _pagina_profunda(p['marca']),
+        'busca_textual': lambda: buscar_carros({'q': p['modelo']}),
+        'total_filtrado': lambda: filtrar_carros(Carro.objects.disponiveis(), {'marca': p['marca'], 'km_max': 50000}).count(),
+        'facetas': facetas_sem_cache,
+        'estatisticas_marca': lambda: consultar_estatisticas(p['marca']),
+        'detalhe_carro_sem_cache': detalhe_sem_cache,
+        'busca_vendedores': lambda: list(VendedorResumo.objects.buscar(estado=p['estado'])[:100]),
+        'painel_loja': lambda: [
+            list(v.clientes_recentes) for v in Vendedor.objects.com_painel().filter(loja_fk=p['loja'])
+        ],
+        'lojas_proximas': lambda: Loja_Unidade.objects.nearest(*p['coordenadas'], 5),
+        'identificar_1000_telefones': lambda: callerid.identificar_lote(p['telefones']),
+    }
+
+
+CHANGELISTS = {
+    'admin_carros': '/admin/app/carro/',
+    'admin_carros_pagina_50': '/admin/app/carro/?p=50',
+    'admin_carros_busca': '/admin/app/carro/?q=Corolla',
+    'admin_clientes': '/admin/app/cliente/',
+    'admin_vendedores': '/admin/app/vendedor/',
+    'admin_lojas': '/admin/app/loja_unidade/',
+}
+
+
+def _obter_pagina(cliente, caminho):
+    resposta = cliente.get(caminho)
+    if resposta.status_code != 200:
+        raise RuntimeError(f'{caminho} respondeu {resposta.status_code}.')
+
+
+def executar_suite(repeticoes: int = 5, incluir_admin: bool = True) -> dict:
+    """
+    Mede as consultas chave e as listagens do admin sobre os dados atuais.
+
+    Roda dentro de uma transação desfeita ao final, então o superusuário
+    temporário e as sessões do admin não ficam no banco.
+    """
+    resultados = {}
+    with transaction.atomic():
+        parametros = _parametros()
+        for nome, funcao in consultas_chave(parametros).items():
+            resultados[nome] = cronometrar(funcao, repeticoes)
+        if incluir_admin:
+            cliente = Client()
+            cliente.force_login(User.objects.create_superuser('benchmark-suite', password=None))
+            for nome, caminho in CHANGELISTS.items():
+                resultados[nome] = cronometrar(lambda caminho=caminho: _obter_pagina(cliente, caminho), repeticoes)
+        transaction.set_rollback(True)
+    return {
+        'gerado_em': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit_atual(),
+        'banco': connection.vendor,
+        'linhas': {
+            'carros': Carro.objects.count(),
+            'clientes': Cliente.objects.count(),
+            'vendedores': Vendedor.objects.count(),
+            'lojas': Loja_Unidade.objects.count(),
+        },
+        'resultados': resultados,
+    }
+
+
+def _commit_atual():
+    try:
+        saida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def comparar(anterior: dict, atual: dict, tolerancia: float = 0.2) -> list:
+    """
+    Lista as medições que ficaram mais lentas que `anterior` em mais de
+    `tolerancia` (fração da mediana) ou que passaram a fazer mais consultas,
+    como (nome, mediana anterior, mediana atual, consultas antes, consultas agora).
+    """
+    regressoes = []
+    for nome, medida in atual['resultados'].items():
+        antes = anterior.get('resultados', {}).get(nome)
+        if antes is None:
+            continue
+        if medida['mediana_ms'] > antes['mediana_ms'] * (1 + tolerancia) or medida['consultas'] > antes['consultas']:
+            regressoes.append((nome, antes['mediana_ms'], medida['mediana_ms'], antes['consultas'], medida['consultas']))
+    return regressoes
@@ -0,0 +1,37 @@
+from django.db import router, transaction
+
+
+def inserir_herdados(model, objetos: list, batch_size: int = 1000) -> list:
+    """
+    bulk_create para modelos com herança multi-tabela, como Vendedor e
+    Cliente, que o Django não aceita em bulk_create.
+
+    Insere primeiro as linhas da tabela pai em lote e depois as da tabela
+    filha, também em lote. Depende de o banco devolver as chaves geradas no
+    bulk_create (PostgreSQL e SQLite 3.35+). Como no bulk_create, save() não
+    é chamado e nenhum sinal é enviado.
+
+    Parâmetros:
+        model (Model): O modelo filho, com um único pai concreto.
+        objetos (list): Instâncias não salvas do modelo filho.
+        batch_size (int): Linhas por instrução INSERT.
+    """
+    (pai, ponteiro), = model._meta.concrete_model._meta.parents.items()
+    campos_pai = [campo for campo in pai._meta.concrete_fields if not campo.primary_key]
+    campos_filho = model._meta.local_concrete_fields
+    banco = router.db_for_write(model)
+    with transaction.atomic(using=banco, savepoint=False):
+        for inicio in range(0, len(objetos), batch_size):
+            lote = objetos[inicio:inicio + batch_size]
+            pais = pai._base_manager.using(banco).bulk_create([
+                pai(**{campo.attname: getattr(objeto, campo.attname) for campo in campos_pai})
+                for objeto in lote
+            ])
+            for objeto, registro_pai in zip(lote, pais):
+                setattr(objeto, ponteiro.attname, registro_pai.pk)
+                setattr(objeto, pai._meta.pk.attname, registro_pai.pk)
+            model._base_manager.using(banco)._insert(lote, fields=campos_filho, using=banco)
+            for objeto in lote:
+                objeto._state.adding = False
+                objeto._state.db = banco
+    return objetos
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import transaction
+from phonenumber_field.phonenumber import to_python
+
+from .models import Cliente, DiretorioTelefone, Loja_Unidade, Vendedor
+
+# Região usada para números sem código de país, se PHONENUMBER_DEFAULT_REGION não estiver definido.
+REGIAO_PADRAO = 'BR'
+TAMANHO_LOTE = 500
+
+CAMPOS_RESULTADO = ('numero', 'tipo', 'objeto_id', 'nome')
+
+
+def normalizar_telefone(texto: str, regiao: str = None):
+    """
+    Converte um telefone em qualquer formato ("(48) 99999-1234",
+    "+55 48 99999 1234", "004848999991234") para E.164. Retorna None se o
+    número não for válido.
+    """
+    regiao = regiao or getattr(settings, 'PHONENUMBER_DEFAULT_REGION', None) or REGIAO_PADRAO
+    numero = to_python((texto or '').strip(), region=regiao)
+    if numero is None or not numero.is_valid():
+        return None
+    return numero.as_e164
+
+
+def _nome(objeto) -> str:
+    if isinstance(objeto, Loja_Unidade):
+        return objeto.nome
+    return objeto.get_full_name() or objeto.username
+
+
+def _tipo(objeto) -> str:
+    if isinstance(objeto, Cliente):
+        return DiretorioTelefone.CLIENTE
+    if isinstance(objeto, Vendedor):
+        return DiretorioTelefone.VENDEDOR
+    return DiretorioTelefone.LOJA
+
+
+def sincronizar(objeto):
+    """
+    Cria ou atualiza a entrada do diretório de um Cliente, Vendedor ou Loja_Unidade.
+    """
+    DiretorioTelefone.objects.update_or_create(
+        tipo=_tipo(objeto), objeto_id=objeto.pk,
+        defaults={'numero': str(objeto.telefone), 'nome': _nome(objeto)},
+    )
+
+
+def sincronizar_lote(objetos, tamanho_lote: int = 1000):
+    """
+    Versão em lote de sincronizar, para objetos gravados sem sinais (bulk_create).
+    """
+    DiretorioTelefone.objects.bulk_create(
+        [
+            DiretorioTelefone(numero=str(objeto.telefone), tipo=_tipo(objeto), objeto_id=objeto.pk, nome=_nome(objeto))
+            for objeto in objetos
+        ],
+        batch_size=tamanho_lote,
+        update_conflicts=True,
+        unique_fields=['tipo', 'objeto_id'],
+        update_fields=['numero', 'nome'],
+    )
+
+
+def remover(objeto):
+    DiretorioTelefone.objects.filter(tipo=_tipo(objeto), objeto_id=objeto.pk).delete()
+
+
+def identificar(texto: str) -> list:
+    """
+    Retorna os donos de um telefone como dicts com numero, tipo, objeto_id e
+    nome, em uma consulta. A lista tem mais de um item quando o mesmo número
+    pertence, por exemplo, a um cliente e a uma loja.
+    """
+    numero = normalizar_telefone(texto)
+    if numero is None:
+        return []
+    return list(DiretorioTelefone.objects.filter(numero=numero).order_by('tipo', 'objeto_id').values(*CAMPOS_RESULTADO))
+
+
+def identificar_lote(textos, tamanho_lote: int = TAMANHO_LOTE) -> dict:
+    """
+    Identifica muitos telefones de uma vez, por exemplo de um registro de
+    chamadas. Cada número distinto é normalizado uma vez e a consulta é feita
+    em lotes com numero IN (...).
+
+    Retorna um dict que associa cada texto recebido a {'e164': número
+    normalizado ou None, 'donos': lista de donos, vazia para números
+    inválidos ou desconhecidos}.
+    """
+    normalizados = {texto: normalizar_telefone(texto) for texto in set(textos)}
+    numeros = sorted({numero for numero in normalizados.values() if numero})
+    donos = {}
+    for inicio in range(0, len(numeros), tamanho_lote):
+        entradas = DiretorioTelefone.objects.filter(numero__in=numeros[inicio:inicio + tamanho_lote])
+        for entrada in entradas.order_by('tipo', 'objeto_id').values(*CAMPOS_RESULTADO):
+            donos.setdefault(entrada['numero'], []).append(entrada)
+    return {texto: {'e164': numero, 'donos': donos.get(numero, [])} for texto, numero in normalizados.items()}
+
+
+def reconstruir_diretorio(chunk_size: int = 2000) -> int:
+    """
+    Recria o diretório a partir dos três modelos de origem. Retorna o número de entradas.
+    """
+    entradas = []
+    origens = [
+        (DiretorioTelefone.CLIENTE, Cliente.objects.only('pk', 'telefone', 'first_name', 'last_name', 'username')),
+        (DiretorioTelefone.VENDEDOR, Vendedor.objects.only('pk', 'telefone', 'first_name', 'last_name', 'username')),
+        (DiretorioTelefone.LOJA, Loja_Unidade.objects.only('pk', 'telefone', 'nome')),
+    ]
+    for tipo, queryset in origens:
+        for objeto in queryset.order_by('pk').iterator(chunk_size=chunk_size):
+            entradas.append(DiretorioTelefone(
+                numero=str(objeto.telefone), tipo=tipo, objeto_id=objeto.pk, nome=_nome(objeto)
+            ))
+    with transaction.atomic():
+        DiretorioTelefone.objects.all().delete()
+        DiretorioTelefone.objects.bulk_create(entradas, batch_size=1000)
+    return len(entradas)
@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Carro
+from .serializers import serializar_carro
+
+TAMANHO_LRU = 2048
+TEMPO_CACHE = 60 * 60
+
+
+class LRU:
+    """
+    Dicionário limitado que descarta o item usado há mais tempo, seguro para
+    threads.
+
+    Atributos:
+        tamanho_maximo (int): Quantos itens guardar antes de descartar.
+    """
+
+    def __init__(self, tamanho_maximo: int = TAMANHO_LRU):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._trava:
+            if chave not in self._itens:
+                return padrao
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def set(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def clear(self):
+        with self._trava:
+            self._itens.clear()
+
+    def __len__(self):
+        return len(self._itens)
+
+
+_lru = LRU()
+
+
+def _chave_versao(pk) -> str:
+    return f'carro:{pk}:versao'
+
+
+def _chave_dados(pk, versao) -> str:
+    return f'carro:{pk}:{versao}'
+
+
+def _nova_versao(pk) -> tuple:
+    """
+    Cria a versão do carro no cache compartilhado, se ela não existir (ou
+    tiver sido descartada), e retorna (versão, se foi criada agora). Versões
+    novas usam o relógio em nanossegundos, então nunca coincidem com uma
+    versão antiga ainda em algum LRU.
+    """
+    chave = _chave_versao(pk)
+    criada = cache.add(chave, time.time_ns(), timeout=None)
+    return cache.get(chave), criada
+
+
+def obter_carro(pk):
+    """
+    Retorna o carro serializado, ou None se ele não existir.
+
+    Consulta primeiro o LRU do processo, depois o cache configurado em CACHES
+    e só então o banco. Os dois níveis são indexados pela versão do carro, que
+    é trocada a cada gravação. Com um cache compartilhado em CACHES (CACHE_URL),
+    nenhum processo serve dados antigos; com o LocMemCache padrão, cada
+    processo só vê as invalidações feitas por ele mesmo.
+
+    A versão é lida (ou criada) antes da consulta ao banco: uma gravação
+    confirmada depois da consulta troca a versão, e os dados lidos ficam
+    guardados sob uma versão que ninguém mais procura. Carros inexistentes
+    não mantêm a versão criada, para que ids inválidos não encham o cache.
+    A consulta vai sempre ao primário: logo depois de uma invalidação uma
+    réplica ainda pode ter os dados antigos, que ficariam sob a versão nova.
+    """
+    versao, criada = cache.get(_chave_versao(pk)), False
+    if versao is not None:
+        dados = _lru.get((pk, versao))
+        if dados is None:
+            dados = cache.get(_chave_dados(pk, versao))
+        if dados is not None:
+            _lru.set((pk, versao), dados)
+            return dados
+    else:
+        versao, criada = _nova_versao(pk)
+    carro = Carro.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).first()
+    if carro is None:
+        if criada:
+            cache.delete(_chave_versao(pk))
+        return None
+    dados = serializar_carro(carro)
+    cache.set(_chave_dados(pk, versao), dados, TEMPO_CACHE)
+    _lru.set((pk, versao), dados)
+    return dados
+
+
+async def _anova_versao(pk) -> tuple:
+    chave = _chave_versao(pk)
+    criada = await cache.aadd(chave, time.time_ns(), timeout=None)
+    return await cache.aget(chave), criada
+
+
+async def aobter_carro(pk):
+    """
+    Versão assíncrona de obter_carro, para as views servidas por ASGI.
+    """
+    versao, criada = await cache.aget(_chave_versao(pk)), False
+    if versao is not None:
+        dados = _lru.get((pk, versao))
+        if dados is None:
+            dados = await cache.aget(_chave_dados(pk, versao))
+        if dados is not None:
+            _lru.set((pk, versao), dados)
+            return dados
+    else:
+        versao, criada = await _anova_versao(pk)
+    carro = await Carro.objects.using(DEFAULT_DB_ALIAS).filter(pk=pk).afirst()
+    if carro is None:
+        if criada:
+            await cache.adelete(_chave_versao(pk))
+        return None
+    dados = serializar_carro(carro)
+    await cache.aset(_chave_dados(pk, versao), dados, TEMPO_CACHE)
+    _lru.set((pk, versao), dados)
+    return dados
+
+
+def invalidar_carro(pk):
+    """
+    Troca a versão do carro, tornando obsoletas as entradas de todos os processos.
+    """
+    cache.set(_chave_versao(pk), time.time_ns(), timeout=None)
+
+
+def invalidar_carros(pks):
+    """
+    Versão em lote de invalidar_carro, para gravações que não disparam os
+    sinais de Carro (upserts e QuerySet.update).
+    """
+    versao = time.time_ns()
+    cache.set_many({_chave_versao(pk): versao for pk in pks}, timeout=None)
+
+
+def agendar_invalidacao(pk):
+    """
+    Invalida o carro quando a transação atual for confirmada, para que ninguém
+    recoloque em cache os dados anteriores à gravação.
+    """
+    transaction.on_commit(lambda: invalidar_carro(pk))
+
+
+def agendar_invalidacao_lote(pks):
+    """
+    Versão em lote de agendar_invalidacao.
+    """
+    pks = list(pks)
+    if pks:
+        transaction.on_commit(lambda: invalidar_carros(pks))
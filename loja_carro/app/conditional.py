@@ -0,0 +1,105 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Sum
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Carro, ExclusaoCatalogo, FacetaCarro, Loja_Unidade
+
+
+def registrar_exclusao(catalogo: str):
+    """
+    Grava a data de uma exclusão no catálogo ('carros' ou 'lojas'), para
+    que o Last-Modified das listagens avance.
+    """
+    agora = timezone.now()
+    if ExclusaoCatalogo.objects.filter(catalogo=catalogo).update(excluido_em=agora):
+        return
+    try:
+        with transaction.atomic():
+            ExclusaoCatalogo.objects.create(catalogo=catalogo, excluido_em=agora)
+    except IntegrityError:
+        ExclusaoCatalogo.objects.filter(catalogo=catalogo).update(excluido_em=agora)
+
+
+def _mais_recente(*datas):
+    return max((data for data in datas if data is not None), default=None)
+
+
+def _ultima_exclusao(catalogo: str):
+    return ExclusaoCatalogo.objects.filter(catalogo=catalogo).values_list('excluido_em', flat=True).first()
+
+
+def validador_carros() -> tuple:
+    """
+    (última alteração, quantidade à venda) do estoque, em três consultas
+    de custo constante: o máximo de carro_atualizado_em_idx, a última
+    exclusão e a soma das facetas de marca, que é a contagem de carros à
+    venda mantida pelos sinais (ver app.facets). Contar as linhas de
+    app_carro, mesmo pelo índice parcial, percorreria o estoque inteiro a cada consulta.
+
+    A data cobre também reservados e vendidos, então um carro que sai do
+    estoque muda o validador.
+    """
+    ultima = Carro.todos.aggregate(ultima=Max('atualizado_em'))['ultima']
+    total = FacetaCarro.objects.filter(dimensao='marca').aggregate(total=Sum('total'))['total'] or 0
+    return _mais_recente(ultima, _ultima_exclusao('carros')), total
+
+
+def validador_lojas() -> tuple:
+    """
+    (última alteração ou exclusão das lojas e de seus endereços, quantidade
+    de lojas). A tabela de lojas é pequena, então a contagem é direta.
+    """
+    dados = Loja_Unidade.objects.aggregate(
+        loja=Max('atualizado_em'), endereco=Max('endereco_fk__atualizado_em'), total=Count('id')
+    )
+    return _mais_recente(dados['loja'], dados['endereco'], _ultima_exclusao('lojas')), dados['total']
+
+
+def _etag(request, *args, **kwargs):
+    ultima, total = request.validador
+    conteudo = f'{ultima.isoformat() if ultima else ""}:{total}'
+    return hashlib.md5(conteudo.encode(), usedforsecurity=False).hexdigest()
+
+
+def _ultima_alteracao(request, *args, **kwargs):
+    return request.validador[0]
+
+
+def condicional(validador):
+    """
+    Decorador de GET condicional para listagens: calcula o validador
+    (uma função que retorna (última alteração, contagem)) antes da view e,
+    se If-None-Match ou If-Modified-Since do cliente ainda valem, responde
+    304 sem executá-la. As respostas levam ETag, Last-Modified e
+    Cache-Control: no-cache, para que os clientes sempre revalidem.
+
+    Funciona com views síncronas e assíncronas; nas assíncronas o validador
+    roda em uma thread, como o restante do ORM síncrono.
+    """
+    def decorator(view):
+        protegida = condition(etag_func=_etag, last_modified_func=_ultima_alteracao)(view)
+
+        def revalidar(resposta):
+            if not resposta.has_header('Cache-Control'):
+                patch_cache_control(resposta, no_cache=True)
+            return resposta
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def inner(request, *args, **kwargs):
+                request.validador = await sync_to_async(validador)()
+                return revalidar(await protegida(request, *args, **kwargs))
+        else:
+            @wraps(view)
+            def inner(request, *args, **kwargs):
+                request.validador = validador()
+                return revalidar(protegida(request, *args, **kwargs))
+        return inner
+
+    return decorator
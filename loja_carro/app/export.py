@@ -0,0 +1,201 @@
+import csv
+import json
+import zlib
+from operator import attrgetter
+
+from .models import Carro, Cliente
+
+TAMANHO_CHUNK = 2000
+FORMATOS = ('csv', 'jsonl')
+
+# Cada exportação define o queryset (com os joins já feitos por select_related)
+# e as colunas como pares (nome, caminho de atributo). A exportação de carros
+# inclui os vendidos, com status e data da venda.
+EXPORTACOES = {
+    'carros': {
+        'queryset': lambda: Carro.todos.order_by('id'),
+        'colunas': [
+            ('id', 'id'), ('referencia', 'referencia'), ('marca', 'marca'), ('modelo', 'modelo'),
+            ('ano', 'ano'), ('preco', 'preco'), ('km', 'km'), ('cor', 'cor'),
+            ('opcionais', 'opcionais'), ('descricao', 'descricao'), ('status', 'status'),
+            ('vendido_em', 'vendido_em'),
+        ],
+    },
+    'clientes': {
+        'queryset': lambda: Cliente.objects.select_related('vendedor_fk__loja_fk').order_by('id'),
+        'colunas': [
+            ('id', 'id'), ('username', 'username'), ('nome', 'first_name'), ('sobrenome', 'last_name'),
+            ('email', 'email'), ('data_nascimento', 'data_nascimento'), ('telefone', 'telefone'),
+            ('avaliacao', 'avaliacao'), ('vendedor', 'vendedor_fk.username'),
+            ('vendedor_email', 'vendedor_fk.email'), ('loja', 'vendedor_fk.loja_fk.nome'),
+            ('loja_telefone', 'vendedor_fk.loja_fk.telefone'),
+        ],
+    },
+}
+
+
+class _Eco:
+    """
+    Objeto com interface de arquivo que apenas devolve o que recebe, para que
+    csv.writer produza strings sem acumular um buffer.
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def _valor(valor):
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float, str, bool)):
+        return valor
+    return str(valor)
+
+
+def _colunas(nome: str):
+    exportacao = EXPORTACOES[nome]
+    cabecalho = [coluna for coluna, _ in exportacao['colunas']]
+    leitores = [attrgetter(caminho) for _, caminho in exportacao['colunas']]
+    return cabecalho, lambda registro: tuple(_valor(leitor(registro)) for leitor in leitores)
+
+
+def linhas(nome: str, chunk_size: int = TAMANHO_CHUNK):
+    """
+    Gera (cabeçalho, gerador de tuplas) para a exportação informada, lendo o
+    banco em blocos com QuerySet.iterator.
+    """
+    cabecalho, tupla = _colunas(nome)
+    registros = EXPORTACOES[nome]['queryset']().iterator(chunk_size=chunk_size)
+    return cabecalho, (tupla(registro) for registro in registros)
+
+
+def alinhas(nome: str, chunk_size: int = TAMANHO_CHUNK):
+    """
+    Versão assíncrona de linhas. Lê blocos de chunk_size registros por
+    paginação de chave (id > último id lido), cada bloco uma consulta curta
+    pelo ORM assíncrono, em vez de manter um cursor aberto entre os awaits.
+    """
+    cabecalho, tupla = _colunas(nome)
+
+    async def tuplas():
+        queryset = EXPORTACOES[nome]['queryset']()
+        ultimo = None
+        while True:
+            bloco = queryset if ultimo is None else queryset.filter(id__gt=ultimo)
+            registros = [registro async for registro in bloco[:chunk_size]]
+            for registro in registros:
+                yield tupla(registro)
+            if len(registros) < chunk_size:
+                break
+            ultimo = registros[-1].id
+
+    return cabecalho, tuplas()
+
+
+def _formatador(cabecalho: list, formato: str):
+    """
+    Retorna (partes iniciais, função que converte uma tupla em texto) para o
+    formato pedido ('csv' ou 'jsonl').
+    """
+    if formato == 'csv':
+        escritor = csv.writer(_Eco())
+        return [escritor.writerow(cabecalho)], escritor.writerow
+    return [], lambda tupla: json.dumps(dict(zip(cabecalho, tupla)), ensure_ascii=False) + '\n'
+
+
+def gerar_csv(nome: str, chunk_size: int = TAMANHO_CHUNK):
+    """
+    Gera a exportação como linhas CSV, uma string por registro.
+    """
+    cabecalho, tuplas = linhas(nome, chunk_size)
+    iniciais, formatar = _formatador(cabecalho, 'csv')
+    yield from iniciais
+    for tupla in tuplas:
+        yield formatar(tupla)
+
+
+def gerar_jsonl(nome: str, chunk_size: int = TAMANHO_CHUNK):
+    """
+    Gera a exportação como JSON Lines, um objeto por registro.
+    """
+    cabecalho, tuplas = linhas(nome, chunk_size)
+    _, formatar = _formatador(cabecalho, 'jsonl')
+    for tupla in tuplas:
+        yield formatar(tupla)
+
+
+def gerar(nome: str, formato: str = 'csv', chunk_size: int = TAMANHO_CHUNK):
+    """
+    Gera a exportação no formato pedido ('csv' ou 'jsonl').
+    """
+    gerador = gerar_csv if formato == 'csv' else gerar_jsonl
+    return gerador(nome, chunk_size)
+
+
+async def agerar(nome: str, formato: str = 'csv', chunk_size: int = TAMANHO_CHUNK):
+    """
+    Versão assíncrona de gerar, para o caminho ASGI: o StreamingHttpResponse
+    só transmite aos poucos sob ASGI quando recebe um iterador assíncrono
+    (um iterador síncrono seria lido inteiro para a memória antes do envio).
+    """
+    cabecalho, tuplas = alinhas(nome, chunk_size)
+    iniciais, formatar = _formatador(cabecalho, formato)
+    for parte in iniciais:
+        yield parte
+    async for tupla in tuplas:
+        yield formatar(tupla)
+
+
+class _Compressor:
+    """
+    Compressor gzip que acumula a saída até tamanho_minimo bytes.
+    """
+
+    def __init__(self, tamanho_minimo: int):
+        self.tamanho_minimo = tamanho_minimo
+        self.compressor = zlib.compressobj(wbits=31)
+        self.pendente = bytearray()
+
+    def comprimir(self, parte: str) -> bytes:
+        """
+        Comprime a parte e retorna o bloco acumulado quando ele atinge o
+        tamanho mínimo, ou b'' enquanto não atinge.
+        """
+        self.pendente += self.compressor.compress(parte.encode('utf-8'))
+        if len(self.pendente) < self.tamanho_minimo:
+            return b''
+        bloco = bytes(self.pendente)
+        self.pendente.clear()
+        return bloco
+
+    def finalizar(self) -> bytes:
+        self.pendente += self.compressor.flush()
+        return bytes(self.pendente)
+
+
+def comprimir_gzip(partes, tamanho_minimo: int = 64 * 1024):
+    """
+    Comprime em gzip um gerador de strings à medida que é consumido.
+
+    Os blocos comprimidos são acumulados até tamanho_minimo para não emitir
+    pedaços minúsculos na resposta.
+    """
+    compressor = _Compressor(tamanho_minimo)
+    for parte in partes:
+        bloco = compressor.comprimir(parte)
+        if bloco:
+            yield bloco
+    yield compressor.finalizar()
+
+
+async def acomprimir_gzip(partes, tamanho_minimo: int = 64 * 1024):
+    """
+    Versão assíncrona de comprimir_gzip, para um iterador assíncrono de strings.
+    """
+    compressor = _Compressor(tamanho_minimo)
+    async for parte in partes:
+        bloco = compressor.comprimir(parte)
+        if bloco:
+            yield bloco
+    yield compressor.finalizar()
+
@@ -0,0 +1,136 @@
+import threading
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+
+from .models import Carro, FacetaCarro, separar_ano
+
+DIMENSOES = ('marca', 'cor', 'ano', 'faixa_preco')
+
+# Limites inferiores das faixas de preço, em reais.
+FAIXAS_PRECO = (0, 30000, 50000, 75000, 100000, 150000, 200000, 300000)
+
+CHAVE_VERSAO = 'facetas:versao'
+
+_cache_local = {}
+_trava = threading.Lock()
+
+
+def faixa_preco(preco) -> str:
+    """
+    Retorna o rótulo da faixa de preço, por exemplo "50000-75000" ou "300000+".
+    """
+    for inferior, superior in zip(FAIXAS_PRECO, FAIXAS_PRECO[1:]):
+        if preco < superior:
+            return f'{inferior}-{superior}'
+    return f'{FAIXAS_PRECO[-1]}+'
+
+
+def valores_faceta(carro) -> dict:
+    """
+    Calcula o valor de cada dimensão de faceta para um carro (ou dict de campos).
+    """
+    get = carro.get if isinstance(carro, dict) else lambda campo: getattr(carro, campo)
+    # Para "2019/2020" a faceta usa o ano de fabricação.
+    ano_fabricacao = separar_ano(get('ano'))[0]
+    return {
+        'marca': get('marca'),
+        'cor': get('cor'),
+        'ano': str(ano_fabricacao) if ano_fabricacao is not None else None,
+        'faixa_preco': faixa_preco(get('preco')),
+    }
+
+
+def _incrementar(dimensao: str, valor: str, delta: int):
+    atualizados = FacetaCarro.objects.filter(dimensao=dimensao, valor=valor).update(total=F('total') + delta)
+    if atualizados or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            FacetaCarro.objects.create(dimensao=dimensao, valor=valor, total=delta)
+    except IntegrityError:
+        # Outro processo criou a linha ao mesmo tempo; basta incrementá-la.
+        FacetaCarro.objects.filter(dimensao=dimensao, valor=valor).update(total=F('total') + delta)
+
+
+def aplicar_alteracao(antes: dict = None, depois: dict = None):
+    """
+    Atualiza as contagens a partir dos valores de faceta antes e depois de uma
+    alteração em Carro. Use antes=None para inclusões e depois=None para exclusões.
+    Dimensões cujo valor não mudou não geram escrita.
+    """
+    for dimensao in DIMENSOES:
+        valor_antes = antes[dimensao] if antes else None
+        valor_depois = depois[dimensao] if depois else None
+        if valor_antes == valor_depois:
+            continue
+        if valor_antes is not None:
+            _incrementar(dimensao, valor_antes, -1)
+        if valor_depois is not None:
+            _incrementar(dimensao, valor_depois, 1)
+    # Só invalida depois do commit, para que nenhum processo recoloque em
+    # cache as contagens antigas enquanto a transação ainda está aberta.
+    transaction.on_commit(invalidar_cache)
+
+
+def reconstruir_facetas(chunk_size: int = 2000):
+    """
+    Recalcula todas as contagens a partir dos carros à venda, substituindo a
+    tabela de resumo.
+
+    Usado pelo comando rebuild_facets para corrigir desvios causados por
+    operações que não disparam sinais (bulk_create, QuerySet.update). Lê do
+    primário, já que uma réplica atrasada gravaria contagens antigas.
+    """
+    contagens = defaultdict(Counter)
+    linhas = Carro.objects.using(DEFAULT_DB_ALIAS).disponiveis().values_list('marca', 'cor', 'ano_fabricacao', 'preco')
+    for marca, cor, ano, preco in linhas.iterator(chunk_size=chunk_size):
+        contagens['marca'][marca] += 1
+        contagens['cor'][cor] += 1
+        if ano is not None:
+            contagens['ano'][str(ano)] += 1
+        contagens['faixa_preco'][faixa_preco(preco)] += 1
+    with transaction.atomic():
+        FacetaCarro.objects.all().delete()
+        FacetaCarro.objects.bulk_create(
+            FacetaCarro(dimensao=dimensao, valor=valor, total=total)
+            for dimensao, contador in contagens.items()
+            for valor, total in contador.items()
+        )
+    invalidar_cache()
+
+
+def invalidar_cache():
+    """
+    Descarta as facetas em cache em todos os processos.
+
+    A versão fica no cache configurado em CACHES; cada processo compara a
+    versão com a do seu cache local antes de reutilizá-lo.
+    """
+    try:
+        cache.incr(CHAVE_VERSAO)
+    except ValueError:
+        cache.set(CHAVE_VERSAO, 1, timeout=None)
+    _cache_local.clear()
+
+
+def obter_facetas() -> dict:
+    """
+    Retorna as contagens de todas as facetas, servidas do cache em processo
+    enquanto a versão global não mudar.
+
+    Formato: {'marca': {'Toyota': 10, ...}, 'cor': {...}, 'ano': {...}, 'faixa_preco': {...}}
+    """
+    versao = cache.get(CHAVE_VERSAO, 0)
+    with _trava:
+        if _cache_local.get('versao') == versao:
+            return _cache_local['facetas']
+    facetas = {dimensao: {} for dimensao in DIMENSOES}
+    linhas = FacetaCarro.objects.filter(total__gt=0).order_by('dimensao', '-total', 'valor')
+    for dimensao, valor, total in linhas.values_list('dimensao', 'valor', 'total'):
+        facetas.setdefault(dimensao, {})[valor] = total
+    with _trava:
+        _cache_local.update(versao=versao, facetas=facetas)
+    return facetas
@@ -0,0 +1,42 @@
+from django import forms
+
+from .search import LIMITE_MAXIMO, LIMITE_PADRAO, ORDENACOES
+
+
+class BuscaCarroForm(forms.Form):
+    """
+    Formulário que valida os parâmetros da busca do inventário.
+
+    Atributos:
+        q (CharField): Texto livre buscado em opcionais e descricao.
+        marca, modelo, cor (CharField): Filtros por igualdade.
+        ano_min, ano_max (IntegerField): Intervalo de ano.
+        preco_min, preco_max (DecimalField): Intervalo de preço.
+        km_max (IntegerField): Quilometragem máxima.
+        ordem (ChoiceField): Uma das ordenações de search.ORDENACOES.
+        cursor (CharField): Cursor opaco da página anterior.
+        limite (IntegerField): Quantidade de carros por página.
+    """
+    q = forms.CharField(max_length=200, required=False)
+    marca = forms.CharField(max_length=100, required=False)
+    modelo = forms.CharField(max_length=100, required=False)
+    cor = forms.CharField(max_length=100, required=False)
+    ano_min = forms.IntegerField(min_value=1900, max_value=2100, required=False)
+    ano_max = forms.IntegerField(min_value=1900, max_value=2100, required=False)
+    preco_min = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    preco_max = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    km_max = forms.IntegerField(min_value=0, required=False)
+    ordem = forms.ChoiceField(choices=[(o, o) for o in ORDENACOES], required=False)
+    cursor = forms.CharField(required=False)
+    limite = forms.IntegerField(min_value=1, max_value=LIMITE_MAXIMO, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        q = cleaned_data.get('q')
+        ordem = cleaned_data.get('ordem')
+        if ordem == 'relevancia' and not q:
+            self.add_error('ordem', 'A ordenação por relevância exige o parâmetro q.')
+        # Com busca textual, o padrão é mostrar os mais relevantes primeiro.
+        cleaned_data['ordem'] = ordem or ('relevancia' if q else 'recentes')
+        cleaned_data['limite'] = cleaned_data.get('limite') or LIMITE_PADRAO
+        return cleaned_data
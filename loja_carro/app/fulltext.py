@@ -0,0 +1,181 @@
+import re
+
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, router
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+# Os nomes abaixo são usados tanto pelas migrações quanto pelas consultas.
+TABELA_CARRO = 'app_carro'
+TABELA_FTS = 'app_carro_fts'
+COLUNA_VETOR = 'busca_vetor'
+# Cópia da configuração 'portuguese' que remove acentos antes do stemmer,
+# para que "automatico" encontre "automático" como no SQLite.
+CONFIGURACAO_PG = 'portuguese_unaccent'
+
+_SQL_POSTGRES = [
+    # Exige permissão para criar extensões (ou a extensão já instalada pelo DBA).
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    f"""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{CONFIGURACAO_PG}') THEN
+            CREATE TEXT SEARCH CONFIGURATION {CONFIGURACAO_PG} (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION {CONFIGURACAO_PG}
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    f"""
+    ALTER TABLE {TABELA_CARRO} ADD COLUMN IF NOT EXISTS {COLUNA_VETOR} tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{CONFIGURACAO_PG}', coalesce(opcionais, '')), 'A') ||
+        setweight(to_tsvector('{CONFIGURACAO_PG}', coalesce(descricao, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS carro_busca_vetor_gin ON {TABELA_CARRO} USING GIN ({COLUNA_VETOR})",
+]
+
+_SQL_POSTGRES_REMOVER = [
+    "DROP INDEX IF EXISTS carro_busca_vetor_gin",
+    f"ALTER TABLE {TABELA_CARRO} DROP COLUMN IF EXISTS {COLUNA_VETOR}",
+]
+
+_SQL_SQLITE = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA_FTS} USING fts5(
+        opcionais, descricao,
+        content='{TABELA_CARRO}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ai AFTER INSERT ON {TABELA_CARRO} BEGIN
+        INSERT INTO {TABELA_FTS}(rowid, opcionais, descricao)
+        VALUES (new.id, new.opcionais, new.descricao);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_ad AFTER DELETE ON {TABELA_CARRO} BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, opcionais, descricao)
+        VALUES ('delete', old.id, old.opcionais, old.descricao);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TABELA_FTS}_au AFTER UPDATE OF opcionais, descricao ON {TABELA_CARRO} BEGIN
+        INSERT INTO {TABELA_FTS}({TABELA_FTS}, rowid, opcionais, descricao)
+        VALUES ('delete', old.id, old.opcionais, old.descricao);
+        INSERT INTO {TABELA_FTS}(rowid, opcionais, descricao)
+        VALUES (new.id, new.opcionais, new.descricao);
+    END
+    """,
+    f"INSERT INTO {TABELA_FTS}({TABELA_FTS}) VALUES ('rebuild')",
+]
+
+_TRIGGERS_SQLITE = [f'{TABELA_FTS}_ai', f'{TABELA_FTS}_ad', f'{TABELA_FTS}_au']
+
+_SQL_SQLITE_REMOVER = [
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ai",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_ad",
+    f"DROP TRIGGER IF EXISTS {TABELA_FTS}_au",
+    f"DROP TABLE IF EXISTS {TABELA_FTS}",
+]
+
+
+def _executar(connection, comandos):
+    with connection.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def _indice_sqlite_completo(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)", _TRIGGERS_SQLITE
+        )
+        return cursor.fetchone()[0] == len(_TRIGGERS_SQLITE)
+
+
+def criar_indice_textual(connection):
+    """
+    Cria (ou recria) o índice de texto completo de Carro para o banco da conexão.
+
+    No PostgreSQL é uma coluna tsvector gerada e indexada por GIN; no SQLite é
+    uma tabela FTS5 de conteúdo externo mantida por triggers, reconstruída só
+    quando falta algum trigger. A operação é idempotente. Em outros bancos não
+    faz nada, e filtrar_busca_textual levanta NotSupportedError.
+    """
+    if connection.vendor == 'postgresql':
+        _executar(connection, _SQL_POSTGRES)
+    elif connection.vendor == 'sqlite' and not _indice_sqlite_completo(connection):
+        _executar(connection, _SQL_SQLITE)
+
+
+def recriar_apos_migrar(sender, using=DEFAULT_DB_ALIAS, apps=global_apps, **kwargs):
+    """
+    Receptor de post_migrate (ligado em AppConfig.ready). No SQLite, toda
+    migração que reconstrói app_carro (AddField NOT NULL, unique, etc.)
+    descarta os triggers da busca textual; recriá-los aqui, uma vez ao fim do
+    migrate, dispensa um RunPython em cada migração desse tipo.
+    """
+    try:
+        carro = apps.get_model('app', 'Carro')
+    except LookupError:
+        # app ainda não migrado (ou revertido para zero).
+        return
+    if router.allow_migrate_model(using, carro):
+        criar_indice_textual(connections[using])
+
+
+def remover_indice_textual(connection):
+    """
+    Desfaz o que criar_indice_textual criou.
+    """
+    if connection.vendor == 'postgresql':
+        _executar(connection, _SQL_POSTGRES_REMOVER)
+    elif connection.vendor == 'sqlite':
+        _executar(connection, _SQL_SQLITE_REMOVER)
+
+
+def _consulta_fts5(termo: str) -> str:
+    """
+    Converte o texto digitado em uma consulta FTS5 segura: cada palavra vira
+    um termo entre aspas e todas precisam aparecer.
+    """
+    palavras = re.findall(r'\w+', termo)
+    return ' '.join(f'"{palavra}"' for palavra in palavras)
+
+
+def filtrar_busca_textual(queryset, termo: str):
+    """
+    Restringe um queryset de Carro aos que casam com o termo em opcionais ou
+    descricao e anota a relevância em ``relevancia`` (maior é melhor).
+    Levanta NotSupportedError em bancos sem índice textual (ver criar_indice_textual).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        consulta = f"websearch_to_tsquery('{CONFIGURACAO_PG}', %s)"
+        return queryset.filter(
+            RawSQL(f'{TABELA_CARRO}.{COLUNA_VETOR} @@ {consulta}', [termo], output_field=BooleanField())
+        ).annotate(
+            relevancia=RawSQL(f'ts_rank({TABELA_CARRO}.{COLUNA_VETOR}, {consulta})', [termo], output_field=FloatField())
+        )
+    if vendor == 'sqlite':
+        consulta = _consulta_fts5(termo)
+        if not consulta:
+            return queryset.none()
+        return queryset.filter(
+            RawSQL(
+                f'{TABELA_CARRO}.id IN (SELECT rowid FROM {TABELA_FTS} WHERE {TABELA_FTS} MATCH %s)',
+                [consulta], output_field=BooleanField(),
+            )
+        ).annotate(
+            # bm25 é negativo e menor significa mais relevante.
+            relevancia=RawSQL(
+                f'(SELECT -bm25({TABELA_FTS}) FROM {TABELA_FTS} '
+                f'WHERE {TABELA_FTS} MATCH %s AND rowid = {TABELA_CARRO}.id)',
+                [consulta], output_field=FloatField(),
+            )
+        )
+    raise NotSupportedError(f'A busca textual exige PostgreSQL ou SQLite com FTS5, não {vendor}.')
@@ -0,0 +1,165 @@
+import csv
+import math
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Centroide, Endereco
+
+RAIO_TERRA_KM = 6371.0088
+RAIO_INICIAL_KM = 25
+# Metade da circunferência: a partir daí a caixa cobre o planeta inteiro.
+RAIO_MAXIMO_KM = 20016
+
+CENTROIDES_PADRAO = Path(__file__).resolve().parent / 'data' / 'centroides_capitais.csv'
+
+UFS = {
+    'acre': 'AC', 'alagoas': 'AL', 'amapa': 'AP', 'amazonas': 'AM', 'bahia': 'BA', 'ceara': 'CE',
+    'distrito federal': 'DF', 'espirito santo': 'ES', 'goias': 'GO', 'maranhao': 'MA',
+    'mato grosso': 'MT', 'mato grosso do sul': 'MS', 'minas gerais': 'MG', 'para': 'PA',
+    'paraiba': 'PB', 'parana': 'PR', 'pernambuco': 'PE', 'piaui': 'PI', 'rio de janeiro': 'RJ',
+    'rio grande do norte': 'RN', 'rio grande do sul': 'RS', 'rondonia': 'RO', 'roraima': 'RR',
+    'santa catarina': 'SC', 'sao paulo': 'SP', 'sergipe': 'SE', 'tocantins': 'TO',
+}
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Distância em quilômetros entre dois pontos pela fórmula de haversine.
+    """
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    dfi = fi2 - fi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dfi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAIO_TERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def caixa_delimitadora(lat: float, lon: float, raio_km: float) -> tuple:
+    """
+    Retorna (lat_min, lat_max, lon_min, lon_max) de uma caixa que contém todos
+    os pontos a até raio_km do centro. Perto dos polos, ou quando a caixa
+    cruzaria o antimeridiano, usa toda a faixa de longitudes.
+    """
+    dlat = math.degrees(raio_km / RAIO_TERRA_KM)
+    lat_min, lat_max = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(lat_min), abs(lat_max))))
+    if cos_lat <= 1e-9:
+        return lat_min, lat_max, -180.0, 180.0
+    dlon = math.degrees(raio_km / (RAIO_TERRA_KM * cos_lat))
+    if dlon >= 180 or lon - dlon < -180 or lon + dlon > 180:
+        return lat_min, lat_max, -180.0, 180.0
+    return lat_min, lat_max, lon - dlon, lon + dlon
+
+
+def normalizar(texto: str) -> str:
+    """
+    Minúsculas, sem acentos e com espaços simples, para comparar nomes de lugares.
+    """
+    sem_acentos = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return ' '.join(sem_acentos.lower().split())
+
+
+def uf_de(estado: str) -> str:
+    """
+    Converte o estado de um endereço ("Santa Catarina", "sc") na sigla da UF.
+    """
+    normalizado = normalizar(estado)
+    if len(normalizado) == 2:
+        return normalizado.upper()
+    return UFS.get(normalizado, '')
+
+
+def carregar_centroides(caminho=CENTROIDES_PADRAO, substituir: bool = False) -> int:
+    """
+    Carrega um CSV com colunas cep_prefixo, cidade, uf, latitude e longitude
+    na tabela Centroide. Retorna quantos centroides foram gravados.
+    """
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        centroides = [
+            Centroide(
+                cep_prefixo=re.sub(r'\D', '', linha.get('cep_prefixo') or '')[:5],
+                cidade=normalizar(linha['cidade']),
+                uf=linha['uf'].strip().upper(),
+                latitude=float(linha['latitude']),
+                longitude=float(linha['longitude']),
+            )
+            for linha in csv.DictReader(arquivo)
+        ]
+    with transaction.atomic():
+        if substituir:
+            Centroide.objects.all().delete()
+        Centroide.objects.bulk_create(centroides, batch_size=1000)
+    return len(centroides)
+
+
+class Geocodificador:
+    """
+    Geocodifica endereços pela tabela Centroide, sem acesso à rede.
+
+    Tenta primeiro o prefixo de cinco dígitos do CEP e depois a cidade e o
+    estado. As consultas são memorizadas, então um lote com muitos endereços
+    da mesma cidade consulta o banco uma vez por cidade.
+    """
+
+    def __init__(self):
+        self._por_cep = {}
+        self._por_cidade = {}
+
+    def _buscar_cep(self, prefixo: str):
+        if prefixo not in self._por_cep:
+            centroide = Centroide.objects.filter(cep_prefixo=prefixo).values_list('latitude', 'longitude').first()
+            self._por_cep[prefixo] = centroide
+        return self._por_cep[prefixo]
+
+    def _buscar_cidade(self, cidade: str, uf: str):
+        chave = (uf, cidade)
+        if chave not in self._por_cidade:
+            centroides = Centroide.objects.filter(uf=uf, cidade=cidade)
+            self._por_cidade[chave] = centroides.values_list('latitude', 'longitude').first()
+        return self._por_cidade[chave]
+
+    def coordenadas(self, endereco):
+        """
+        Retorna (latitude, longitude) para o endereço, ou None se não houver centroide.
+        """
+        prefixo = re.sub(r'\D', '', endereco.cep or '')[:5]
+        if len(prefixo) == 5:
+            encontrado = self._buscar_cep(prefixo)
+            if encontrado:
+                return encontrado
+        uf = uf_de(endereco.estado)
+        if uf:
+            return self._buscar_cidade(normalizar(endereco.cidade), uf)
+        return None
+
+
+def geocodificar_enderecos(queryset=None, tamanho_lote: int = 1000) -> tuple:
+    """
+    Preenche latitude e longitude dos endereços (por padrão, os que ainda não
+    têm coordenadas) em lotes com bulk_update. Retorna (geocodificados, sem_centroide).
+    """
+    if queryset is None:
+        queryset = Endereco.objects.filter(latitude__isnull=True)
+    geocodificador = Geocodificador()
+    geocodificados = sem_centroide = 0
+    lote = []
+    for endereco in queryset.order_by('pk').iterator(chunk_size=tamanho_lote):
+        coordenadas = geocodificador.coordenadas(endereco)
+        if coordenadas is None:
+            sem_centroide += 1
+            continue
+        endereco.latitude, endereco.longitude = coordenadas
+        # bulk_update não aplica auto_now.
+        endereco.atualizado_em = timezone.now()
+        lote.append(endereco)
+        if len(lote) >= tamanho_lote:
+            Endereco.objects.bulk_update(lote, ['latitude', 'longitude', 'atualizado_em'])
+            geocodificados += len(lote)
+            lote = []
+    if lote:
+        Endereco.objects.bulk_update(lote, ['latitude', 'longitude', 'atualizado_em'])
+        geocodificados += len(lote)
+    return geocodificados, sem_centroide
@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import re
+import time
+
+from django.core.exceptions import ValidationError
+
+from . import carro_cache
+from .models import Carro
+from .price_history import registrar_alteracoes
+
+CAMPOS_IMPORTACAO = ('referencia', 'marca', 'ano', 'modelo', 'preco', 'km', 'cor', 'opcionais', 'descricao')
+CAMPOS_ATUALIZADOS = [campo for campo in CAMPOS_IMPORTACAO if campo != 'referencia'] + [
+    'ano_fabricacao', 'ano_modelo', 'atualizado_em',
+]
+
+_TAMANHO_LEITURA = 64 * 1024
+# Separadores do array e espaços entre os objetos JSON.
+_SEPARADORES = re.compile(r'[ \t\r\n,\[\]]*')
+
+
+class LinhaInvalida(Exception):
+    """
+    Erro de validação de uma linha do arquivo importado.
+
+    Atributos:
+        numero (int): A posição da linha (ou do objeto JSON) no arquivo, a partir de 1.
+        erros (dict): Mensagens de erro por campo.
+    """
+
+    def __init__(self, numero, erros):
+        super().__init__(f'linha {numero}: {erros}')
+        self.numero = numero
+        self.erros = erros
+
+
+class ArquivoInvalido(Exception):
+    """
+    Erro de sintaxe que impede continuar a leitura do arquivo importado.
+
+    Atributos:
+        linha (int): A linha do arquivo em que o erro foi encontrado, a partir de 1.
+    """
+
+    def __init__(self, linha, mensagem):
+        super().__init__(f'linha {linha}: {mensagem}')
+        self.linha = linha
+
+
+def ler_csv(arquivo):
+    """
+    Gera um dict por linha de um CSV com cabeçalho, sem carregar o arquivo
+    inteiro. Levanta ArquivoInvalido.
+    """
+    leitor = csv.DictReader(arquivo)
+    try:
+        yield from leitor
+    except csv.Error as exc:
+        raise ArquivoInvalido(leitor.line_num, exc) from exc
+    except UnicodeDecodeError as exc:
+        raise ArquivoInvalido(leitor.line_num + 1, 'o arquivo não está em UTF-8') from exc
+
+
+def ler_json(arquivo):
+    """
+    Gera os objetos de um arquivo JSON Lines ou de um array JSON de objetos,
+    lendo o arquivo em blocos. Levanta ArquivoInvalido se o JSON estiver
+    malformado ou truncado, ou se o arquivo não estiver em UTF-8.
+
+    Os objetos são decodificados a partir de um índice no buffer; a parte já
+    lida só é descartada quando chega um novo bloco, e não a cada objeto.
+    """
+    decodificador = json.JSONDecoder()
+    buffer = ''
+    inicio = 0
+    fim = False
+    # A linha do arquivo em buffer[inicio].
+    linha = 1
+    while True:
+        posicao = _SEPARADORES.match(buffer, inicio).end()
+        linha += buffer.count('\n', inicio, posicao)
+        inicio = posicao
+        if inicio == len(buffer):
+            if fim:
+                return
+            buffer, inicio = _ler_bloco(arquivo, linha), 0
+            fim = not buffer
+            continue
+        try:
+            objeto, posicao = decodificador.raw_decode(buffer, inicio)
+        except json.JSONDecodeError as exc:
+            if fim:
+                raise ArquivoInvalido(linha + buffer.count('\n', inicio, exc.pos), exc.msg) from exc
+            bloco = _ler_bloco(arquivo, linha)
+            fim = not bloco
+            buffer, inicio = buffer[inicio:] + bloco, 0
+            continue
+        linha += buffer.count('\n', inicio, posicao)
+        inicio = posicao
+        yield objeto
+
+
+def _ler_bloco(arquivo, linha: int) -> str:
+    try:
+        return arquivo.read(_TAMANHO_LEITURA)
+    except UnicodeDecodeError as exc:
+        raise ArquivoInvalido(linha, 'o arquivo não está em UTF-8') from exc
+
+
+def validar_linha(numero: int, linha: dict) -> Carro:
+    """
+    Converte uma linha em um Carro não salvo, validando-a contra as restrições
+    dos campos do modelo (max_length, max_digits, tipos). Levanta LinhaInvalida.
+    """
+    if not isinstance(linha, dict):
+        raise LinhaInvalida(numero, {'__all__': ['Cada registro deve ser um objeto JSON.']})
+    dados = {}
+    for campo in CAMPOS_IMPORTACAO:
+        valor = linha.get(campo)
+        if isinstance(valor, str):
+            valor = valor.strip()
+        dados[campo] = valor if valor not in ('', None) else None
+    if not dados['referencia']:
+        raise LinhaInvalida(numero, {'referencia': ['A importação exige a referência do carro.']})
+    carro = Carro(**dados)
+    try:
+        # A unicidade é resolvida pelo upsert, então não consulta o banco aqui.
+        carro.full_clean(validate_unique=False, validate_constraints=False)
+    except ValidationError as exc:
+        raise LinhaInvalida(numero, exc.message_dict) from exc
+    # bulk_create não passa por Carro.save(), que normalmente preenche os anos.
+    carro.preencher_anos()
+    return carro
+
+
+def gravar_lote(carros: list):
+    """
+    Insere ou atualiza um lote de carros pela referência em uma única
+    instrução e registra no histórico os preços alterados, já que o upsert
+    não passa pelos sinais de Carro.
+    """
+    anteriores = {
+        referencia: (pk, preco)
+        for referencia, pk, preco in Carro.todos.filter(referencia__in=[carro.referencia for carro in carros])
+        .values_list('referencia', 'id', 'preco')
+    }
+    Carro.objects.bulk_create(
+        carros,
+        update_conflicts=True,
+        unique_fields=['referencia'],
+        update_fields=CAMPOS_ATUALIZADOS,
+    )
+    registrar_alteracoes(
+        (anteriores[carro.referencia][0], anteriores[carro.referencia][1], carro.preco)
+        for carro in carros
+        if carro.referencia in anteriores
+    )
+    # Os carros atualizados pelo upsert podem estar no cache de detalhe.
+    carro_cache.agendar_invalidacao_lote(pk for pk, _ in anteriores.values())
+
+
+def importar_carros(linhas, tamanho_lote: int = 1000, ao_gravar_lote=None, ao_rejeitar=None):
+    """
+    Valida e grava em lotes os carros de um iterável de dicts.
+
+    Apenas um lote fica em memória por vez. Se a mesma referência aparecer duas
+    vezes no mesmo lote, prevalece a última ocorrência.
+
+    Parâmetros:
+        linhas (iterável): Os registros lidos do arquivo.
+        tamanho_lote (int): Quantidade de carros por instrução de upsert.
+        ao_gravar_lote (callable): Chamado com (gravados, segundos) após cada lote.
+        ao_rejeitar (callable): Chamado com a LinhaInvalida de cada linha rejeitada.
+
+    Retorna uma tupla (gravados, rejeitados).
+    """
+    inicio = time.monotonic()
+    gravados = rejeitados = 0
+    lote = {}
+    for numero, linha in enumerate(linhas, start=1):
+        try:
+            carro = validar_linha(numero, linha)
+        except LinhaInvalida as exc:
+            rejeitados += 1
+            if ao_rejeitar:
+                ao_rejeitar(exc)
+            continue
+        lote[carro.referencia] = carro
+        if len(lote) >= tamanho_lote:
+            gravar_lote(list(lote.values()))
+            gravados += len(lote)
+            lote = {}
+            if ao_gravar_lote:
+                ao_gravar_lote(gravados, time.monotonic() - inicio)
+    if lote:
+        gravar_lote(list(lote.values()))
+        gravados += len(lote)
+        if ao_gravar_lote:
+            ao_gravar_lote(gravados, time.monotonic() - inicio)
+    return gravados, rejeitados
+
+
+def abrir_leitor(caminho: str, formato: str = None, armazenamento=None):
+    """
+    Abre o arquivo e devolve (arquivo, gerador de linhas) conforme o formato,
+    deduzido pela extensão quando não informado. Com armazenamento (um
+    Storage do Django), caminho é o nome do arquivo nele, e não no disco local.
+    """
+    if formato is None:
+        formato = 'csv' if caminho.lower().endswith('.csv') else 'json'
+    newline = '' if formato == 'csv' else None
+    if armazenamento is None:
+        arquivo = open(caminho, encoding='utf-8', newline=newline)
+    else:
+        arquivo = io.TextIOWrapper(armazenamento.open(caminho, 'rb'), encoding='utf-8', newline=newline)
+    leitor = ler_csv(arquivo) if formato == 'csv' else ler_json(arquivo)
+    return arquivo, leitor
@@ -0,0 +1,160 @@
+import heapq
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('app.sql')
+
+MAXIMO_LENTAS = 5
+LIMITE_REPETICOES = 5
+
+_LISTA_IN = re.compile(r'IN \((?:%s, )*%s\)')
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def formato(sql: str) -> str:
+    """
+    Reduz uma instrução ao seu formato: listas IN de qualquer tamanho e
+    literais embutidos viram marcadores, para que consultas que só diferem
+    nos valores sejam contadas juntas.
+    """
+    return _LITERAIS.sub('?', _LISTA_IN.sub('IN (...)', sql))
+
+
+class ColetorConsultas:
+    """
+    Wrapper de execução (connection.execute_wrapper) que mede as consultas de
+    uma requisição.
+
+    Durante a requisição só conta e soma tempos por texto de SQL; a
+    normalização dos formatos fica para o final e é feita uma vez por SQL distinto.
+
+    Atributos:
+        total (int): Quantas instruções foram executadas.
+        segundos (float): Tempo total gasto no banco.
+        lentas (list): Heap com as MAXIMO_LENTAS instruções mais lentas, como (segundos, sql).
+        por_sql (Counter): Execuções por texto de SQL.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.segundos = 0.0
+        self.lentas = []
+        self.por_sql = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.total += 1
+            self.segundos += duracao
+            self.por_sql[sql] += 1
+            if len(self.lentas) < MAXIMO_LENTAS:
+                heapq.heappush(self.lentas, (duracao, sql))
+            elif duracao > self.lentas[0][0]:
+                heapq.heapreplace(self.lentas, (duracao, sql))
+
+    def repetidas(self, limite: int = LIMITE_REPETICOES) -> list:
+        """
+        Formatos executados pelo menos `limite` vezes: prováveis N+1.
+        """
+        formatos = Counter()
+        for sql, vezes in self.por_sql.items():
+            formatos[formato(sql)] += vezes
+        return [(sql, vezes) for sql, vezes in formatos.most_common() if vezes >= limite]
+
+    def instalar(self):
+        for conexao in connections.all():
+            conexao.execute_wrappers.append(self)
+
+    def remover(self):
+        for conexao in connections.all():
+            if self in conexao.execute_wrappers:
+                conexao.execute_wrappers.remove(self)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Mede as consultas SQL de uma amostra das requisições.
+
+    Ativado por SQL_INSTRUMENTACAO; SQL_INSTRUMENTACAO_AMOSTRAGEM (0 a 1)
+    define a fração de requisições medidas. Nas medidas, acrescenta o
+    cabeçalho Server-Timing (tempo no banco e número de consultas) e grava
+    uma linha JSON no logger 'app.sql', em nível WARNING quando algum formato
+    de consulta se repete SQL_INSTRUMENTACAO_REPETICOES vezes ou mais.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _amostrar(self) -> bool:
+        return random.random() < getattr(settings, 'SQL_INSTRUMENTACAO_AMOSTRAGEM', 1.0)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._amostrar():
+            return self.get_response(request)
+        coletor = ColetorConsultas()
+        inicio = time.perf_counter()
+        coletor.instalar()
+        try:
+            response = self.get_response(request)
+        finally:
+            coletor.remover()
+        return self._relatar(request, response, coletor, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        if not self._amostrar():
+            return await self.get_response(request)
+        coletor = ColetorConsultas()
+        inicio = time.perf_counter()
+        # O ORM assíncrono executa as consultas na thread síncrona da
+        # requisição, então o wrapper é instalado nas conexões dela.
+        await sync_to_async(coletor.instalar)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(coletor.remover)()
+        return self._relatar(request, response, coletor, time.perf_counter() - inicio)
+
+    def _relatar(self, request, response, coletor, segundos: float):
+        repetidas = coletor.repetidas(getattr(settings, 'SQL_INSTRUMENTACAO_REPETICOES', LIMITE_REPETICOES))
+        metricas = [
+            f'db;dur={coletor.segundos * 1000:.2f};desc="{coletor.total} queries"',
+            f'app;dur={segundos * 1000:.2f}',
+        ]
+        if repetidas:
+            metricas.append(f'n1;desc="{len(repetidas)} repeated shapes"')
+        if response.has_header('Server-Timing'):
+            metricas.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metricas)
+
+        registro = {
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'consultas': coletor.total,
+            'db_ms': round(coletor.segundos * 1000, 2),
+            'total_ms': round(segundos * 1000, 2),
+            'lentas': [
+                {'ms': round(duracao * 1000, 2), 'sql': sql}
+                for duracao, sql in sorted(coletor.lentas, reverse=True)
+            ],
+            'n_mais_1': [{'vezes': vezes, 'sql': sql} for sql, vezes in repetidas],
+        }
+        logger.log(logging.WARNING if repetidas else logging.INFO, json.dumps(registro, ensure_ascii=False))
+        return response
@@ -0,0 +1,330 @@
+import datetime
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from . import workers
+from .models import TAREFA_NA_FILA, Tarefa
+
+logger = logging.getLogger(__name__)
+
+# nome -> (função, máximo de tentativas, prazo de visibilidade em segundos).
+# None usa FILA_TENTATIVAS ou FILA_VISIBILIDADE_SEGUNDOS.
+TAREFAS = {}
+BACKOFF_MAXIMO = 60 * 60
+
+
+def registrar(nome: str, funcao, tentativas: int = None, visibilidade: int = None):
+    """
+    Registra uma função como tarefa. Os argumentos com que ela é enfileirada
+    são gravados como JSON, então devem ser tipos simples (ids, não objetos).
+
+    Parâmetros:
+        nome (str): O nome usado em enfileirar.
+        funcao (callable): A função, chamada com os argumentos nomeados da tarefa.
+        tentativas (int): O máximo de tentativas (padrão: FILA_TENTATIVAS).
+        visibilidade (int): Segundos sem notícia do worker até que ela volte
+            à fila (padrão: FILA_VISIBILIDADE_SEGUNDOS). Enquanto a tarefa
+            executa, o worker renova o prazo a cada terço dele (ver executar).
+    """
+    TAREFAS[nome] = (funcao, tentativas, visibilidade)
+    return funcao
+
+
+def _visibilidade(nome: str) -> int:
+    return (TAREFAS.get(nome, (None, None, None))[2]) or settings.FILA_VISIBILIDADE_SEGUNDOS
+
+
+def enfileirar(nome: str, atraso: float = 0, **argumentos) -> Tarefa:
+    """
+    Grava uma tarefa na fila. Dentro de uma transação, ela só fica visível
+    aos workers depois do commit, junto com os dados de que depende.
+    Levanta ValueError se o nome não foi registrado.
+    """
+    if nome not in TAREFAS:
+        raise ValueError(f'Tarefa não registrada: {nome}')
+    return Tarefa.objects.create(
+        nome=nome,
+        argumentos=argumentos,
+        max_tentativas=TAREFAS[nome][1] or settings.FILA_TENTATIVAS,
+        disponivel_em=timezone.now() + datetime.timedelta(seconds=atraso),
+    )
+
+
+def atraso_retentativa(tentativas: int) -> float:
+    """
+    Backoff exponencial com jitter: entre metade e o total de
+    FILA_BACKOFF_SEGUNDOS * 2^(tentativas - 1), limitado a BACKOFF_MAXIMO.
+    """
+    teto = min(settings.FILA_BACKOFF_SEGUNDOS * 2 ** (tentativas - 1), BACKOFF_MAXIMO)
+    return random.uniform(teto / 2, teto)
+
+
+def reservar(quantidade: int, worker: str = '') -> tuple:
+    """
+    Reserva até quantidade tarefas prontas, em uma transação curta, e
+    retorna (token da reserva, ids reservados).
+
+    As linhas bloqueadas por outro worker são puladas (SKIP LOCKED no
+    PostgreSQL), então vários nós podem reservar ao mesmo tempo sem esperar
+    uns pelos outros. Tarefas em execução cujo prazo de visibilidade acabou
+    voltam a ser reservadas, ou são dadas como falhas se já esgotaram as tentativas.
+    """
+    agora = timezone.now()
+    reserva = f'{worker}:{uuid.uuid4().hex}'[-64:]
+    with transaction.atomic():
+        Tarefa.objects.filter(
+            status=Tarefa.EXECUTANDO, disponivel_em__lte=agora, tentativas__gte=F('max_tentativas')
+        ).update(status=Tarefa.FALHOU, concluida_em=agora, erro='O prazo de visibilidade terminou sem conclusão.')
+        candidatas = list(
+            Tarefa.objects.filter(TAREFA_NA_FILA, disponivel_em__lte=agora)
+            .select_for_update(skip_locked=True).order_by('disponivel_em', 'id')
+            .values_list('pk', 'nome')[:quantidade]
+        )
+        por_prazo = defaultdict(list)
+        for pk, nome in candidatas:
+            por_prazo[_visibilidade(nome)].append(pk)
+        for segundos, pks in por_prazo.items():
+            # Repetir o filtro impede que duas reservas simultâneas peguem a mesma
+            # tarefa onde não há SELECT FOR UPDATE (SQLite serializa as escritas).
+            Tarefa.objects.filter(TAREFA_NA_FILA, pk__in=pks, disponivel_em__lte=agora).update(
+                status=Tarefa.EXECUTANDO,
+                tentativas=F('tentativas') + 1,
+                disponivel_em=agora + datetime.timedelta(seconds=segundos),
+                reserva=reserva,
+            )
+    if not candidatas:
+        return reserva, []
+    reservadas = Tarefa.objects.filter(pk__in=[pk for pk, _ in candidatas], reserva=reserva)
+    return reserva, list(reservadas.order_by('disponivel_em', 'id').values_list('pk', flat=True))
+
+
+def renovar_reserva(pk: int, reserva: str, segundos: int) -> bool:
+    """
+    Adia o fim do prazo de visibilidade de uma tarefa em execução. Retorna
+    False se a reserva não vale mais.
+    """
+    return bool(Tarefa.objects.filter(pk=pk, reserva=reserva, status=Tarefa.EXECUTANDO).update(
+        disponivel_em=timezone.now() + datetime.timedelta(seconds=segundos)
+    ))
+
+
+def _renovar_periodicamente(pk: int, reserva: str, segundos: int, terminou: threading.Event):
+    # Roda em uma thread própria, com sua própria conexão, enquanto a tarefa executa.
+    try:
+        while not terminou.wait(segundos / 3):
+            if not renovar_reserva(pk, reserva, segundos):
+                return
+    except Exception:
+        # Sem renovação a tarefa volta à fila quando o prazo acabar, como se o worker tivesse morrido.
+        logger.exception('Falha ao renovar a reserva da tarefa %s', pk)
+    finally:
+        connection.close()
+
+
+@contextmanager
+def _mantendo_reserva(pk: int, reserva: str, segundos: int):
+    terminou = threading.Event()
+    renovacao = threading.Thread(
+        target=_renovar_periodicamente, args=(pk, reserva, segundos, terminou), name=f'reserva-{pk}', daemon=True
+    )
+    renovacao.start()
+    try:
+        yield
+    finally:
+        terminou.set()
+        renovacao.join()
+
+
+def _serializavel(resultado):
+    return resultado if isinstance(resultado, (dict, list, tuple, str, int, float, bool)) else None
+
+
+def executar(pk: int, reserva: str):
+    """
+    Executa uma tarefa reservada. Retorna True se concluiu, False se falhou
+    (e foi reagendada com backoff ou dada como falha) e None se a reserva
+    não vale mais, porque o prazo de visibilidade acabou e outro worker a pegou.
+
+    Enquanto a função executa, uma thread renova o prazo de visibilidade,
+    então só tarefas de um worker que parou de responder voltam à fila.
+    """
+    tarefa = Tarefa.objects.filter(pk=pk, reserva=reserva, status=Tarefa.EXECUTANDO).first()
+    if tarefa is None:
+        return None
+    da_reserva = Tarefa.objects.filter(pk=pk, reserva=reserva, status=Tarefa.EXECUTANDO)
+    try:
+        if tarefa.nome not in TAREFAS:
+            raise LookupError(f'Tarefa não registrada: {tarefa.nome}')
+        with _mantendo_reserva(pk, reserva, _visibilidade(tarefa.nome)):
+            resultado = TAREFAS[tarefa.nome][0](**tarefa.argumentos)
+    except Exception:
+        logger.exception('Falha na tarefa %s (%s), tentativa %s', pk, tarefa.nome, tarefa.tentativas)
+        agora, erro = timezone.now(), traceback.format_exc()
+        if tarefa.tentativas >= tarefa.max_tentativas:
+            da_reserva.update(status=Tarefa.FALHOU, concluida_em=agora, erro=erro)
+        else:
+            atraso = datetime.timedelta(seconds=atraso_retentativa(tarefa.tentativas))
+            da_reserva.update(status=Tarefa.PENDENTE, disponivel_em=agora + atraso, erro=erro)
+        return False
+    da_reserva.update(
+        status=Tarefa.CONCLUIDA, resultado=_serializavel(resultado), concluida_em=timezone.now(), erro=''
+    )
+    return True
+
+
+def processar_fila(limite: int = None, worker: str = 'local') -> int:
+    """
+    Executa, na thread atual e uma a uma, as tarefas prontas até a fila
+    esvaziar (ou até limite tarefas). Retorna quantas foram executadas.
+    """
+    executadas = 0
+    while limite is None or executadas < limite:
+        reserva, pks = reservar(1, worker)
+        if not pks:
+            break
+        executar(pks[0], reserva)
+        executadas += 1
+    return executadas
+
+
+def limpar_concluidas(dias: int = None) -> int:
+    """
+    Apaga as tarefas terminadas há mais de dias dias (padrão: FILA_RETENCAO_DIAS).
+    """
+    dias = settings.FILA_RETENCAO_DIAS if dias is None else dias
+    limite = timezone.now() - datetime.timedelta(days=dias)
+    return Tarefa.objects.filter(concluida_em__lt=limite).delete()[0]
+
+
+def metricas(janela: int = 60) -> dict:
+    """
+    Profundidade da fila e vazão recente, em três consultas que só leem os
+    índices parciais da fila e das tarefas terminadas.
+
+    Retorna um dict com prontas (esperando worker), agendadas (retentativas
+    e atrasos futuros), executando, espera_segundos (idade da tarefa pronta
+    mais antiga), por_nome (tarefas na fila por nome) e, para os últimos
+    janela segundos, concluidas, falhas e vazao_por_minuto.
+    """
+    agora = timezone.now()
+    pendente, pronta = Q(status=Tarefa.PENDENTE), Q(disponivel_em__lte=agora)
+    fila = Tarefa.objects.filter(TAREFA_NA_FILA)
+    profundidade = fila.aggregate(
+        prontas=Count('id', filter=pendente & pronta),
+        agendadas=Count('id', filter=pendente & ~pronta),
+        executando=Count('id', filter=Q(status=Tarefa.EXECUTANDO)),
+        mais_antiga=Min('disponivel_em', filter=pendente),
+    )
+    mais_antiga = profundidade.pop('mais_antiga')
+    terminadas = Tarefa.objects.filter(concluida_em__gte=agora - datetime.timedelta(seconds=janela)).aggregate(
+        concluidas=Count('id', filter=Q(status=Tarefa.CONCLUIDA)),
+        falhas=Count('id', filter=Q(status=Tarefa.FALHOU)),
+    )
+    por_nome = fila.order_by().values('nome').annotate(quantidade=Count('id'))
+    return {
+        **profundidade,
+        'espera_segundos': round(max((agora - mais_antiga).total_seconds(), 0), 1) if mais_antiga else 0,
+        'por_nome': {linha['nome']: linha['quantidade'] for linha in por_nome},
+        'janela_segundos': janela,
+        **terminadas,
+        'vazao_por_minuto': round(terminadas['concluidas'] * 60 / janela, 1),
+    }
+
+
+class Worker:
+    """
+    Reserva tarefas e as executa em um pool de threads ou de processos,
+    mantendo o pool cheio: cada vaga liberada é preenchida com uma nova
+    reserva. Vários workers, em um ou em vários nós, podem consumir a mesma fila.
+
+    Atributos:
+        concorrencia (int): Quantas tarefas executam ao mesmo tempo.
+        processos (bool): Usa processos (tarefas de CPU) em vez de threads.
+        intervalo (float): Segundos entre consultas quando a fila está vazia.
+        nome (str): Identifica o worker nas reservas.
+        parar (threading.Event): Quando acionado, o worker termina as tarefas
+            em execução e para.
+        concluidas (int): Tarefas concluídas por este worker.
+        falhas (int): Tentativas que falharam neste worker.
+    """
+
+    def __init__(self, concorrencia: int = None, processos: bool = False, intervalo: float = 1.0, nome: str = None):
+        self.concorrencia = concorrencia or settings.FILA_WORKERS
+        self.processos = processos
+        self.intervalo = intervalo
+        self.nome = nome or f'{socket.gethostname()}:{os.getpid()}'
+        self.parar = threading.Event()
+        self.concluidas = self.falhas = 0
+
+    def _executor(self):
+        if self.processos:
+            # spawn: os filhos não herdam conexões nem threads do processo atual.
+            return ProcessPoolExecutor(self.concorrencia, mp_context=get_context('spawn'),
+                                       initializer=workers.iniciar_processo)
+        return ThreadPoolExecutor(self.concorrencia, thread_name_prefix='tarefas')
+
+    def _contar(self, futuro):
+        try:
+            concluida = futuro.result()
+        except Exception:
+            # Erro fora da tarefa (banco indisponível, processo morto): a reserva
+            # expira e a tarefa volta à fila.
+            logger.exception('Falha no worker %s ao executar uma tarefa', self.nome)
+            concluida = False
+        if concluida:
+            self.concluidas += 1
+        elif concluida is False:
+            self.falhas += 1
+
+    def rodar(self, ate_esvaziar: bool = False, ao_medir=None, intervalo_metricas: float = 60):
+        """
+        Executa tarefas até parar ser acionado ou, com ate_esvaziar, até não
+        haver tarefas prontas nem em execução. A cada intervalo_metricas
+        segundos chama ao_medir com metricas() mais as contagens deste worker
+        e apaga as tarefas terminadas há mais de FILA_RETENCAO_DIAS.
+        """
+        inicio = proxima_medicao = time.monotonic()
+        em_execucao = set()
+        executor = self._executor()
+        try:
+            while not self.parar.is_set():
+                if time.monotonic() >= proxima_medicao:
+                    proxima_medicao += intervalo_metricas
+                    limpar_concluidas()
+                    if ao_medir:
+                        segundos = max(time.monotonic() - inicio, 1e-9)
+                        ao_medir({
+                            **metricas(), 'worker': self.nome, 'worker_concluidas': self.concluidas,
+                            'worker_falhas': self.falhas, 'worker_por_minuto': round(self.concluidas * 60 / segundos, 1),
+                        })
+                vagas = self.concorrencia - len(em_execucao)
+                reserva, pks = reservar(vagas, self.nome) if vagas else (None, [])
+                em_execucao.update(executor.submit(workers.executar_tarefa, pk, reserva) for pk in pks)
+                if not em_execucao:
+                    if ate_esvaziar:
+                        break
+                    self.parar.wait(self.intervalo)
+                    continue
+                # Espera uma vaga ou, se a fila esvaziou, o intervalo para consultá-la de novo.
+                prontos, em_execucao = wait(em_execucao, timeout=self.intervalo, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    self._contar(futuro)
+        finally:
+            executor.shutdown(wait=True)
+            for futuro in em_execucao:
+                self._contar(futuro)
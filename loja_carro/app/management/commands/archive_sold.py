@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from app.archive import arquivar_vendidos
+
+
+class Command(BaseCommand):
+    help = (
+        'Move para a tabela de carros arquivados, em lotes com transações curtas, '
+        'os carros vendidos há mais de ARQUIVAR_VENDIDOS_DIAS dias.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Idade mínima da venda em dias (padrão: ARQUIVAR_VENDIDOS_DIAS).')
+        parser.add_argument('--tamanho-lote', type=int, default=500, help='Carros movidos por transação.')
+        parser.add_argument('--pausa', type=float, default=0, help='Segundos de espera entre lotes.')
+
+    def handle(self, *args, **options):
+        def ao_arquivar(total):
+            self.stdout.write(f'{total} carros arquivados')
+
+        total = arquivar_vendidos(
+            dias=options['dias'], tamanho_lote=options['tamanho_lote'], pausa=options['pausa'],
+            ao_arquivar=ao_arquivar,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Arquivamento concluído: {total} carros.'))
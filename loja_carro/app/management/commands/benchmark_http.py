@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmark import medir_asgi, medir_servidor, medir_wsgi
+from app.models import Carro
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara vazão e latência dos endpoints do inventário servidos por ASGI e por WSGI, '
+        'dentro do processo ou contra servidores em execução (--servidor).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--caminho', action='append',
+                            help='Caminho a medir; repita para vários (padrão: inventário e detalhe de um carro).')
+        parser.add_argument('--requisicoes', type=int, default=200, help='Requisições por caminho e modo.')
+        parser.add_argument('--concorrencia', type=int, default=16, help='Requisições simultâneas.')
+        parser.add_argument('--servidor', action='append', metavar='NOME=URL',
+                            help='Servidor em execução, por exemplo asgi=http://127.0.0.1:8000; repita para vários.')
+        parser.add_argument('--saida', help='Grava os resultados em JSON neste arquivo.')
+
+    def handle(self, *args, **options):
+        caminhos = options['caminho']
+        if not caminhos:
+            caminhos = ['/api/carros/inventario/']
+            pk = Carro.objects.order_by('pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                caminhos.append(f'/api/carros/{pk}/')
+        if options['servidor']:
+            try:
+                modos = {
+                    nome: (lambda caminho, n, c, url=url: medir_servidor(url, caminho, n, c))
+                    for nome, url in (servidor.split('=', 1) for servidor in options['servidor'])
+                }
+            except ValueError:
+                raise CommandError('Use --servidor NOME=URL.')
+        else:
+            modos = {'wsgi': medir_wsgi, 'asgi': medir_asgi}
+
+        resultados = []
+        for caminho in caminhos:
+            for modo, medir in modos.items():
+                resumo = medir(caminho, options['requisicoes'], options['concorrencia'])
+                resultados.append({'modo': modo, 'caminho': caminho, **resumo})
+                self.stdout.write(
+                    f"{modo:<8} {caminho:<32} {resumo['req_por_segundo']:>8.1f} req/s  "
+                    f"p50 {resumo.get('p50_ms', 0):>7.2f} ms  p95 {resumo.get('p95_ms', 0):>7.2f} ms  "
+                    f"erros {resumo['erros']}"
+                )
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as destino:
+                json.dump(resultados, destino, indent=2)
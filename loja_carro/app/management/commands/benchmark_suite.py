@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.benchmark import comparar, executar_suite
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede as consultas chave e as listagens do admin sobre os dados atuais e grava os '
+        'resultados em JSON; com --comparar, falha se algo ficou mais lento que a execução anterior.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=5, help='Execuções medidas de cada consulta.')
+        parser.add_argument('--sem-admin', action='store_true', help='Não mede as listagens do admin.')
+        parser.add_argument('--saida', help='Arquivo JSON de destino (padrão: saída padrão).')
+        parser.add_argument('--comparar', help='JSON de uma execução anterior para detectar regressões.')
+        parser.add_argument('--tolerancia', type=float, default=0.2,
+                            help='Aumento relativo da mediana aceito antes de apontar regressão.')
+
+    def handle(self, *args, **options):
+        anterior = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as arquivo:
+                    anterior = json.load(arquivo)
+            except (OSError, ValueError) as exc:
+                raise CommandError(exc)
+
+        relatorio = executar_suite(options['repeticoes'], incluir_admin=not options['sem_admin'])
+        for nome, medida in relatorio['resultados'].items():
+            self.stderr.write(
+                f"{nome:<30} mediana {medida['mediana_ms']:>9.2f} ms  p95 {medida['p95_ms']:>9.2f} ms  "
+                f"{medida['consultas']} consultas"
+            )
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as destino:
+                json.dump(relatorio, destino, indent=2)
+        else:
+            self.stdout.write(json.dumps(relatorio, indent=2))
+
+        if anterior is not None:
+            regressoes = comparar(anterior, relatorio, options['tolerancia'])
+            for nome, antes, agora, consultas_antes, consultas_agora in regressoes:
+                self.stderr.write(
+                    f'Regressão em {nome}: {antes:.2f} -> {agora:.2f} ms, {consultas_antes} -> {consultas_agora} consultas'
+                )
+            if regressoes:
+                raise CommandError(f'{len(regressoes)} medições pioraram em relação a {options["comparar"]}.')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from app.read_models import verificar_consistencia
+
+
+class Command(BaseCommand):
+    help = 'Confere a tabela VendedorResumo com Vendedor, Loja_Unidade e Endereco.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corrigir', action='store_true', help='Regrava os resumos divergentes ou ausentes.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Vendedores conferidos por vez.')
+
+    def handle(self, *args, **options):
+        divergencias = verificar_consistencia(corrigir=options['corrigir'], chunk_size=options['chunk_size'])
+        for vendedor_id, diferencas in divergencias:
+            if diferencas is None:
+                self.stdout.write(f'Vendedor {vendedor_id}: resumo ausente')
+            else:
+                detalhes = ', '.join(f'{campo}: {atual!r} != {esperado!r}' for campo, (atual, esperado) in diferencas.items())
+                self.stdout.write(f'Vendedor {vendedor_id}: {detalhes}')
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS('VendedorResumo está consistente.'))
+        elif options['corrigir']:
+            self.stdout.write(self.style.SUCCESS(f'{len(divergencias)} resumos corrigidos.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(divergencias)} resumos divergentes.'))
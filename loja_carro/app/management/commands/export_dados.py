@@ -0,0 +1,33 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from app.export import EXPORTACOES, FORMATOS, comprimir_gzip, gerar
+
+
+class Command(BaseCommand):
+    help = 'Exporta carros ou clientes (com vendedor e loja) em CSV ou JSON Lines, sem carregar tudo em memória.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('nome', choices=sorted(EXPORTACOES), help='O que exportar.')
+        parser.add_argument('--formato', choices=FORMATOS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Comprime a saída em gzip.')
+        parser.add_argument('--saida', help='Arquivo de destino (padrão: saída padrão).')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas lidas do banco por vez.')
+
+    def handle(self, *args, **options):
+        partes = gerar(options['nome'], options['formato'], options['chunk_size'])
+        if options['gzip']:
+            partes = comprimir_gzip(partes)
+        if not options['saida']:
+            if options['gzip']:
+                for parte in partes:
+                    sys.stdout.buffer.write(parte)
+            else:
+                for parte in partes:
+                    self.stdout.write(parte, ending='')
+            return
+        modo = {'mode': 'wb'} if options['gzip'] else {'mode': 'w', 'encoding': 'utf-8', 'newline': ''}
+        with open(options['saida'], **modo) as destino:
+            for parte in partes:
+                destino.write(parte)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.geo import CENTROIDES_PADRAO, carregar_centroides, geocodificar_enderecos
+from app.models import Centroide, Endereco
+
+
+class Command(BaseCommand):
+    help = 'Preenche latitude e longitude dos endereços a partir da tabela local de centroides, sem usar a rede.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centroides', help='CSV (cep_prefixo,cidade,uf,latitude,longitude) que substitui a tabela de centroides.')
+        parser.add_argument('--todos', action='store_true', help='Geocodifica também os endereços que já têm coordenadas.')
+        parser.add_argument('--tamanho-lote', type=int, default=1000, help='Endereços gravados por vez.')
+
+    def handle(self, *args, **options):
+        try:
+            if options['centroides']:
+                total = carregar_centroides(options['centroides'], substituir=True)
+                self.stdout.write(f'{total} centroides carregados.')
+            elif not Centroide.objects.exists():
+                total = carregar_centroides(CENTROIDES_PADRAO)
+                self.stdout.write(f'{total} centroides das capitais carregados.')
+        except (OSError, KeyError, ValueError) as exc:
+            raise CommandError(f'Não foi possível carregar os centroides: {exc}')
+        queryset = Endereco.objects.all() if options['todos'] else None
+        geocodificados, sem_centroide = geocodificar_enderecos(queryset, options['tamanho_lote'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{geocodificados} endereços geocodificados, {sem_centroide} sem centroide correspondente.'
+        ))
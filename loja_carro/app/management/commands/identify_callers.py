@@ -0,0 +1,51 @@
+import csv
+import sys
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.callerid import identificar_lote, reconstruir_diretorio
+
+
+class Command(BaseCommand):
+    help = (
+        'Identifica os telefones de um registro de chamadas (um número por linha) '
+        'e grava CSV com numero, e164, tipo, objeto_id e nome.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', nargs='?', help='Arquivo com um telefone por linha (padrão: entrada padrão).')
+        parser.add_argument('--saida', help='Arquivo CSV de destino (padrão: saída padrão).')
+        parser.add_argument('--tamanho-lote', type=int, default=5000, help='Linhas lidas e identificadas por vez.')
+        parser.add_argument('--reconstruir', action='store_true',
+                            help='Recria o diretório de telefones a partir de clientes, vendedores e lojas antes.')
+
+    def handle(self, *args, **options):
+        if options['reconstruir']:
+            entradas = reconstruir_diretorio()
+            self.stderr.write(f'Diretório recriado com {entradas} telefones.')
+        with ExitStack() as pilha:
+            try:
+                origem = pilha.enter_context(open(options['arquivo'], encoding='utf-8')) \
+                    if options['arquivo'] else sys.stdin
+                destino = pilha.enter_context(open(options['saida'], 'w', encoding='utf-8', newline='')) \
+                    if options['saida'] else self.stdout
+            except OSError as exc:
+                raise CommandError(exc)
+            escritor = csv.writer(destino)
+            escritor.writerow(['numero', 'e164', 'tipo', 'objeto_id', 'nome'])
+            lote = []
+            for linha in origem:
+                if linha.strip():
+                    lote.append(linha.strip())
+                if len(lote) >= options['tamanho_lote']:
+                    self._escrever(escritor, lote)
+                    lote = []
+            self._escrever(escritor, lote)
+
+    def _escrever(self, escritor, lote):
+        identificados = identificar_lote(lote)
+        for numero in lote:
+            resultado = identificados[numero]
+            for dono in resultado['donos'] or [{'tipo': '', 'objeto_id': '', 'nome': ''}]:
+                escritor.writerow([numero, resultado['e164'] or '', dono['tipo'], dono['objeto_id'], dono['nome']])
@@ -0,0 +1,69 @@
+import os
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from app.facets import reconstruir_facetas
+from app.importer import ArquivoInvalido, abrir_leitor, importar_carros
+from app.jobs import enfileirar
+from app.stats import reconstruir_estatisticas
+
+
+class Command(BaseCommand):
+    help = 'Importa carros de um arquivo CSV, JSON ou JSON Lines, inserindo ou atualizando pela referência.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Caminho do arquivo a importar.')
+        parser.add_argument('--formato', choices=['csv', 'json'], help='Formato do arquivo (padrão: pela extensão).')
+        parser.add_argument('--tamanho-lote', type=int, default=1000, help='Carros gravados por instrução.')
+        parser.add_argument('--sem-resumos', action='store_true',
+                            help='Não recalcula facetas e estatísticas ao final da importação.')
+        parser.add_argument('--em-segundo-plano', action='store_true',
+                            help='Copia o arquivo para o armazenamento padrão, que os workers (run_workers) '
+                                 'de todos os nós precisam alcançar, e enfileira a importação.')
+
+    def handle(self, *args, **options):
+        if options['em_segundo_plano']:
+            # O worker pode estar em outro nó: um caminho local não serviria.
+            try:
+                with open(options['arquivo'], 'rb') as origem:
+                    armazenado = default_storage.save(
+                        f'importacoes/{uuid.uuid4().hex}/{os.path.basename(options["arquivo"])}', File(origem)
+                    )
+            except OSError as exc:
+                raise CommandError(exc)
+            tarefa = enfileirar(
+                'carros.importar', armazenado=armazenado, formato=options['formato'],
+                tamanho_lote=options['tamanho_lote'], resumos=not options['sem_resumos'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'Importação enfileirada como tarefa {tarefa.pk}.'))
+            return
+        try:
+            arquivo, leitor = abrir_leitor(options['arquivo'], options['formato'])
+        except OSError as exc:
+            raise CommandError(exc)
+
+        def ao_gravar_lote(gravados, segundos):
+            self.stdout.write(f'{gravados} carros gravados ({gravados / max(segundos, 1e-9):.0f} linhas/s)')
+
+        def ao_rejeitar(erro):
+            self.stderr.write(f'Linha {erro.numero} rejeitada: {erro.erros}')
+
+        with arquivo:
+            try:
+                gravados, rejeitados = importar_carros(
+                    leitor,
+                    tamanho_lote=options['tamanho_lote'],
+                    ao_gravar_lote=ao_gravar_lote,
+                    ao_rejeitar=ao_rejeitar,
+                )
+            except ArquivoInvalido as exc:
+                # Os lotes anteriores ao erro já foram gravados.
+                raise CommandError(f'Arquivo inválido na {exc}.')
+        # bulk_create não dispara os sinais de Carro que mantêm as tabelas de resumo.
+        if gravados and not options['sem_resumos']:
+            reconstruir_facetas()
+            reconstruir_estatisticas()
+        self.stdout.write(self.style.SUCCESS(f'Importação concluída: {gravados} gravados, {rejeitados} rejeitados.'))
@@ -0,0 +1,61 @@
+import csv
+import os
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.importer import ArquivoInvalido, abrir_leitor
+from app.onboarding import PERFIS, cadastrar_usuarios
+
+
+class Command(BaseCommand):
+    help = (
+        'Cadastra em lote clientes ou vendedores de um arquivo CSV, JSON ou JSON Lines. '
+        'Contas sem senha recebem um convite de primeiro acesso, gravado em CSV com username, email, uid e token.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('perfil', choices=sorted(PERFIS), help='Tipo das contas cadastradas.')
+        parser.add_argument('arquivo', help='Caminho do arquivo a importar.')
+        parser.add_argument('--formato', choices=['csv', 'json'], help='Formato do arquivo (padrão: pela extensão).')
+        parser.add_argument('--convites', help='Arquivo CSV de destino dos convites (padrão: saída padrão).')
+        parser.add_argument('--tamanho-lote', type=int, default=1000, help='Contas gravadas por lote.')
+        parser.add_argument('--processos', type=int,
+                            help='Processos usados para calcular hashes de senhas (padrão: um por CPU).')
+
+    def handle(self, *args, **options):
+        if not os.environ.get('DJANGO_SECRET_KEY'):
+            # Sem ela, settings sorteia uma SECRET_KEY por processo e os
+            # tokens de convite emitidos aqui não seriam aceitos pelo site.
+            raise CommandError('Defina DJANGO_SECRET_KEY com a chave usada pelo site antes de gerar convites.')
+        with ExitStack() as pilha:
+            try:
+                arquivo, leitor = abrir_leitor(options['arquivo'], options['formato'])
+                pilha.enter_context(arquivo)
+                destino = pilha.enter_context(open(options['convites'], 'w', encoding='utf-8', newline='')) \
+                    if options['convites'] else self.stdout
+            except OSError as exc:
+                raise CommandError(exc)
+            escritor = csv.DictWriter(destino, ['username', 'email', 'uid', 'token'])
+            escritor.writeheader()
+
+            def ao_gravar_lote(gravados, segundos):
+                self.stderr.write(f'{gravados} contas gravadas ({gravados / max(segundos, 1e-9):.0f} linhas/s)')
+
+            def ao_rejeitar(erro):
+                self.stderr.write(f'Linha {erro.numero} rejeitada: {erro.erros}')
+
+            try:
+                gravados, rejeitados = cadastrar_usuarios(
+                    options['perfil'],
+                    leitor,
+                    tamanho_lote=options['tamanho_lote'],
+                    processos=options['processos'],
+                    ao_gravar_lote=ao_gravar_lote,
+                    ao_rejeitar=ao_rejeitar,
+                    ao_convidar=escritor.writerow,
+                )
+            except ArquivoInvalido as exc:
+                # Os lotes anteriores ao erro já foram gravados.
+                raise CommandError(f'Arquivo inválido na {exc}.')
+        self.stderr.write(self.style.SUCCESS(f'Cadastro concluído: {gravados} gravados, {rejeitados} rejeitados.'))
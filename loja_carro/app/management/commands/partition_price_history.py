@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError
+
+from app.price_history import particionar_historico
+
+
+class Command(BaseCommand):
+    help = (
+        'Particiona por mês a tabela do histórico de preços (apenas PostgreSQL) e cria as partições dos '
+        'próximos meses. Rode antes de cada mês começar, por exemplo pelo cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--meses-a-frente', type=int, default=3, help='Partições criadas além do mês atual.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Banco a particionar.')
+
+    def handle(self, *args, **options):
+        try:
+            particoes = particionar_historico(options['meses_a_frente'], using=options['database'])
+        except NotSupportedError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f'{len(particoes)} partições garantidas: {", ".join(particoes)}'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from app.photos import processar_pendentes
+
+
+class Command(BaseCommand):
+    help = 'Gera as versões (miniatura, card e completa) das fotos de carros que ainda estão pendentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incluir-erros', action='store_true', help='Tenta de novo as fotos que falharam.')
+
+    def handle(self, *args, **options):
+        def ao_processar(processadas):
+            if processadas % 100 == 0:
+                self.stdout.write(f'{processadas} fotos processadas')
+
+        processadas = processar_pendentes(incluir_erros=options['incluir_erros'], ao_processar=ao_processar)
+        self.stdout.write(self.style.SUCCESS(f'{processadas} fotos prontas.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app.facets import reconstruir_facetas
+from app.models import FacetaCarro
+
+
+class Command(BaseCommand):
+    help = 'Recalcula do zero as contagens de facetas de Carro.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas lidas por lote.')
+
+    def handle(self, *args, **options):
+        reconstruir_facetas(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{FacetaCarro.objects.count()} valores de faceta recalculados.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.sales import reconstruir_vendas_mensais
+
+
+class Command(BaseCommand):
+    help = 'Recalcula do zero os totais mensais de vendas por loja e vendedor.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanho-chunk', type=int, default=50000, help='Ids de venda por intervalo.')
+
+    def handle(self, *args, **options):
+        grupos = reconstruir_vendas_mensais(tamanho_chunk=options['tamanho_chunk'])
+        self.stdout.write(self.style.SUCCESS(f'{grupos} totais mensais de vendas recalculados.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.stats import reconstruir_estatisticas
+
+
+class Command(BaseCommand):
+    help = 'Recalcula do zero as estatísticas de preço e km por marca, modelo e ano.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Threads que agregam intervalos de id em paralelo.')
+        parser.add_argument('--tamanho-chunk', type=int, default=50000, help='Ids por intervalo.')
+
+    def handle(self, *args, **options):
+        grupos = reconstruir_estatisticas(workers=options['workers'], tamanho_chunk=options['tamanho_chunk'])
+        self.stdout.write(self.style.SUCCESS(f'{grupos} grupos de estatística recalculados.'))
@@ -0,0 +1,43 @@
+import json
+import signal
+
+from django.core.management.base import BaseCommand
+
+from app.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas da fila em segundo plano. Pode rodar em vários nós ao mesmo tempo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, help='Tarefas simultâneas (padrão: FILA_WORKERS).')
+        parser.add_argument('--processos', action='store_true',
+                            help='Executa as tarefas em processos em vez de threads (tarefas de CPU).')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre consultas com a fila vazia.')
+        parser.add_argument('--intervalo-metricas', type=float, default=60,
+                            help='Segundos entre as linhas de métricas.')
+        parser.add_argument('--ate-esvaziar', action='store_true',
+                            help='Para quando não houver mais tarefas prontas.')
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concorrencia=options['concorrencia'], processos=options['processos'], intervalo=options['intervalo'],
+        )
+
+        def parar(*args):
+            self.stdout.write('Terminando as tarefas em execução...')
+            worker.parar.set()
+
+        anteriores = {sinal: signal.signal(sinal, parar) for sinal in (signal.SIGINT, signal.SIGTERM)}
+        self.stdout.write(f'Worker {worker.nome} com {worker.concorrencia} '
+                          f'{"processos" if worker.processos else "threads"}.')
+        try:
+            worker.rodar(
+                ate_esvaziar=options['ate_esvaziar'],
+                ao_medir=lambda dados: self.stdout.write(json.dumps(dados)),
+                intervalo_metricas=options['intervalo_metricas'],
+            )
+        finally:
+            for sinal, tratador in anteriores.items():
+                signal.signal(sinal, tratador)
+        self.stdout.write(self.style.SUCCESS(f'{worker.concluidas} tarefas concluídas, {worker.falhas} falhas.'))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.seed import gerar_dados
+
+
+class Command(BaseCommand):
+    help = 'Gera em lote endereços, lojas, vendedores, clientes e carros sintéticos, com semente determinística.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lojas', type=int, default=50)
+        parser.add_argument('--vendedores-por-loja', type=int, default=10)
+        parser.add_argument('--clientes', type=int, default=20000)
+        parser.add_argument('--carros', type=int, default=100000)
+        parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (mesma semente, mesmos dados).')
+        parser.add_argument('--tamanho-lote', type=int, default=2000, help='Linhas por INSERT.')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+
+        def ao_gravar_carros(gravados):
+            if gravados % 50000 == 0 or gravados == options['carros']:
+                self.stdout.write(f'{gravados} carros gravados ({time.perf_counter() - inicio:.1f} s)')
+
+        criados = gerar_dados(
+            lojas=options['lojas'],
+            vendedores_por_loja=options['vendedores_por_loja'],
+            clientes=options['clientes'],
+            carros=options['carros'],
+            semente=options['semente'],
+            tamanho_lote=options['tamanho_lote'],
+            ao_gravar_carros=ao_gravar_carros,
+        )
+        resumo = ', '.join(f'{total} {nome}' for nome, total in criados.items())
+        self.stdout.write(self.style.SUCCESS(f'Criados {resumo} em {time.perf_counter() - inicio:.1f} s.'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='cliente',
+            options={'verbose_name': 'Cliente', 'verbose_name_plural': 'Clientes'},
+        ),
+        migrations.AlterModelOptions(
+            name='vendedor',
+            options={'verbose_name': 'Vendedor', 'verbose_name_plural': 'Vendedores'},
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['marca', 'modelo', 'preco', 'id'], name='carro_marca_modelo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['preco', 'id'], name='carro_preco_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['km', 'id'], name='carro_km_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['cor', 'preco'], name='carro_cor_preco_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['ano'], name='carro_ano_idx'),
+        ),
+    ]
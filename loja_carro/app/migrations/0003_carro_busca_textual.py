@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from app.fulltext import criar_indice_textual, remover_indice_textual
+
+
+def criar(apps, schema_editor):
+    criar_indice_textual(schema_editor.connection)
+
+
+def remover(apps, schema_editor):
+    remover_indice_textual(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_carro_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar, remover),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_carro_busca_textual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetaCarro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimensao', models.CharField(max_length=20)),
+                ('valor', models.CharField(max_length=100)),
+                ('total', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='facetacarro',
+            constraint=models.UniqueConstraint(fields=('dimensao', 'valor'), name='faceta_dimensao_valor_unica'),
+        ),
+    ]
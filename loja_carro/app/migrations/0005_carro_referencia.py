@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+from app.fulltext import criar_indice_textual
+
+
+def recriar_indice_textual(apps, schema_editor):
+    # No SQLite o AddField com unique reconstrói app_carro e descarta os
+    # triggers da busca textual.
+    criar_indice_textual(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_facetacarro'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carro',
+            name='referencia',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True),
+        ),
+        migrations.RunPython(recriar_indice_textual, migrations.RunPython.noop),
+    ]
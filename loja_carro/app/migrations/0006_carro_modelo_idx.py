@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_carro_referencia'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['modelo'], name='carro_modelo_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_carro_modelo_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_ano_idx',
+        ),
+        migrations.AddField(
+            model_name='carro',
+            name='ano_fabricacao',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='carro',
+            name='ano_modelo',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['ano_fabricacao', 'ano_modelo'], name='carro_ano_fabricacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['ano_modelo'], name='carro_ano_modelo_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, transaction
+
+from app.models import separar_ano
+
+TAMANHO_LOTE = 1000
+
+
+def preencher_anos(apps, schema_editor):
+    """
+    Preenche ano_fabricacao e ano_modelo a partir de ano, em lotes por id e
+    com uma transação por lote para não segurar locks na tabela inteira.
+    """
+    Carro = apps.get_model('app', 'Carro')
+    banco = schema_editor.connection.alias
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Carro.objects.using(banco).filter(id__gt=ultimo_id).order_by('id').only('id', 'ano')[:TAMANHO_LOTE]
+        )
+        if not lote:
+            break
+        for carro in lote:
+            carro.ano_fabricacao, carro.ano_modelo = separar_ano(carro.ano)
+        with transaction.atomic(using=banco):
+            Carro.objects.using(banco).bulk_update(lote, ['ano_fabricacao', 'ano_modelo'])
+        ultimo_id = lote[-1].id
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('app', '0007_carro_ano_numerico'),
+    ]
+
+    operations = [
+        migrations.RunPython(preencher_anos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_preencher_ano_numerico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaCarro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marca', models.CharField(max_length=100)),
+                ('modelo', models.CharField(max_length=100)),
+                ('ano', models.IntegerField(default=0)),
+                ('quantidade', models.IntegerField(default=0)),
+                ('soma_preco', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('soma_km', models.BigIntegerField(default=0)),
+                ('histograma_preco', models.JSONField(default=list)),
+                ('histograma_km', models.JSONField(default=list)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='estatisticacarro',
+            constraint=models.UniqueConstraint(fields=('marca', 'modelo', 'ano'), name='estatistica_marca_modelo_ano_unica'),
+        ),
+    ]
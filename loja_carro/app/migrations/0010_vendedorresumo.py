@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_resumos(apps, schema_editor):
+    Vendedor = apps.get_model('app', 'Vendedor')
+    VendedorResumo = apps.get_model('app', 'VendedorResumo')
+    banco = schema_editor.connection.alias
+    vendedores = Vendedor.objects.using(banco).select_related('loja_fk__endereco_fk').order_by('pk')
+    lote = []
+    for vendedor in vendedores.iterator(chunk_size=1000):
+        loja = vendedor.loja_fk
+        lote.append(VendedorResumo(
+            vendedor_id=vendedor.pk,
+            username=vendedor.username,
+            nome=f'{vendedor.first_name} {vendedor.last_name}'.strip() or vendedor.username,
+            email=vendedor.email,
+            telefone=str(vendedor.telefone),
+            loja_id=loja.id,
+            loja_nome=loja.nome,
+            cidade=loja.endereco_fk.cidade,
+            estado=loja.endereco_fk.estado,
+        ))
+        if len(lote) >= 1000:
+            VendedorResumo.objects.using(banco).bulk_create(lote)
+            lote = []
+    VendedorResumo.objects.using(banco).bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_estatisticacarro'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendedorResumo',
+            fields=[
+                ('vendedor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumo', serialize=False, to='app.vendedor')),
+                ('username', models.CharField(max_length=150)),
+                ('nome', models.CharField(max_length=301)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('telefone', models.CharField(max_length=32)),
+                ('loja_nome', models.CharField(max_length=255)),
+                ('cidade', models.CharField(max_length=255)),
+                ('estado', models.CharField(max_length=255)),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.loja_unidade')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'cidade', 'nome'], name='vendedor_resumo_local_idx'), models.Index(fields=['nome'], name='vendedor_resumo_nome_idx')],
+            },
+        ),
+        migrations.RunPython(preencher_resumos, migrations.RunPython.noop),
+    ]
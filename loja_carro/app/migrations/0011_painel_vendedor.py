@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:34
+
+import app.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_vendedorresumo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='vendedor',
+            managers=[
+                ('objects', app.models.VendedorManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['vendedor_fk', '-user_ptr'], name='cliente_vendedor_recente_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(condition=models.Q(('avaliacao__isnull', True), ('avaliacao', ''), _connector='OR'), fields=['vendedor_fk', '-user_ptr'], name='cliente_sem_avaliacao_idx'),
+        ),
+    ]
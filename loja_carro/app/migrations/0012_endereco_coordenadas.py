@@ -0,0 +1,51 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_painel_vendedor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Centroide',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cep_prefixo', models.CharField(blank=True, default='', max_length=5)),
+                ('cidade', models.CharField(max_length=255)),
+                ('uf', models.CharField(max_length=2)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='endereco',
+            name='cep',
+            field=models.CharField(blank=True, max_length=9, null=True),
+        ),
+        migrations.AddField(
+            model_name='endereco',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='endereco',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='endereco',
+            index=models.Index(fields=['latitude', 'longitude'], name='endereco_lat_lon_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='centroide',
+            index=models.Index(fields=['cep_prefixo'], name='centroide_cep_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='centroide',
+            index=models.Index(fields=['uf', 'cidade'], name='centroide_cidade_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:43
+
+from django.db import migrations, models
+
+
+def preencher_diretorio(apps, schema_editor):
+    DiretorioTelefone = apps.get_model('app', 'DiretorioTelefone')
+    banco = schema_editor.connection.alias
+    origens = [
+        ('cliente', apps.get_model('app', 'Cliente')),
+        ('vendedor', apps.get_model('app', 'Vendedor')),
+        ('loja', apps.get_model('app', 'Loja_Unidade')),
+    ]
+    lote = []
+    for tipo, modelo in origens:
+        for objeto in modelo.objects.using(banco).order_by('pk').iterator(chunk_size=1000):
+            if tipo == 'loja':
+                nome = objeto.nome
+            else:
+                nome = f'{objeto.first_name} {objeto.last_name}'.strip() or objeto.username
+            lote.append(DiretorioTelefone(numero=str(objeto.telefone), tipo=tipo, objeto_id=objeto.pk, nome=nome))
+            if len(lote) >= 1000:
+                DiretorioTelefone.objects.using(banco).bulk_create(lote)
+                lote = []
+    DiretorioTelefone.objects.using(banco).bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_endereco_coordenadas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiretorioTelefone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.CharField(max_length=32)),
+                ('tipo', models.CharField(choices=[('cliente', 'Cliente'), ('vendedor', 'Vendedor'), ('loja', 'Loja')], max_length=10)),
+                ('objeto_id', models.IntegerField()),
+                ('nome', models.CharField(max_length=301)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['numero'], name='diretorio_telefone_numero_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='diretoriotelefone',
+            constraint=models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='diretorio_telefone_objeto_unico'),
+        ),
+        migrations.RunPython(preencher_diretorio, migrations.RunPython.noop),
+    ]
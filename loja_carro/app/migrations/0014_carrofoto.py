@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:50
+
+import app.models
+import app.storage
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_diretoriotelefone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarroFoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original', models.FileField(max_length=255, storage=app.storage.armazenamento_fotos, upload_to=app.models.caminho_foto)),
+                ('sha256', models.CharField(editable=False, max_length=64)),
+                ('ordem', models.PositiveSmallIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('pronta', 'Pronta'), ('erro', 'Erro')], default='pendente', editable=False, max_length=10)),
+                ('versoes', models.JSONField(blank=True, default=dict, editable=False)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('carro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fotos', to='app.carro')),
+            ],
+            options={
+                'verbose_name': 'Foto',
+                'verbose_name_plural': 'Fotos',
+                'indexes': [models.Index(fields=['carro', 'ordem', 'id'], name='carro_foto_ordem_idx'), models.Index(fields=['sha256'], name='carro_foto_sha256_idx'), models.Index(condition=models.Q(('status', 'pendente')), fields=['status'], name='carro_foto_pendente_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='carrofoto',
+            constraint=models.UniqueConstraint(fields=('carro', 'sha256'), name='carro_foto_unica'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_carrofoto'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoPreco',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('preco_anterior', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('preco_novo', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('alterado_em', models.DateTimeField(auto_now_add=True)),
+                ('carro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_precos', to='app.carro')),
+            ],
+            options={
+                'verbose_name': 'Histórico de preço',
+                'verbose_name_plural': 'Históricos de preço',
+                'indexes': [models.Index(fields=['alterado_em', 'carro'], name='historico_preco_data_idx'), models.Index(condition=models.Q(('preco_novo__lt', models.F('preco_anterior'))), fields=['alterado_em', 'id'], name='historico_preco_reducao_idx')],
+            },
+        ),
+    ]
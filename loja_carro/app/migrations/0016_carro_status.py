@@ -0,0 +1,132 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+from app.fulltext import criar_indice_textual
+
+
+def recriar_indice_textual(apps, schema_editor):
+    # No SQLite o AddField de status (NOT NULL com default) reconstrói
+    # app_carro e descarta os triggers da busca textual.
+    criar_indice_textual(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_historicopreco'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarroArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('marca', models.CharField(max_length=100)),
+                ('ano', models.CharField(max_length=9)),
+                ('modelo', models.CharField(max_length=100)),
+                ('preco', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('km', models.IntegerField()),
+                ('cor', models.CharField(max_length=100)),
+                ('opcionais', models.TextField(blank=True, max_length=500, null=True)),
+                ('descricao', models.TextField(blank=True, max_length=500, null=True)),
+                ('referencia', models.CharField(blank=True, max_length=50, null=True)),
+                ('ano_fabricacao', models.IntegerField(blank=True, null=True)),
+                ('ano_modelo', models.IntegerField(blank=True, null=True)),
+                ('vendido_em', models.DateTimeField()),
+                ('arquivado_em', models.DateTimeField(auto_now_add=True)),
+                ('historico_precos', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name': 'Carro arquivado',
+                'verbose_name_plural': 'Carros arquivados',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_marca_modelo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_preco_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_km_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_cor_preco_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_modelo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_ano_fabricacao_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_ano_modelo_idx',
+        ),
+        migrations.AddField(
+            model_name='carro',
+            name='status',
+            field=models.CharField(choices=[('disponivel', 'Disponível'), ('reservado', 'Reservado'), ('vendido', 'Vendido')], default='disponivel', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='carro',
+            name='vendido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['marca', 'modelo', 'preco', 'id'], name='carro_marca_modelo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['preco', 'id'], name='carro_preco_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['km', 'id'], name='carro_km_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['cor', 'preco'], name='carro_cor_preco_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['ano_fabricacao', 'ano_modelo'], name='carro_ano_fabricacao_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['ano_modelo'], name='carro_ano_modelo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['modelo'], name='carro_modelo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'disponivel')), fields=['id'], name='carro_disponivel_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(condition=models.Q(('status', 'vendido')), fields=['vendido_em'], name='carro_vendido_em_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carroarquivado',
+            index=models.Index(fields=['vendido_em'], name='carro_arquivado_vendido_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carroarquivado',
+            index=models.Index(fields=['marca', 'modelo'], name='carro_arquivado_modelo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carroarquivado',
+            index=models.Index(fields=['referencia'], name='carro_arquivado_ref_idx'),
+        ),
+        migrations.RunPython(recriar_indice_textual, migrations.RunPython.noop),
+    ]
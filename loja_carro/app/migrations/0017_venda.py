@@ -0,0 +1,48 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_carro_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendaMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('quantidade', models.IntegerField(default=0)),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('soma_anunciado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('soma_descontos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.loja_unidade')),
+                ('vendedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.vendedor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Venda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('preco_anunciado', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('preco_final', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('vendida_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('carro', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='vendas', to='app.carro')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='compras', to='app.cliente')),
+                ('loja', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='vendas', to='app.loja_unidade')),
+                ('vendedor', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='vendas', to='app.vendedor')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['loja', 'vendida_em'], name='venda_loja_data_idx'), models.Index(fields=['vendedor', 'vendida_em'], name='venda_vendedor_data_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='vendamensal',
+            constraint=models.UniqueConstraint(fields=('mes', 'loja', 'vendedor'), name='venda_mensal_unica'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:11
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0017_venda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('argumentos', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=10)),
+                ('tentativas', models.PositiveSmallIntegerField(default=0)),
+                ('max_tentativas', models.PositiveSmallIntegerField(default=5)),
+                ('disponivel_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('reserva', models.CharField(blank=True, editable=False, max_length=64)),
+                ('resultado', models.JSONField(blank=True, editable=False, null=True)),
+                ('erro', models.TextField(blank=True, editable=False)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('concluida_em', models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pendente', 'executando'])), fields=['disponivel_em', 'id'], name='tarefa_fila_idx'), models.Index(condition=models.Q(('concluida_em__isnull', False)), fields=['concluida_em'], name='tarefa_concluida_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:17
+
+from django.db import migrations, models
+
+from app.fulltext import criar_indice_textual
+
+
+def recriar_indice_textual(apps, schema_editor):
+    # No SQLite o AddField de atualizado_em (NOT NULL) reconstrói app_carro e
+    # descarta os triggers da busca textual.
+    criar_indice_textual(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_tarefa'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carro',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='endereco',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='loja_unidade',
+            name='atualizado_em',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['atualizado_em'], name='carro_atualizado_em_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='endereco',
+            index=models.Index(fields=['atualizado_em'], name='endereco_atualizado_em_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loja_unidade',
+            index=models.Index(fields=['atualizado_em'], name='loja_atualizado_em_idx'),
+        ),
+        migrations.RunPython(recriar_indice_textual, migrations.RunPython.noop),
+    ]
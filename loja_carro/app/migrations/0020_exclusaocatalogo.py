@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_atualizado_em'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExclusaoCatalogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('catalogo', models.CharField(max_length=20, unique=True)),
+                ('excluido_em', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:31
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_exclusaocatalogo'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='carro',
+            options={'default_manager_name': 'todos'},
+        ),
+        migrations.AlterModelManagers(
+            name='carro',
+            managers=[
+                ('todos', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
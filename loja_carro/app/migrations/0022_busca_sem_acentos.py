@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:12
+
+from django.db import migrations
+
+from app.fulltext import criar_indice_textual, remover_indice_textual
+
+
+def recriar_coluna_postgres(apps, schema_editor):
+    # A coluna gerada guarda a expressão com que foi criada, e ADD COLUMN IF
+    # NOT EXISTS não a altera: recriar para usar a configuração sem acentos.
+    # O SQLite já remove os acentos no tokenizador.
+    if schema_editor.connection.vendor == 'postgresql':
+        remover_indice_textual(schema_editor.connection)
+        criar_indice_textual(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_carro_manager_padrao'),
+    ]
+
+    operations = [
+        migrations.RunPython(recriar_coluna_postgres, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+def copiar_histogramas(apps, schema_editor):
+    # Uma linha por faixa não vazia dos histogramas em JSON.
+    EstatisticaCarro = apps.get_model('app', 'EstatisticaCarro')
+    FaixaEstatisticaCarro = apps.get_model('app', 'FaixaEstatisticaCarro')
+    faixas = []
+    for estatistica in EstatisticaCarro.objects.iterator(chunk_size=1000):
+        for dimensao, histograma in (('preco', estatistica.histograma_preco), ('km', estatistica.histograma_km)):
+            faixas.extend(
+                FaixaEstatisticaCarro(marca=estatistica.marca, modelo=estatistica.modelo, ano=estatistica.ano,
+                                      dimensao=dimensao, faixa=faixa, quantidade=quantidade)
+                for faixa, quantidade in enumerate(histograma or []) if quantidade
+            )
+    FaixaEstatisticaCarro.objects.bulk_create(faixas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_busca_sem_acentos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaixaEstatisticaCarro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marca', models.CharField(max_length=100)),
+                ('modelo', models.CharField(max_length=100)),
+                ('ano', models.IntegerField(default=0)),
+                ('dimensao', models.CharField(choices=[('preco', 'Preço'), ('km', 'Quilometragem')], max_length=5)),
+                ('faixa', models.PositiveSmallIntegerField()),
+                ('quantidade', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='faixaestatisticacarro',
+            constraint=models.UniqueConstraint(fields=('marca', 'modelo', 'ano', 'dimensao', 'faixa'), name='faixa_estatistica_unica'),
+        ),
+        migrations.RunPython(copiar_histogramas, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='estatisticacarro',
+            name='histograma_km',
+        ),
+        migrations.RemoveField(
+            model_name='estatisticacarro',
+            name='histograma_preco',
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-18 09:40
+
+from django.db import migrations
+
+# A expressão é a mesma que o Django gera para username__istartswith no
+# PostgreSQL, para que o índice sirva à busca do VendedorAdmin.
+CRIAR = (
+    'CREATE INDEX IF NOT EXISTS usuario_username_prefixo '
+    'ON auth_user (UPPER(username::text) text_pattern_ops)'
+)
+REMOVER = 'DROP INDEX IF EXISTS usuario_username_prefixo'
+
+
+def criar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CRIAR)
+
+
+def remover_indice(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_faixaestatisticacarro'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0024_usuario_username_prefixo'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='carro',
+            name='carro_modelo_idx',
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['marca'], name='carro_marca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carro',
+            index=models.Index(fields=['modelo'], name='carro_modelo_idx'),
+        ),
+    ]
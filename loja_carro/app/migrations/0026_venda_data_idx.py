@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_carro_indices_busca_admin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='venda',
+            index=models.Index(fields=['vendida_em'], name='venda_data_idx'),
+        ),
+    ]
@@ -1,7 +1,17 @@
+import hashlib
+import os
+import re
+
+from django.core.exceptions import ValidationError
 from django.db import models
-from django.contrib.auth.models import User
+from django.db.models import Count, F, Prefetch, Q, Window
+from django.db.models.functions import RowNumber
+from django.contrib.auth.models import User, UserManager
+from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
+from PIL import Image, UnidentifiedImageError
 
+from .storage import armazenamento_fotos
 
 
 class Endereco(models.Model):
@@ -13,15 +23,90 @@ class Endereco(models.Model):
         cidade (CharField): A cidade do endereço.
         estado (CharField): O estado do endereço.
         numero (CharField): O número do endereço.
+        cep (CharField): O CEP do endereço (opcional).
+        latitude (FloatField): Latitude em graus, preenchida pelo comando geocode_enderecos (opcional).
+        longitude (FloatField): Longitude em graus, preenchida pelo comando geocode_enderecos (opcional).
+        atualizado_em (DateTimeField): A última alteração, usada na validação de cache das listagens.
     """
     rua = models.CharField(max_length=255)
     cidade = models.CharField(max_length=255)
     estado = models.CharField(max_length=255)
     numero = models.CharField(max_length=255)
+    cep = models.CharField(max_length=9, null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['latitude', 'longitude'], name='endereco_lat_lon_idx'),
+            models.Index(fields=['atualizado_em'], name='endereco_atualizado_em_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.rua
 
+class LojaUnidadeQuerySet(models.QuerySet):
+
+    def nearest(self, lat: float, lon: float, k: int = 5):
+        """
+        Retorna as k lojas mais próximas do ponto, da mais próxima para a mais
+        distante, cada uma com o atributo distancia_km.
+
+        Busca candidatas em uma caixa delimitadora sobre as colunas indexadas
+        de latitude e longitude e calcula a distância exata (haversine) só para
+        elas. A caixa dobra de tamanho até conter k lojas mais próximas que o
+        seu próprio raio, o que garante o resultado exato. Lojas sem
+        coordenadas são ignoradas.
+        """
+        from .geo import RAIO_INICIAL_KM, RAIO_MAXIMO_KM, caixa_delimitadora, haversine_km
+
+        raio = RAIO_INICIAL_KM
+        while True:
+            lat_min, lat_max, lon_min, lon_max = caixa_delimitadora(lat, lon, raio)
+            candidatas = list(self.select_related('endereco_fk').filter(
+                endereco_fk__latitude__range=(lat_min, lat_max),
+                endereco_fk__longitude__range=(lon_min, lon_max),
+            ))
+            for loja in candidatas:
+                endereco = loja.endereco_fk
+                loja.distancia_km = haversine_km(lat, lon, endereco.latitude, endereco.longitude)
+            candidatas.sort(key=lambda loja: loja.distancia_km)
+            proximas = candidatas[:k]
+            if raio >= RAIO_MAXIMO_KM or (len(proximas) == k and proximas[-1].distancia_km <= raio):
+                return proximas
+            raio *= 2
+
+
+class Centroide(models.Model):
+    """
+    Modelo que representa a coordenada de referência de um CEP ou de uma cidade.
+
+    É a tabela local usada para geocodificar endereços sem acesso à rede.
+
+    Atributos:
+        cep_prefixo (CharField): Os cinco primeiros dígitos do CEP, vazio para centroides de cidade.
+        cidade (CharField): O nome da cidade normalizado (minúsculas e sem acentos).
+        uf (CharField): A sigla do estado.
+        latitude (FloatField): Latitude em graus.
+        longitude (FloatField): Longitude em graus.
+    """
+    cep_prefixo = models.CharField(max_length=5, blank=True, default='')
+    cidade = models.CharField(max_length=255)
+    uf = models.CharField(max_length=2)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['cep_prefixo'], name='centroide_cep_idx'),
+            models.Index(fields=['uf', 'cidade'], name='centroide_cidade_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.cidade}/{self.uf}'
+
+
 class Loja_Unidade(models.Model):
     """
     Modelo que representa uma Unidade de Loja.
@@ -32,17 +117,62 @@ class Loja_Unidade(models.Model):
         instagram (CharField): O perfil do Instagram da unidade (opcional).
         facebook (CharField): O perfil do Facebook da unidade (opcional).
         endereco_fk (ForeignKey): Referência ao endereço da unidade.
+        atualizado_em (DateTimeField): A última alteração, usada na validação de cache das listagens.
     """
     nome = models.CharField(max_length=255)
     telefone = PhoneNumberField(unique=True)
     instagram = models.CharField(max_length=255, null=True, blank=True)
     facebook = models.CharField(max_length=255, null=True, blank=True)
     endereco_fk = models.ForeignKey(Endereco, on_delete=models.CASCADE)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    objects = LojaUnidadeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['atualizado_em'], name='loja_atualizado_em_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.nome
 
 
+class VendedorQuerySet(models.QuerySet):
+
+    def com_painel(self, limite_clientes: int = 5):
+        """
+        Anota e pré-carrega os dados do painel de clientes de cada vendedor.
+
+        Cada vendedor recebe total_clientes, total_sem_avaliacao e as listas
+        clientes_recentes e clientes_sem_avaliacao (até limite_clientes cada,
+        mais recentes primeiro). O custo é fixo em três consultas,
+        independentemente do número de vendedores.
+        """
+        sem_avaliacao = Q(cliente__avaliacao__isnull=True) | Q(cliente__avaliacao='')
+        posicao = Window(RowNumber(), partition_by=F('vendedor_fk'), order_by=F('pk').desc())
+        clientes = Cliente.objects.only('pk', 'username', 'first_name', 'last_name', 'avaliacao', 'vendedor_fk')
+        return self.annotate(
+            total_clientes=Count('cliente'),
+            total_sem_avaliacao=Count('cliente', filter=sem_avaliacao),
+        ).prefetch_related(
+            Prefetch(
+                'cliente_set',
+                queryset=clientes.annotate(posicao=posicao).filter(posicao__lte=limite_clientes).order_by('-pk'),
+                to_attr='clientes_recentes',
+            ),
+            Prefetch(
+                'cliente_set',
+                queryset=clientes.filter(Q(avaliacao__isnull=True) | Q(avaliacao=''))
+                .annotate(posicao=posicao).filter(posicao__lte=limite_clientes).order_by('-pk'),
+                to_attr='clientes_sem_avaliacao',
+            ),
+        )
+
+
+class VendedorManager(UserManager.from_queryset(VendedorQuerySet)):
+    pass
+
+
 class Vendedor(User):
     """
     Modelo que representa um Vendedor.
@@ -58,6 +188,8 @@ class Vendedor(User):
     facebook = models.CharField(max_length=255, null=True, blank=True)
     loja_fk = models.ForeignKey(Loja_Unidade, on_delete=models.CASCADE)
 
+    objects = VendedorManager()
+
     class Meta:
         verbose_name = "Vendedor"
         verbose_name_plural = "Vendedores"
@@ -65,20 +197,279 @@ class Vendedor(User):
     def __str__(self) -> str:
         return super().__str__()
     
+
+def separar_ano(ano):
+    """
+    Separa o texto de ano de um carro em (ano de fabricação, ano do modelo).
+
+    Aceita "2019/2020", "2020" e a forma abreviada "19/20". Quando há um só
+    ano, ele vale para os dois. Retorna (None, None) se o texto não tiver anos.
+    """
+    anos = []
+    for parte in re.findall(r'\d+', ano or '')[:2]:
+        valor = int(parte)
+        if len(parte) == 2:
+            valor += 2000 if valor <= 50 else 1900
+        anos.append(valor)
+    if not anos:
+        return None, None
+    return anos[0], anos[-1]
+
+
+class CarroQuerySet(models.QuerySet):
+
+    def ano_entre(self, ano_min=None, ano_max=None, campo='ano_fabricacao'):
+        """
+        Filtra por um intervalo de anos usando as colunas inteiras indexadas.
+
+        Parâmetros:
+            ano_min (int): Ano mínimo, inclusive (opcional).
+            ano_max (int): Ano máximo, inclusive (opcional).
+            campo (str): 'ano_fabricacao' ou 'ano_modelo'.
+        """
+        if campo not in ('ano_fabricacao', 'ano_modelo'):
+            raise ValueError(f'Campo de ano inválido: {campo}')
+        queryset = self
+        if ano_min is not None:
+            queryset = queryset.filter(**{f'{campo}__gte': ano_min})
+        if ano_max is not None:
+            queryset = queryset.filter(**{f'{campo}__lte': ano_max})
+        return queryset
+
+    def disponiveis(self):
+        """
+        Só os carros à venda, a condição dos índices parciais de busca.
+        """
+        return self.filter(status=Carro.DISPONIVEL)
+
+    def vendidos(self):
+        return self.filter(status=Carro.VENDIDO)
+
+
+class CarroManager(models.Manager.from_queryset(CarroQuerySet)):
+    """
+    Manager Carro.objects: só o estoque (disponíveis e reservados), sem os
+    vendidos que ainda não foram arquivados. O manager padrão do modelo é
+    Carro.todos, que inclui os vendidos, para que a validação de unicidade,
+    os formulários e o admin vejam todas as linhas.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().exclude(status=Carro.VENDIDO)
+
+
+# Condição dos índices parciais: as buscas do inventário só veem carros à venda.
+CARRO_DISPONIVEL = Q(status='disponivel')
+
+
 class Carro(models.Model):
     """
     Modelo que representa um Carro.
 
     Atributos:
         marca (CharField): A marca do carro.
-        ano (CharField): O ano de fabricação do carro.
+        ano (CharField): O ano do carro como anunciado, por exemplo "2019/2020".
         modelo (CharField): O modelo do carro.
         preco (DecimalField): O preço do carro.
         km (IntegerField): A quilometragem do carro.
         cor (CharField): A cor do carro.
         opcionais (TextField): Os opcionais do carro, descrição até 500 caracteres (opcional).
         descricao (TextField): Descrição adicional do carro, até 500 caracteres (opcional).
+        referencia (CharField): Código do carro no estoque da loja de origem, único; usado
+            como chave pelas importações (opcional).
+        ano_fabricacao (IntegerField): Ano de fabricação, extraído de ano ao salvar.
+        ano_modelo (IntegerField): Ano do modelo, extraído de ano ao salvar.
+        status (CharField): 'disponivel', 'reservado' ou 'vendido'.
+        vendido_em (DateTimeField): Quando o carro foi marcado como vendido,
+            preenchido ao salvar; os vendidos há muito tempo vão para CarroArquivado.
+        atualizado_em (DateTimeField): A última alteração do carro ou de suas
+            fotos, usada na validação de cache das listagens.
+    """
+    DISPONIVEL = 'disponivel'
+    RESERVADO = 'reservado'
+    VENDIDO = 'vendido'
+    STATUS = [(DISPONIVEL, 'Disponível'), (RESERVADO, 'Reservado'), (VENDIDO, 'Vendido')]
+
+    marca = models.CharField(max_length=100)
+    ano = models.CharField(max_length=9)
+    modelo = models.CharField(max_length=100)
+    preco = models.DecimalField(max_digits=10, decimal_places=2)
+    km = models.IntegerField()
+    cor = models.CharField(max_length=100)
+    opcionais = models.TextField(max_length=500, null=True, blank=True)
+    descricao = models.TextField(max_length=500, null=True, blank=True)
+    referencia = models.CharField(max_length=50, unique=True, null=True, blank=True)
+    ano_fabricacao = models.IntegerField(null=True, blank=True, editable=False)
+    ano_modelo = models.IntegerField(null=True, blank=True, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS, default=DISPONIVEL)
+    vendido_em = models.DateTimeField(null=True, blank=True, editable=False)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    objects = CarroManager()
+    todos = CarroQuerySet.as_manager()
+
+    class Meta:
+        default_manager_name = 'todos'
+        indexes = [
+            models.Index(fields=['marca', 'modelo', 'preco', 'id'], name='carro_marca_modelo_idx',
+                         condition=CARRO_DISPONIVEL),
+            models.Index(fields=['preco', 'id'], name='carro_preco_id_idx', condition=CARRO_DISPONIVEL),
+            models.Index(fields=['km', 'id'], name='carro_km_id_idx', condition=CARRO_DISPONIVEL),
+            models.Index(fields=['cor', 'preco'], name='carro_cor_preco_idx', condition=CARRO_DISPONIVEL),
+            models.Index(fields=['ano_fabricacao', 'ano_modelo'], name='carro_ano_fabricacao_idx',
+                         condition=CARRO_DISPONIVEL),
+            models.Index(fields=['ano_modelo'], name='carro_ano_modelo_idx', condition=CARRO_DISPONIVEL),
+            # Sem condição: a busca do admin (referencia, marca ou modelo exatos) percorre
+            # também os vendidos; referencia já tem o índice único.
+            models.Index(fields=['marca'], name='carro_marca_idx'),
+            models.Index(fields=['modelo'], name='carro_modelo_idx'),
+            # Ordenação 'recentes' da busca.
+            models.Index(fields=['id'], name='carro_disponivel_id_idx', condition=CARRO_DISPONIVEL),
+            # Candidatos ao arquivamento.
+            models.Index(fields=['vendido_em'], name='carro_vendido_em_idx', condition=Q(status='vendido')),
+            # Validação de cache das listagens (app.conditional); cobre também os vendidos,
+            # para que a saída de um carro do estoque mude a data.
+            models.Index(fields=['atualizado_em'], name='carro_atualizado_em_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return self.marca
+
+    def preencher_anos(self):
+        """
+        Atualiza ano_fabricacao e ano_modelo a partir do texto em ano.
+        """
+        self.ano_fabricacao, self.ano_modelo = separar_ano(self.ano)
+
+    def save(self, *args, **kwargs):
+        self.preencher_anos()
+        if self.status == self.VENDIDO:
+            self.vendido_em = self.vendido_em or timezone.now()
+        else:
+            self.vendido_em = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'ano' in update_fields:
+            update_fields = {*update_fields, 'ano_fabricacao', 'ano_modelo'}
+        if update_fields is not None and 'status' in update_fields:
+            update_fields = {*update_fields, 'vendido_em'}
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, 'atualizado_em'}
+        super().save(*args, **kwargs)
+
+def caminho_foto(instance, filename) -> str:
+    """
+    Nome do original de uma foto, derivado do hash do conteúdo.
     """
+    extensao = os.path.splitext(filename)[1].lower() or '.jpg'
+    return f'originais/{instance.sha256[:2]}/{instance.sha256}{extensao}'
+
+
+class CarroFoto(models.Model):
+    """
+    Modelo que representa uma foto de um Carro.
+
+    O arquivo é guardado pelo hash do conteúdo, então enviar a mesma imagem
+    de novo, no mesmo carro ou em outro, não duplica o arquivo nem as versões
+    redimensionadas, que são geradas uma vez em segundo plano (ver app.photos).
+
+    Atributos:
+        carro (ForeignKey): O carro fotografado.
+        original (FileField): O arquivo enviado.
+        sha256 (CharField): O hash SHA-256 do conteúdo, calculado ao salvar.
+        ordem (PositiveSmallIntegerField): A posição da foto na galeria; a menor é a capa.
+        status (CharField): 'pendente' até as versões serem geradas, depois 'pronta' ou 'erro'.
+        versoes (JSONField): Nome, largura e altura de cada versão (miniatura, card, completa).
+        criada_em (DateTimeField): Quando a foto foi enviada.
+    """
+    PENDENTE = 'pendente'
+    PRONTA = 'pronta'
+    ERRO = 'erro'
+    STATUS = [(PENDENTE, 'Pendente'), (PRONTA, 'Pronta'), (ERRO, 'Erro')]
+
+    carro = models.ForeignKey(Carro, on_delete=models.CASCADE, related_name='fotos')
+    original = models.FileField(upload_to=caminho_foto, storage=armazenamento_fotos, max_length=255)
+    sha256 = models.CharField(max_length=64, editable=False)
+    ordem = models.PositiveSmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS, default=PENDENTE, editable=False)
+    versoes = models.JSONField(default=dict, blank=True, editable=False)
+    criada_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Foto"
+        verbose_name_plural = "Fotos"
+        indexes = [
+            models.Index(fields=['carro', 'ordem', 'id'], name='carro_foto_ordem_idx'),
+            models.Index(fields=['sha256'], name='carro_foto_sha256_idx'),
+            models.Index(fields=['status'], name='carro_foto_pendente_idx', condition=Q(status='pendente')),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['carro', 'sha256'], name='carro_foto_unica'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.carro} #{self.ordem}'
+
+    def calcular_hash(self):
+        """
+        Preenche sha256 a partir do conteúdo do arquivo, lido em blocos.
+        """
+        digest = hashlib.sha256()
+        self.original.open('rb')
+        self.original.seek(0)
+        for bloco in self.original.chunks():
+            digest.update(bloco)
+        self.original.seek(0)
+        self.sha256 = digest.hexdigest()
+
+    def verificar_imagem(self):
+        """
+        Levanta ValidationError se o arquivo não for uma imagem que o Pillow consiga ler.
+        """
+        self.original.open('rb')
+        self.original.seek(0)
+        try:
+            with Image.open(self.original) as imagem:
+                imagem.verify()
+        except (UnidentifiedImageError, OSError) as exc:
+            raise ValidationError({'original': 'O arquivo enviado não é uma imagem válida.'}) from exc
+        finally:
+            self.original.seek(0)
+
+    def clean(self):
+        # Só arquivos recém-enviados (pelo admin, por exemplo); sha256 não é
+        # editável, então a restrição carro_foto_unica não é validada pelo formulário.
+        if not self.original or self.original._committed:
+            return
+        self.verificar_imagem()
+        anterior = self.sha256
+        self.calcular_hash()
+        if self.carro_id is not None and CarroFoto.objects.filter(carro_id=self.carro_id, sha256=self.sha256) \
+                .exclude(pk=self.pk).exists():
+            raise ValidationError({'original': 'Este carro já tem esta foto.'})
+        if self.pk is not None and self.sha256 != anterior:
+            # Arquivo substituído: as versões antigas são de outra imagem.
+            self.status, self.versoes = CarroFoto.PENDENTE, {}
+
+    def save(self, *args, **kwargs):
+        if not self.sha256:
+            self.calcular_hash()
+        super().save(*args, **kwargs)
+
+
+class CarroArquivado(models.Model):
+    """
+    Modelo que guarda os carros vendidos há muito tempo, retirados de
+    app_carro pelo comando archive_sold para que as consultas do estoque não
+    passem por eles. Mantém o id original.
+
+    Atributos:
+        Os mesmos campos de Carro, além de:
+        vendido_em (DateTimeField): Quando o carro foi vendido.
+        arquivado_em (DateTimeField): Quando o carro foi arquivado.
+        historico_precos (JSONField): As alterações de preço do carro, com
+            alterado_em, preco_anterior e preco_novo.
+    """
+    id = models.BigIntegerField(primary_key=True)
     marca = models.CharField(max_length=100)
     ano = models.CharField(max_length=9)
     modelo = models.CharField(max_length=100)
@@ -87,10 +478,62 @@ class Carro(models.Model):
     cor = models.CharField(max_length=100)
     opcionais = models.TextField(max_length=500, null=True, blank=True)
     descricao = models.TextField(max_length=500, null=True, blank=True)
+    referencia = models.CharField(max_length=50, null=True, blank=True)
+    ano_fabricacao = models.IntegerField(null=True, blank=True)
+    ano_modelo = models.IntegerField(null=True, blank=True)
+    vendido_em = models.DateTimeField()
+    arquivado_em = models.DateTimeField(auto_now_add=True)
+    historico_precos = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        verbose_name = "Carro arquivado"
+        verbose_name_plural = "Carros arquivados"
+        indexes = [
+            models.Index(fields=['vendido_em'], name='carro_arquivado_vendido_idx'),
+            models.Index(fields=['marca', 'modelo'], name='carro_arquivado_modelo_idx'),
+            models.Index(fields=['referencia'], name='carro_arquivado_ref_idx'),
+        ]
 
     def __str__(self) -> str:
         return self.marca
 
+
+class HistoricoPreco(models.Model):
+    """
+    Modelo que registra cada alteração do preço de um Carro. Só recebe
+    inserções: uma linha por mudança efetiva de preço (ver app.price_history).
+
+    No PostgreSQL a tabela pode ser particionada por mês com o comando
+    partition_price_history.
+
+    Atributos:
+        carro (ForeignKey): O carro cujo preço mudou.
+        preco_anterior (DecimalField): O preço antes da alteração.
+        preco_novo (DecimalField): O preço depois da alteração.
+        alterado_em (DateTimeField): Quando a alteração foi gravada.
+    """
+    carro = models.ForeignKey(Carro, on_delete=models.CASCADE, related_name='historico_precos')
+    preco_anterior = models.DecimalField(max_digits=10, decimal_places=2)
+    preco_novo = models.DecimalField(max_digits=10, decimal_places=2)
+    alterado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Histórico de preço"
+        verbose_name_plural = "Históricos de preço"
+        indexes = [
+            models.Index(fields=['alterado_em', 'carro'], name='historico_preco_data_idx'),
+            # O feed de reduções lê só o fim deste índice, sem olhar os aumentos.
+            models.Index(
+                fields=['alterado_em', 'id'],
+                name='historico_preco_reducao_idx',
+                condition=Q(preco_novo__lt=F('preco_anterior')),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.carro}: {self.preco_anterior} -> {self.preco_novo}'
+
+
 class Cliente(User):
     """
     Modelo que representa um Cliente.
@@ -109,6 +552,360 @@ class Cliente(User):
     class Meta:
         verbose_name = "Cliente"
         verbose_name_plural = "Clientes"
+        indexes = [
+            # Clientes mais recentes de cada vendedor (o pk cresce com o cadastro).
+            models.Index(fields=['vendedor_fk', '-user_ptr'], name='cliente_vendedor_recente_idx'),
+            models.Index(
+                fields=['vendedor_fk', '-user_ptr'],
+                name='cliente_sem_avaliacao_idx',
+                condition=Q(avaliacao__isnull=True) | Q(avaliacao=''),
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return super().__str__()
+
+
+class FacetaCarro(models.Model):
+    """
+    Modelo que guarda a contagem de carros por valor de faceta.
+
+    É uma tabela de resumo mantida incrementalmente pelos sinais de Carro
+    (ver app.facets), para que as contagens da busca não exijam um GROUP BY
+    sobre toda a tabela de carros.
+
+    Atributos:
+        dimensao (CharField): A faceta (marca, cor, ano ou faixa_preco).
+        valor (CharField): O valor da faceta, por exemplo "Toyota" ou "50000-75000".
+        total (IntegerField): Quantos carros têm esse valor.
+    """
+    dimensao = models.CharField(max_length=20)
+    valor = models.CharField(max_length=100)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimensao', 'valor'], name='faceta_dimensao_valor_unica'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.dimensao}={self.valor}'
+
+
+class ExclusaoCatalogo(models.Model):
+    """
+    Modelo que guarda quando um registro listado em um catálogo foi
+    excluído pela última vez. Uma exclusão não muda o máximo de
+    atualizado_em, então os validadores de app.conditional também leem esta data.
+
+    Atributos:
+        catalogo (CharField): 'carros' ou 'lojas'.
+        excluido_em (DateTimeField): A data da exclusão mais recente.
+    """
+    catalogo = models.CharField(max_length=20, unique=True)
+    excluido_em = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return self.catalogo
+
+
+class EstatisticaCarro(models.Model):
+    """
+    Modelo que guarda agregados de preço e quilometragem por marca, modelo e ano.
+
+    As linhas são atualizadas incrementalmente pelos sinais de Carro (ver
+    app.stats), com UPDATEs relativos que não bloqueiam a linha para leitura.
+    Os histogramas ficam em FaixaEstatisticaCarro.
+
+    Atributos:
+        marca (CharField): A marca dos carros do grupo.
+        modelo (CharField): O modelo dos carros do grupo.
+        ano (IntegerField): O ano de fabricação dos carros do grupo, 0 quando desconhecido.
+        quantidade (IntegerField): Quantos carros há no grupo.
+        soma_preco (DecimalField): Soma dos preços, para a média.
+        soma_km (BigIntegerField): Soma das quilometragens, para a média.
+    """
+    marca = models.CharField(max_length=100)
+    modelo = models.CharField(max_length=100)
+    ano = models.IntegerField(default=0)
+    quantidade = models.IntegerField(default=0)
+    soma_preco = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    soma_km = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['marca', 'modelo', 'ano'], name='estatistica_marca_modelo_ano_unica'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.marca} {self.modelo} {self.ano}'
+
+
+class FaixaEstatisticaCarro(models.Model):
+    """
+    Modelo que guarda quantos carros de um grupo de EstatisticaCarro caem em
+    uma faixa do histograma de preço ou de quilometragem.
+
+    Uma linha por faixa, e não o histograma inteiro em uma coluna, para que
+    incluir ou excluir um carro incremente um contador em vez de reescrever
+    o histograma. As faixas são fixas (ver app.stats), então as contagens
+    podem ser somadas entre grupos e decrementadas em exclusões.
+
+    Atributos:
+        marca (CharField): A marca dos carros do grupo.
+        modelo (CharField): O modelo dos carros do grupo.
+        ano (IntegerField): O ano de fabricação dos carros do grupo, 0 quando desconhecido.
+        dimensao (CharField): 'preco' ou 'km'.
+        faixa (PositiveSmallIntegerField): O índice da faixa em LIMITES_PRECO ou LIMITES_KM.
+        quantidade (IntegerField): Quantos carros do grupo estão na faixa.
+    """
+    PRECO = 'preco'
+    KM = 'km'
+    DIMENSOES = [(PRECO, 'Preço'), (KM, 'Quilometragem')]
+
+    marca = models.CharField(max_length=100)
+    modelo = models.CharField(max_length=100)
+    ano = models.IntegerField(default=0)
+    dimensao = models.CharField(max_length=5, choices=DIMENSOES)
+    faixa = models.PositiveSmallIntegerField()
+    quantidade = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['marca', 'modelo', 'ano', 'dimensao', 'faixa'], name='faixa_estatistica_unica'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.marca} {self.modelo} {self.ano} {self.dimensao} #{self.faixa}'
+
+
+class VendedorResumoQuerySet(models.QuerySet):
+
+    def buscar(self, cidade=None, estado=None, loja=None, nome=None):
+        """
+        Filtra os vendedores por localização, loja e início do nome, sem joins.
+
+        Parâmetros:
+            cidade (str): A cidade da loja (opcional).
+            estado (str): O estado da loja (opcional).
+            loja (Loja_Unidade ou int): A loja ou seu id (opcional).
+            nome (str): Prefixo do nome do vendedor (opcional).
+        """
+        queryset = self
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        if cidade:
+            queryset = queryset.filter(cidade=cidade)
+        if loja is not None:
+            queryset = queryset.filter(loja=loja)
+        if nome:
+            queryset = queryset.filter(nome__startswith=nome)
+        return queryset.order_by('nome', 'vendedor_id')
+
+
+class VendedorResumo(models.Model):
+    """
+    Modelo de leitura com os dados de um Vendedor já unidos aos da loja e do endereço.
+
+    Evita os joins com auth_user, Loja_Unidade e Endereco na busca de
+    vendedores. É mantido pelos sinais de Vendedor, Loja_Unidade e Endereco
+    (ver app.read_models) e conferido pelo comando check_vendedor_resumo.
+
+    Atributos:
+        vendedor (OneToOneField): O vendedor resumido, também chave primária.
+        username (CharField): O nome de usuário do vendedor.
+        nome (CharField): O nome completo do vendedor (ou o username, se vazio).
+        email (CharField): O e-mail do vendedor.
+        telefone (CharField): O telefone do vendedor no formato E.164.
+        loja (ForeignKey): A unidade em que o vendedor trabalha.
+        loja_nome (CharField): O nome da unidade.
+        cidade (CharField): A cidade do endereço da unidade.
+        estado (CharField): O estado do endereço da unidade.
+    """
+    vendedor = models.OneToOneField(Vendedor, on_delete=models.CASCADE, primary_key=True, related_name='resumo')
+    username = models.CharField(max_length=150)
+    nome = models.CharField(max_length=301)
+    email = models.CharField(max_length=254, blank=True)
+    telefone = models.CharField(max_length=32)
+    loja = models.ForeignKey(Loja_Unidade, on_delete=models.CASCADE, related_name='+')
+    loja_nome = models.CharField(max_length=255)
+    cidade = models.CharField(max_length=255)
+    estado = models.CharField(max_length=255)
+
+    objects = VendedorResumoQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'cidade', 'nome'], name='vendedor_resumo_local_idx'),
+            models.Index(fields=['nome'], name='vendedor_resumo_nome_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return self.nome
+
+
+class DiretorioTelefone(models.Model):
+    """
+    Lista telefônica única de clientes, vendedores e lojas, para identificar
+    quem está ligando com uma consulta a um único índice.
+
+    É mantida pelos sinais de Cliente, Vendedor e Loja_Unidade (ver app.callerid).
+
+    Atributos:
+        numero (CharField): O telefone no formato E.164.
+        tipo (CharField): O tipo do dono do telefone: 'cliente', 'vendedor' ou 'loja'.
+        objeto_id (IntegerField): A chave primária do dono do telefone.
+        nome (CharField): O nome do dono, para exibição sem consultar o modelo de origem.
+    """
+    CLIENTE = 'cliente'
+    VENDEDOR = 'vendedor'
+    LOJA = 'loja'
+    TIPOS = [(CLIENTE, 'Cliente'), (VENDEDOR, 'Vendedor'), (LOJA, 'Loja')]
+
+    numero = models.CharField(max_length=32)
+    tipo = models.CharField(max_length=10, choices=TIPOS)
+    objeto_id = models.IntegerField()
+    nome = models.CharField(max_length=301)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['numero'], name='diretorio_telefone_numero_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'objeto_id'], name='diretorio_telefone_objeto_unico'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.numero} ({self.tipo})'
+
+
+class Venda(models.Model):
+    """
+    Modelo que representa a venda de um Carro a um Cliente por um Vendedor.
+
+    É mantido em VendaMensal pelos sinais de Venda (ver app.sales). A loja
+    é a do vendedor no momento da venda, para que transferências posteriores
+    não mudem os relatórios de meses passados.
+
+    Atributos:
+        carro (ForeignKey): O carro vendido. Sem restrição no banco: depois de
+            arquivado, o id passa a apontar para CarroArquivado.
+        cliente (ForeignKey): O comprador.
+        vendedor (ForeignKey): Quem fechou a venda.
+        loja (ForeignKey): A unidade do vendedor na data da venda.
+        preco_anunciado (DecimalField): O preço do carro quando foi vendido.
+        preco_final (DecimalField): O valor efetivamente pago.
+        vendida_em (DateTimeField): A data da venda.
+    """
+    carro = models.ForeignKey(Carro, on_delete=models.DO_NOTHING, db_constraint=False, related_name='vendas')
+    cliente = models.ForeignKey(Cliente, on_delete=models.PROTECT, related_name='compras')
+    vendedor = models.ForeignKey(Vendedor, on_delete=models.PROTECT, related_name='vendas')
+    loja = models.ForeignKey(Loja_Unidade, on_delete=models.PROTECT, related_name='vendas')
+    preco_anunciado = models.DecimalField(max_digits=10, decimal_places=2)
+    preco_final = models.DecimalField(max_digits=10, decimal_places=2)
+    vendida_em = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['loja', 'vendida_em'], name='venda_loja_data_idx'),
+            models.Index(fields=['vendedor', 'vendida_em'], name='venda_vendedor_data_idx'),
+            # date_hierarchy do admin, sem filtro de loja ou vendedor.
+            models.Index(fields=['vendida_em'], name='venda_data_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.carro_id} -> {self.cliente_id}'
+
+    @property
+    def desconto(self):
+        return self.preco_anunciado - self.preco_final
+
+
+class VendaMensal(models.Model):
+    """
+    Modelo de resumo com os totais de vendas de cada vendedor, em cada loja,
+    por mês. Guarda somas em vez de médias, para que cada venda seja aplicada
+    com um incremento e os lotes de uma reconstrução possam ser somados.
+
+    Atributos:
+        mes (DateField): O primeiro dia do mês, no fuso de TIME_ZONE.
+        loja (ForeignKey): A unidade.
+        vendedor (ForeignKey): O vendedor.
+        quantidade (IntegerField): Quantas vendas.
+        receita (DecimalField): A soma dos preços finais.
+        soma_anunciado (DecimalField): A soma dos preços anunciados.
+        soma_descontos (DecimalField): A soma dos descontos (anunciado - final).
+    """
+    mes = models.DateField()
+    loja = models.ForeignKey(Loja_Unidade, on_delete=models.CASCADE, related_name='+')
+    vendedor = models.ForeignKey(Vendedor, on_delete=models.CASCADE, related_name='+')
+    quantidade = models.IntegerField(default=0)
+    receita = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    soma_anunciado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    soma_descontos = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['mes', 'loja', 'vendedor'], name='venda_mensal_unica'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.mes:%Y-%m} {self.vendedor_id}'
+
+
+TAREFA_NA_FILA = Q(status__in=['pendente', 'executando'])
+
+
+class Tarefa(models.Model):
+    """
+    Modelo que representa um trabalho em segundo plano, executado pelos
+    workers do comando run_workers (ver app.jobs).
+
+    Uma tarefa em execução guarda em disponivel_em o fim do prazo de
+    visibilidade: se o worker morrer sem concluí-la, ela volta a ser
+    reservada depois desse prazo. A reserva identifica quem a executa, para
+    que um worker que perdeu o prazo não grave o resultado de outro.
+
+    Atributos:
+        nome (CharField): O nome com que a função foi registrada em app.jobs.
+        argumentos (JSONField): Os argumentos nomeados da função.
+        status (CharField): pendente, executando, concluida ou falhou.
+        tentativas (PositiveSmallIntegerField): Quantas vezes foi reservada.
+        max_tentativas (PositiveSmallIntegerField): O limite de tentativas.
+        disponivel_em (DateTimeField): Quando pode ser reservada (de novo).
+        reserva (CharField): O token da reserva atual.
+        resultado (JSONField): O valor retornado pela função.
+        erro (TextField): O traceback da última falha.
+        criada_em (DateTimeField): Quando foi enfileirada.
+        concluida_em (DateTimeField): Quando terminou, com sucesso ou não.
+    """
+    PENDENTE = 'pendente'
+    EXECUTANDO = 'executando'
+    CONCLUIDA = 'concluida'
+    FALHOU = 'falhou'
+    STATUS = [(PENDENTE, 'Pendente'), (EXECUTANDO, 'Executando'), (CONCLUIDA, 'Concluída'), (FALHOU, 'Falhou')]
+
+    nome = models.CharField(max_length=100)
+    argumentos = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS, default=PENDENTE)
+    tentativas = models.PositiveSmallIntegerField(default=0)
+    max_tentativas = models.PositiveSmallIntegerField(default=5)
+    disponivel_em = models.DateTimeField(default=timezone.now)
+    reserva = models.CharField(max_length=64, blank=True, editable=False)
+    resultado = models.JSONField(null=True, blank=True, editable=False)
+    erro = models.TextField(blank=True, editable=False)
+    criada_em = models.DateTimeField(auto_now_add=True)
+    concluida_em = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # A fila: só as tarefas pendentes ou em execução, na ordem em que são reservadas.
+            models.Index(fields=['disponivel_em', 'id'], name='tarefa_fila_idx', condition=TAREFA_NA_FILA),
+            models.Index(fields=['concluida_em'], name='tarefa_concluida_idx',
+                         condition=Q(concluida_em__isnull=False)),
+        ]
 
     def __str__(self) -> str:
-        return super().__str__()
\ No newline at end of file
+        return f'{self.nome} ({self.status})'
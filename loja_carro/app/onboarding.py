@@ -0,0 +1,265 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+from django.utils.encoding import force_bytes
+from django.utils.http import base36_to_int, urlsafe_base64_encode
+
+from . import callerid, senhas
+from .bulk import inserir_herdados
+from .importer import LinhaInvalida
+from .models import Cliente, Loja_Unidade, Vendedor, VendedorResumo
+from .read_models import valores_resumo
+
+CAMPOS_USUARIO = ('username', 'email', 'first_name', 'last_name')
+
+# Para cada perfil: o modelo, os campos lidos da linha e a coluna com o id
+# do registro relacionado (o vendedor do cliente ou a loja do vendedor).
+PERFIS = {
+    'cliente': (Cliente, CAMPOS_USUARIO + ('telefone', 'data_nascimento', 'avaliacao'), 'vendedor_id', 'vendedor_fk'),
+    'vendedor': (Vendedor, CAMPOS_USUARIO + ('telefone', 'instagram', 'facebook'), 'loja_id', 'loja_fk'),
+}
+
+# Abaixo disso o custo de iniciar os processos supera o ganho de paralelizar.
+MINIMO_PARA_PROCESSOS = 8
+
+
+class GeradorConvite(PasswordResetTokenGenerator):
+    """
+    Tokens de convite para o primeiro acesso de contas criadas sem senha.
+
+    Como os tokens de redefinição de senha do Django, não são guardados no
+    banco: dependem da senha e do último login, então deixam de valer assim
+    que a senha é definida. A validade vem de CONVITE_VALIDADE_DIAS.
+    """
+    key_salt = 'app.onboarding.GeradorConvite'
+
+    def check_token(self, user, token):
+        if not (user and token):
+            return False
+        try:
+            timestamp = base36_to_int(token.split('-')[0])
+        except ValueError:
+            return False
+        if self._num_seconds(self._now()) - timestamp > settings.CONVITE_VALIDADE_DIAS * 24 * 60 * 60:
+            return False
+        return any(
+            constant_time_compare(self._make_token_with_timestamp(user, timestamp, segredo), token)
+            for segredo in [self.secret, *self.secret_fallbacks]
+        )
+
+
+gerador_convite = GeradorConvite()
+
+
+def gerar_convite(usuario) -> dict:
+    """
+    O uid e o token que o link de primeiro acesso (app:ativar_conta) espera.
+    """
+    return {
+        'username': usuario.username,
+        'email': usuario.email,
+        'uid': urlsafe_base64_encode(force_bytes(usuario.pk)),
+        'token': gerador_convite.make_token(usuario),
+    }
+
+
+def calcular_hashes(lista: list, executor=None, processos: int = 1) -> list:
+    """
+    Aplica make_password a cada senha, dividindo o trabalho entre os processos
+    do executor quando houver um e a lista for grande o bastante.
+    """
+    if executor is None or len(lista) < MINIMO_PARA_PROCESSOS:
+        return senhas.calcular_hashes(lista)
+    tamanho = -(-len(lista) // processos)
+    partes = [lista[inicio:inicio + tamanho] for inicio in range(0, len(lista), tamanho)]
+    return [senha for parte in executor.map(senhas.calcular_hashes, partes) for senha in parte]
+
+
+def validar_linha(perfil: str, numero: int, linha: dict):
+    """
+    Converte uma linha em um Cliente ou Vendedor não salvo, validando os
+    campos que não dependem do banco. Levanta LinhaInvalida.
+
+    A senha fica em _senha (texto puro, a ser convertido em hash) ou em
+    password (hash já calculado pelo sistema de origem, na coluna senha_hash).
+    Sem nenhuma das duas, a conta nasce com senha inutilizável e recebe convite.
+    A senha em texto puro passa por AUTH_PASSWORD_VALIDATORS, como no SetPasswordForm.
+    """
+    if not isinstance(linha, dict):
+        raise LinhaInvalida(numero, {'__all__': ['Cada registro deve ser um objeto JSON.']})
+    model, campos, coluna_relacionada, relacionado = PERFIS[perfil]
+    dados = {}
+    for campo in campos:
+        valor = linha.get(campo)
+        if isinstance(valor, str):
+            valor = valor.strip()
+        dados[campo] = valor if valor not in ('', None) else None
+    for campo in CAMPOS_USUARIO[1:]:
+        dados[campo] = dados[campo] or ''
+    objeto = model(**dados)
+    erros = {}
+    try:
+        setattr(objeto, f'{relacionado}_id', int(linha.get(coluna_relacionada)))
+    except (TypeError, ValueError):
+        erros[coluna_relacionada] = ['Informe o id numérico.']
+    senha, senha_hash = linha.get('senha') or '', linha.get('senha_hash') or ''
+    objeto._senha = None
+    if senha_hash:
+        try:
+            identify_hasher(senha_hash)
+        except ValueError:
+            erros['senha_hash'] = ['Hash em formato desconhecido.']
+        objeto.password = senha_hash
+    elif senha:
+        try:
+            validate_password(senha, objeto)
+        except ValidationError as exc:
+            erros['senha'] = exc.messages
+        objeto._senha = senha
+    else:
+        objeto.password = make_password(None)
+    try:
+        # A existência do relacionado e a unicidade são verificadas por lote.
+        objeto.full_clean(
+            exclude=['password', relacionado], validate_unique=False, validate_constraints=False
+        )
+    except ValidationError as exc:
+        erros.update(exc.message_dict)
+    if erros:
+        raise LinhaInvalida(numero, erros)
+    return objeto
+
+
+def _filtrar_lote(perfil: str, lote: list) -> tuple:
+    """
+    Separa do lote as linhas que violariam as restrições do banco: usuário ou
+    telefone já cadastrados (ou repetidos no lote) e relacionado inexistente.
+    Carrega nos objetos aceitos o relacionado, usado pelas tabelas de resumo.
+    """
+    model, _, coluna_relacionada, relacionado = PERFIS[perfil]
+    usernames = set(User.objects.filter(username__in=[objeto.username for _, objeto in lote])
+                    .values_list('username', flat=True))
+    telefones = {str(telefone) for telefone in model.objects.filter(
+        telefone__in=[str(objeto.telefone) for _, objeto in lote]
+    ).values_list('telefone', flat=True)}
+    ids = {getattr(objeto, f'{relacionado}_id') for _, objeto in lote}
+    if model is Vendedor:
+        relacionados = Loja_Unidade.objects.select_related('endereco_fk').in_bulk(ids)
+    else:
+        relacionados = Vendedor.objects.only('pk').in_bulk(ids)
+    aceitos, rejeitados = [], []
+    for numero, objeto in lote:
+        erros = {}
+        if objeto.username in usernames:
+            erros['username'] = ['Já existe um usuário com este nome.']
+        if str(objeto.telefone) in telefones:
+            erros['telefone'] = ['Telefone já cadastrado.']
+        if getattr(objeto, f'{relacionado}_id') not in relacionados:
+            erros[coluna_relacionada] = ['Registro não encontrado.']
+        if erros:
+            rejeitados.append(LinhaInvalida(numero, erros))
+            continue
+        usernames.add(objeto.username)
+        telefones.add(str(objeto.telefone))
+        setattr(objeto, relacionado, relacionados[getattr(objeto, f'{relacionado}_id')])
+        aceitos.append(objeto)
+    return aceitos, rejeitados
+
+
+def gravar_lote(perfil: str, objetos: list, executor=None, processos: int = 1):
+    """
+    Calcula os hashes pendentes e insere o lote, atualizando as tabelas que os
+    sinais manteriam: o diretório de telefones e, para vendedores, VendedorResumo.
+    """
+    model = PERFIS[perfil][0]
+    com_senha = [objeto for objeto in objetos if objeto._senha is not None]
+    for objeto, senha in zip(com_senha, calcular_hashes([objeto._senha for objeto in com_senha], executor, processos)):
+        objeto.password = senha
+    with transaction.atomic():
+        inserir_herdados(model, objetos, len(objetos))
+        callerid.sincronizar_lote(objetos)
+        if model is Vendedor:
+            VendedorResumo.objects.bulk_create(
+                [VendedorResumo(vendedor_id=objeto.pk, **valores_resumo(objeto)) for objeto in objetos]
+            )
+
+
+def cadastrar_usuarios(perfil: str, linhas, tamanho_lote: int = 1000, processos: int = None,
+                       ao_gravar_lote=None, ao_rejeitar=None, ao_convidar=None):
+    """
+    Cadastra em lote clientes ou vendedores de um iterável de dicts, com
+    duas instruções INSERT por lote (auth_user e a tabela filha) em vez de
+    duas por linha.
+
+    Contas sem senha recebem uma senha inutilizável e um convite de primeiro
+    acesso, sem nenhum hash. Senhas em texto puro têm o hash calculado em um
+    pool de processos, criado apenas se alguma linha trouxer senha.
+
+    Parâmetros:
+        perfil (str): 'cliente' ou 'vendedor'.
+        linhas (iterável): Os registros lidos do arquivo.
+        tamanho_lote (int): Quantidade de contas por lote.
+        processos (int): Processos para calcular hashes (padrão: um por CPU).
+        ao_gravar_lote (callable): Chamado com (gravados, segundos) após cada lote.
+        ao_rejeitar (callable): Chamado com a LinhaInvalida de cada linha rejeitada.
+        ao_convidar (callable): Chamado com o dict de gerar_convite de cada conta sem senha.
+
+    Retorna uma tupla (gravados, rejeitados).
+    """
+    processos = processos or os.cpu_count() or 1
+    inicio = time.monotonic()
+    gravados = rejeitados = 0
+    executor = None
+    lote = []
+
+    def gravar():
+        nonlocal gravados, rejeitados
+        aceitos, recusados = _filtrar_lote(perfil, lote)
+        for erro in recusados:
+            rejeitados += 1
+            if ao_rejeitar:
+                ao_rejeitar(erro)
+        if not aceitos:
+            return
+        gravar_lote(perfil, aceitos, executor, processos)
+        gravados += len(aceitos)
+        if ao_convidar:
+            for objeto in aceitos:
+                if not objeto.has_usable_password():
+                    ao_convidar(gerar_convite(objeto))
+        if ao_gravar_lote:
+            ao_gravar_lote(gravados, time.monotonic() - inicio)
+
+    try:
+        for numero, linha in enumerate(linhas, start=1):
+            try:
+                objeto = validar_linha(perfil, numero, linha)
+            except LinhaInvalida as exc:
+                rejeitados += 1
+                if ao_rejeitar:
+                    ao_rejeitar(exc)
+                continue
+            if objeto._senha is not None and executor is None and processos > 1:
+                # spawn: os filhos não herdam conexões nem threads do processo atual.
+                executor = ProcessPoolExecutor(processos, mp_context=get_context('spawn'),
+                                               initializer=senhas.iniciar_processo)
+            lote.append((numero, objeto))
+            if len(lote) >= tamanho_lote:
+                gravar()
+                lote = []
+        if lote:
+            gravar()
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return gravados, rejeitados
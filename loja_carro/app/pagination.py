@@ -0,0 +1,46 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Abaixo deste tamanho a contagem exata é barata e preferível à estimativa.
+LIMITE_CONTAGEM_EXATA = 10000
+
+
+def estimar_linhas(model, using: str = 'default'):
+    """
+    Retorna a estimativa de linhas da tabela do model pelas estatísticas do
+    PostgreSQL (pg_class.reltuples), ou None se o banco não oferecer isso ou a
+    tabela ainda não tiver sido analisada.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [model._meta.db_table],
+        )
+        linha = cursor.fetchone()
+    if linha is None or linha[0] is None or linha[0] < 0:
+        return None
+    return linha[0]
+
+
+class PaginadorContagemEstimada(Paginator):
+    """
+    Paginator que evita o COUNT(*) exato em tabelas grandes.
+
+    Quando o queryset não tem filtros e a estimativa do banco passa de
+    LIMITE_CONTAGEM_EXATA, o total de itens vem das estatísticas da tabela;
+    nos demais casos usa a contagem exata normal.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimativa = estimar_linhas(queryset.model, queryset.db)
+            if estimativa is not None and estimativa > LIMITE_CONTAGEM_EXATA:
+                return estimativa
+        return super().count
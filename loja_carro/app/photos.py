@@ -0,0 +1,183 @@
+import io
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import carro_cache, jobs
+from .models import Carro, CarroFoto
+from .storage import armazenamento_fotos
+
+logger = logging.getLogger(__name__)
+
+# Largura máxima de cada versão; imagens menores não são ampliadas.
+VERSOES = {
+    'miniatura': 160,
+    'card': 480,
+    'completa': 1280,
+}
+QUALIDADE_JPEG = 82
+# Versão usada como src padrão nas listagens.
+VERSAO_LISTAGEM = 'card'
+# Os nomes mudam com o conteúdo, então os arquivos podem ficar em cache para sempre.
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def nome_versao(sha256: str, versao: str) -> str:
+    return f'versoes/{sha256[:2]}/{sha256}/{versao}.jpg'
+
+
+def adicionar_foto(carro, arquivo, ordem: int = None):
+    """
+    Anexa uma foto a um carro. Levanta ValidationError se o arquivo não for
+    uma imagem. Se o carro já tem a mesma imagem, devolve a foto existente.
+
+    Quando a mesma imagem já foi processada para outro carro, as versões são
+    reaproveitadas e a foto nasce pronta, sem novo processamento.
+    """
+    foto = CarroFoto(carro=carro, original=arquivo)
+    foto.verificar_imagem()
+    foto.calcular_hash()
+    existente = CarroFoto.objects.filter(carro=carro, sha256=foto.sha256).first()
+    if existente is not None:
+        return existente
+    processada = CarroFoto.objects.filter(sha256=foto.sha256, status=CarroFoto.PRONTA).values('versoes').first()
+    if processada is not None:
+        foto.status, foto.versoes = CarroFoto.PRONTA, processada['versoes']
+    if ordem is None:
+        ultima = CarroFoto.objects.filter(carro=carro).order_by('-ordem').values_list('ordem', flat=True).first()
+        ordem = 0 if ultima is None else ultima + 1
+    foto.ordem = ordem
+    foto.save()
+    return foto
+
+
+def _redimensionar(imagem, largura: int):
+    if imagem.width <= largura:
+        return imagem
+    altura = max(1, round(imagem.height * largura / imagem.width))
+    return imagem.resize((largura, altura), Image.LANCZOS)
+
+
+def gerar_versoes(foto) -> dict:
+    """
+    Gera (ou reaproveita, se já existirem no armazenamento) as versões da
+    foto e devolve o dict gravado em CarroFoto.versoes.
+    """
+    armazenamento = armazenamento_fotos()
+    with foto.original.open('rb') as arquivo:
+        with Image.open(arquivo) as aberta:
+            imagem = ImageOps.exif_transpose(aberta).convert('RGB')
+    versoes = {}
+    for versao, largura in VERSOES.items():
+        reduzida = _redimensionar(imagem, largura)
+        nome = nome_versao(foto.sha256, versao)
+        if not armazenamento.exists(nome):
+            conteudo = io.BytesIO()
+            reduzida.save(conteudo, 'JPEG', quality=QUALIDADE_JPEG, optimize=True, progressive=True)
+            armazenamento.save(nome, ContentFile(conteudo.getvalue()))
+        versoes[versao] = {'nome': nome, 'largura': reduzida.width, 'altura': reduzida.height}
+    return versoes
+
+
+def processar_foto(pk) -> bool:
+    """
+    Gera as versões de uma foto pendente e marca como prontas todas as fotos
+    com o mesmo conteúdo. Retorna False se a foto não existe ou já foi processada.
+    """
+    foto = CarroFoto.objects.filter(pk=pk, status=CarroFoto.PENDENTE).first()
+    if foto is None:
+        return False
+    try:
+        versoes = gerar_versoes(foto)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception('Falha ao gerar as versões da foto %s', pk)
+        CarroFoto.objects.filter(pk=pk).update(status=CarroFoto.ERRO)
+        return False
+    CarroFoto.objects.filter(sha256=foto.sha256).exclude(status=CarroFoto.PRONTA).update(
+        status=CarroFoto.PRONTA, versoes=versoes
+    )
+    marcar_carros_alterados(CarroFoto.objects.filter(sha256=foto.sha256).values('carro_id'))
+    return True
+
+
+def marcar_carros_alterados(ids):
+    """
+    Atualiza atualizado_em dos carros, cujas capas aparecem nas listagens
+    validadas por app.conditional. Não dispara os sinais de Carro.
+    """
+    pks = list(Carro.todos.filter(pk__in=ids).values_list('pk', flat=True))
+    Carro.todos.filter(pk__in=pks).update(atualizado_em=timezone.now())
+    carro_cache.agendar_invalidacao_lote(pks)
+
+
+def agendar_processamento(pk):
+    """
+    Enfileira a geração das versões na fila de tarefas (app.jobs), na mesma
+    transação do envio, ou as gera depois do commit na própria thread com
+    FOTOS_PROCESSAMENTO_SINCRONO. Fotos pendentes sem tarefa, de antes da
+    fila, são retomadas pelo comando process_photos.
+    """
+    if getattr(settings, 'FOTOS_PROCESSAMENTO_SINCRONO', False):
+        transaction.on_commit(lambda: processar_foto(pk))
+    else:
+        jobs.enfileirar('fotos.processar', pk=pk)
+
+
+def processar_pendentes(incluir_erros: bool = False, ao_processar=None) -> int:
+    """
+    Processa, na thread atual, todas as fotos pendentes (e, opcionalmente,
+    as que falharam). Retorna quantas ficaram prontas.
+    """
+    if incluir_erros:
+        CarroFoto.objects.filter(status=CarroFoto.ERRO).update(status=CarroFoto.PENDENTE)
+    processadas = 0
+    pks = CarroFoto.objects.filter(status=CarroFoto.PENDENTE).order_by('pk').values_list('pk', flat=True)
+    for pk in pks.iterator(chunk_size=500):
+        if processar_foto(pk):
+            processadas += 1
+            if ao_processar:
+                ao_processar(processadas)
+    return processadas
+
+
+def url_versao(versao: dict) -> str:
+    return armazenamento_fotos().url(versao['nome'])
+
+
+def serializar_foto(foto) -> dict:
+    """
+    URLs prontas para <img src srcset>, ou None se as versões ainda não existem.
+    """
+    if foto.status != CarroFoto.PRONTA or not foto.versoes:
+        return None
+    # Imagens pequenas têm versões de mesma largura; o srcset lista cada largura uma vez.
+    por_largura = {}
+    for versao in sorted(foto.versoes.values(), key=lambda versao: versao['largura']):
+        por_largura.setdefault(versao['largura'], versao)
+    padrao = foto.versoes.get(VERSAO_LISTAGEM) or por_largura[max(por_largura)]
+    return {
+        'src': url_versao(padrao),
+        'srcset': ', '.join(f'{url_versao(versao)} {largura}w' for largura, versao in por_largura.items()),
+        'largura': padrao['largura'],
+        'altura': padrao['altura'],
+    }
+
+
+def capas(carros) -> dict:
+    """
+    Retorna {id do carro: foto serializada} com a primeira foto pronta de
+    cada carro, em uma única consulta.
+    """
+    ids = [carro.pk for carro in carros]
+    if not ids:
+        return {}
+    posicao = Window(RowNumber(), partition_by=F('carro_id'), order_by=[F('ordem').asc(), F('id').asc()])
+    fotos = CarroFoto.objects.filter(carro_id__in=ids, status=CarroFoto.PRONTA) \
+        .only('carro_id', 'status', 'versoes').annotate(posicao=posicao).filter(posicao=1)
+    return {foto.carro_id: serializar_foto(foto) for foto in fotos}
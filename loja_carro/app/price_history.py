@@ -0,0 +1,176 @@
+import datetime
+
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, transaction
+from django.db.models import F
+
+from .models import HistoricoPreco
+from .search import LIMITE_PADRAO, LIMITE_MAXIMO, decodificar_cursor, filtro_keyset, paginar
+from .serializers import serializar_carro
+
+ORDENACAO_REDUCOES = ('-alterado_em', '-id')
+
+
+def registrar_alteracao(carro, preco_anterior):
+    """
+    Grava uma linha de histórico se o preço do carro mudou. Chamado pelo
+    sinal post_save de Carro com o preço que estava no banco antes da gravação.
+    """
+    preco_novo = carro._meta.get_field('preco').to_python(carro.preco)
+    if preco_anterior is None or preco_novo == preco_anterior:
+        return None
+    return HistoricoPreco.objects.create(carro=carro, preco_anterior=preco_anterior, preco_novo=preco_novo)
+
+
+def registrar_alteracoes(alteracoes, tamanho_lote: int = 1000) -> int:
+    """
+    Versão em lote de registrar_alteracao, para gravações que não disparam
+    sinais (importações com bulk_create). Recebe tuplas (carro_id,
+    preco_anterior, preco_novo) e ignora as que não mudam o preço.
+    """
+    historico = [
+        HistoricoPreco(carro_id=carro_id, preco_anterior=anterior, preco_novo=novo)
+        for carro_id, anterior, novo in alteracoes
+        if anterior != novo
+    ]
+    HistoricoPreco.objects.bulk_create(historico, batch_size=tamanho_lote)
+    return len(historico)
+
+
+def consulta_reducoes(cursor: str = None, limite: int = LIMITE_PADRAO) -> tuple:
+    """
+    Monta, sem executar, a consulta de uma página das reduções de preço mais
+    recentes. Filtro e ordenação coincidem com o índice parcial
+    historico_preco_reducao_idx, então o banco lê só as linhas da página,
+    qualquer que seja o tamanho do histórico.
+
+    Retorna (queryset, limite), com um registro a mais que o limite. Levanta
+    CursorInvalido.
+    """
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    queryset = HistoricoPreco.objects.filter(preco_novo__lt=F('preco_anterior')) \
+        .select_related('carro').order_by(*ORDENACAO_REDUCOES)
+    if cursor:
+        queryset = queryset.filter(filtro_keyset(ORDENACAO_REDUCOES, decodificar_cursor(cursor, ORDENACAO_REDUCOES)))
+    return queryset[:limite + 1], limite
+
+
+def reducoes_recentes(cursor: str = None, limite: int = LIMITE_PADRAO) -> tuple:
+    """
+    Retorna (reduções, próximo cursor) com as reduções de preço mais recentes primeiro.
+    """
+    queryset, limite = consulta_reducoes(cursor, limite)
+    return paginar(list(queryset), ORDENACAO_REDUCOES, limite)
+
+
+def serializar_reducao(historico) -> dict:
+    reducao = historico.preco_anterior - historico.preco_novo
+    return {
+        'carro': serializar_carro(historico.carro),
+        'preco_anterior': str(historico.preco_anterior),
+        'preco_novo': str(historico.preco_novo),
+        'reducao': str(reducao),
+        'percentual': round(float(reducao / historico.preco_anterior * 100), 1),
+        'alterado_em': historico.alterado_em.isoformat(),
+    }
+
+
+def _inicio_do_mes(data, meses: int = 0) -> datetime.date:
+    indice = data.year * 12 + data.month - 1 + meses
+    return datetime.date(indice // 12, indice % 12 + 1, 1)
+
+
+def tabela_particionada(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Se a tabela de HistoricoPreco já é particionada (apenas PostgreSQL).
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [HistoricoPreco._meta.db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+def criar_particoes(inicio: datetime.date, meses_a_frente: int = 3, using: str = DEFAULT_DB_ALIAS) -> list:
+    """
+    Cria, se ainda não existirem, as partições mensais de inicio até
+    meses_a_frente depois do mês atual, e a partição padrão, que recebe o que
+    cair fora delas. Retorna os nomes das partições.
+
+    Uma partição não pode ser criada para um mês que já tenha linhas na
+    partição padrão, por isso o comando deve rodar antes de cada mês começar.
+    """
+    connection = connections[using]
+    tabela = HistoricoPreco._meta.db_table
+    fim = _inicio_do_mes(datetime.date.today(), meses_a_frente + 1)
+    mes = _inicio_do_mes(inicio)
+    particoes = []
+    with connection.cursor() as cursor:
+        while mes < fim:
+            seguinte = _inicio_do_mes(mes, 1)
+            nome = f'{tabela}_p{mes:%Y_%m}'
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(nome)} '
+                f'PARTITION OF {connection.ops.quote_name(tabela)} '
+                f"FOR VALUES FROM ('{mes:%Y-%m-%d} 00:00:00+00') TO ('{seguinte:%Y-%m-%d} 00:00:00+00')"
+            )
+            particoes.append(nome)
+            mes = seguinte
+        padrao = f'{tabela}_padrao'
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(padrao)} '
+            f'PARTITION OF {connection.ops.quote_name(tabela)} DEFAULT'
+        )
+    return particoes + [padrao]
+
+
+def particionar_historico(meses_a_frente: int = 3, using: str = DEFAULT_DB_ALIAS) -> list:
+    """
+    Converte a tabela de HistoricoPreco em uma tabela particionada por mês
+    de alterado_em (PostgreSQL), copiando as linhas existentes, ou apenas
+    cria as partições futuras se ela já for particionada.
+
+    A chave primária da tabela particionada passa a ser (id, alterado_em),
+    como o PostgreSQL exige; id continua único por vir da mesma sequência.
+    Retorna os nomes das partições.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        raise NotSupportedError('O particionamento do histórico de preços exige PostgreSQL.')
+    hoje = datetime.date.today()
+    if tabela_particionada(using):
+        return criar_particoes(hoje, meses_a_frente, using)
+    model = HistoricoPreco
+    tabela = connection.ops.quote_name(model._meta.db_table)
+    antiga = connection.ops.quote_name(f'{model._meta.db_table}_antiga')
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {tabela} RENAME TO {antiga}')
+        cursor.execute(
+            f'CREATE TABLE {tabela} (LIKE {antiga} INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            f'PARTITION BY RANGE (alterado_em)'
+        )
+        cursor.execute(f'SELECT MIN(alterado_em) FROM {antiga}')
+        mais_antiga = cursor.fetchone()[0]
+        particoes = criar_particoes(mais_antiga.date() if mais_antiga else hoje, meses_a_frente, using)
+        cursor.execute(f'INSERT INTO {tabela} OVERRIDING SYSTEM VALUE SELECT * FROM {antiga}')
+        # Os índices e restrições da tabela antiga ocupam os nomes que a nova vai usar.
+        cursor.execute(f'DROP TABLE {antiga}')
+        cursor.execute(
+            f'ALTER TABLE {tabela} ADD CONSTRAINT {connection.ops.quote_name(model._meta.db_table + "_pkey")} '
+            f'PRIMARY KEY (id, alterado_em)'
+        )
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) "
+            f'FROM {tabela}',
+            [model._meta.db_table],
+        )
+        with connection.schema_editor(atomic=False) as schema_editor:
+            carro = model._meta.get_field('carro')
+            schema_editor.execute(schema_editor._create_index_sql(model, fields=[carro]))
+            schema_editor.execute(schema_editor._create_fk_sql(model, carro, '_fk_%(to_table)s_%(to_column)s'))
+            for index in model._meta.indexes:
+                schema_editor.add_index(model, index)
+    return particoes
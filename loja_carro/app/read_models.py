@@ -0,0 +1,88 @@
+from django.db import transaction
+
+from .models import Vendedor, VendedorResumo
+
+
+def valores_resumo(vendedor) -> dict:
+    """
+    Monta os campos de VendedorResumo para um vendedor com loja e endereço carregados.
+    """
+    loja = vendedor.loja_fk
+    endereco = loja.endereco_fk
+    return {
+        'username': vendedor.username,
+        'nome': vendedor.get_full_name() or vendedor.username,
+        'email': vendedor.email,
+        'telefone': str(vendedor.telefone),
+        'loja_id': loja.id,
+        'loja_nome': loja.nome,
+        'cidade': endereco.cidade,
+        'estado': endereco.estado,
+    }
+
+
+def sincronizar_vendedor(vendedor):
+    """
+    Cria ou atualiza o resumo de um vendedor.
+    """
+    VendedorResumo.objects.update_or_create(vendedor_id=vendedor.pk, defaults=valores_resumo(vendedor))
+
+
+def sincronizar_loja(loja):
+    """
+    Propaga nome e endereço de uma loja para os resumos dos seus vendedores.
+    """
+    endereco = loja.endereco_fk
+    VendedorResumo.objects.filter(loja_id=loja.pk).update(
+        loja_nome=loja.nome, cidade=endereco.cidade, estado=endereco.estado
+    )
+
+
+def sincronizar_endereco(endereco):
+    """
+    Propaga cidade e estado de um endereço para os resumos dos vendedores das
+    lojas que o usam.
+    """
+    VendedorResumo.objects.filter(loja__endereco_fk=endereco).update(cidade=endereco.cidade, estado=endereco.estado)
+
+
+def verificar_consistencia(corrigir: bool = False, chunk_size: int = 1000) -> list:
+    """
+    Compara VendedorResumo com os dados de origem.
+
+    Retorna uma lista de (vendedor_id, divergências), onde divergências é um
+    dict campo -> (valor no resumo, valor esperado), ou None se o resumo não
+    existe. Com corrigir=True as divergências encontradas são regravadas.
+    """
+    divergencias = []
+    vendedores = Vendedor.objects.select_related('loja_fk__endereco_fk').order_by('pk')
+    lote = []
+
+    def conferir(lote):
+        resumos = VendedorResumo.objects.in_bulk([vendedor.pk for vendedor in lote])
+        for vendedor in lote:
+            esperado = valores_resumo(vendedor)
+            resumo = resumos.get(vendedor.pk)
+            if resumo is None:
+                diferencas = None
+            else:
+                diferencas = {
+                    campo: (getattr(resumo, campo), valor)
+                    for campo, valor in esperado.items()
+                    if getattr(resumo, campo) != valor
+                }
+                if not diferencas:
+                    continue
+            divergencias.append((vendedor.pk, diferencas))
+            if corrigir:
+                with transaction.atomic():
+                    VendedorResumo.objects.update_or_create(vendedor_id=vendedor.pk, defaults=esperado)
+
+    for vendedor in vendedores.iterator(chunk_size=chunk_size):
+        lote.append(vendedor)
+        if len(lote) >= chunk_size:
+            conferir(lote)
+            lote = []
+    if lote:
+        conferir(lote)
+    return divergencias
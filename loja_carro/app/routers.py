@@ -0,0 +1,107 @@
+import contextvars
+import random
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.db import connections
+
+# Modelos de catálogo cujas leituras podem ir para as réplicas.
+MODELOS_REPLICADOS = {'carro', 'loja_unidade', 'endereco'}
+
+COOKIE_FIXACAO = 'fixar_primario'
+
+# Se verdadeiro, as leituras do contexto atual (requisição, thread ou tarefa
+# assíncrona) vão para o banco primário.
+_fixado = contextvars.ContextVar('replica_fixado', default=False)
+# Se houve escrita em um modelo replicado no contexto atual.
+_escreveu = contextvars.ContextVar('replica_escreveu', default=False)
+
+
+def replicas() -> list:
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def _replicado(model) -> bool:
+    return model._meta.app_label == 'app' and model._meta.model_name in MODELOS_REPLICADOS
+
+
+class ReplicaRouter:
+    """
+    Envia as leituras de Carro, Loja_Unidade e Endereco para uma réplica
+    escolhida ao acaso e todas as escritas para 'default'.
+
+    Depois de uma escrita em um desses modelos o contexto fica fixado no
+    primário, para que quem acabou de gravar leia o que gravou; o
+    ReplicaStickinessMiddleware estende essa fixação às próximas requisições
+    do mesmo cliente por REPLICA_FIXACAO_SEGUNDOS.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replicado(model) or _fixado.get():
+            return None
+        # Dentro de uma transação a leitura precisa enxergar o que ela já gravou.
+        if connections['default'].in_atomic_block:
+            return None
+        aliases = replicas()
+        return random.choice(aliases) if aliases else None
+
+    def db_for_write(self, model, **hints):
+        if _replicado(model):
+            _fixado.set(True)
+            _escreveu.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # As réplicas têm os mesmos dados do primário.
+        return True
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Fixa no primário as requisições de um cliente que gravou há pouco.
+
+    Lê o cookie de fixação no início da requisição e, se a requisição gravou
+    algum modelo replicado, renova o cookie na resposta.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._iniciar(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            escreveu = self._encerrar(tokens)
+        return self._responder(response, escreveu)
+
+    async def __acall__(self, request):
+        tokens = self._iniciar(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            escreveu = self._encerrar(tokens)
+        return self._responder(response, escreveu)
+
+    def _iniciar(self, request):
+        return _fixado.set(COOKIE_FIXACAO in request.COOKIES), _escreveu.set(False)
+
+    def _encerrar(self, tokens) -> bool:
+        escreveu = _escreveu.get()
+        _fixado.reset(tokens[0])
+        _escreveu.reset(tokens[1])
+        return escreveu
+
+    def _responder(self, response, escreveu: bool):
+        if escreveu:
+            segundos = getattr(settings, 'REPLICA_FIXACAO_SEGUNDOS', 5)
+            response.set_cookie(COOKIE_FIXACAO, '1', max_age=segundos, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,178 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Carro, Venda, VendaMensal
+
+
+def mes_da_venda(vendida_em):
+    """
+    O primeiro dia do mês da venda, no fuso de TIME_ZONE, como TruncMonth.
+    """
+    return timezone.localtime(vendida_em).date().replace(day=1)
+
+
+def valores_venda(venda) -> dict:
+    """
+    Os campos de uma venda (objeto ou dict de campos) dos quais VendaMensal depende.
+    """
+    get = venda.get if isinstance(venda, dict) else lambda campo: getattr(venda, campo)
+    return {
+        'mes': mes_da_venda(get('vendida_em')),
+        'loja_id': get('loja_id'),
+        'vendedor_id': get('vendedor_id'),
+        'preco_anunciado': Decimal(get('preco_anunciado')),
+        'preco_final': Decimal(get('preco_final')),
+    }
+
+
+def _incrementar(valores: dict, sinal: int):
+    grupo = {campo: valores[campo] for campo in ('mes', 'loja_id', 'vendedor_id')}
+    desconto = valores['preco_anunciado'] - valores['preco_final']
+    atualizados = VendaMensal.objects.filter(**grupo).update(
+        quantidade=F('quantidade') + sinal,
+        receita=F('receita') + sinal * valores['preco_final'],
+        soma_anunciado=F('soma_anunciado') + sinal * valores['preco_anunciado'],
+        soma_descontos=F('soma_descontos') + sinal * desconto,
+    )
+    if sinal < 0:
+        VendaMensal.objects.filter(**grupo, quantidade__lte=0).delete()
+        return
+    if atualizados:
+        return
+    try:
+        with transaction.atomic():
+            VendaMensal.objects.create(
+                **grupo, quantidade=1, receita=valores['preco_final'],
+                soma_anunciado=valores['preco_anunciado'], soma_descontos=desconto,
+            )
+    except IntegrityError:
+        # Outro processo criou o grupo ao mesmo tempo; basta incrementá-lo.
+        _incrementar(valores, sinal)
+
+
+def aplicar_alteracao(antes: dict = None, depois: dict = None):
+    """
+    Atualiza VendaMensal a partir dos valores de valores_venda antes e depois
+    de uma alteração em Venda. Use antes=None para inclusões e depois=None
+    para exclusões.
+    """
+    if antes == depois:
+        return
+    if antes:
+        _incrementar(antes, -1)
+    if depois:
+        _incrementar(depois, 1)
+
+
+def registrar_venda(carro, cliente, vendedor, preco_final=None, vendida_em=None):
+    """
+    Registra a venda de um carro e o marca como vendido, na mesma transação.
+    Levanta ValidationError se o carro já tiver sido vendido.
+
+    Parâmetros:
+        carro (Carro): O carro vendido.
+        cliente (Cliente): O comprador.
+        vendedor (Vendedor): Quem fechou a venda; a loja da venda é a dele.
+        preco_final (Decimal): O valor pago (padrão: o preço anunciado).
+        vendida_em (datetime): A data da venda (padrão: agora).
+    """
+    with transaction.atomic():
+        carro = Carro.todos.select_for_update().get(pk=carro.pk)
+        if carro.status == Carro.VENDIDO:
+            raise ValidationError('Este carro já foi vendido.')
+        venda = Venda.objects.create(
+            carro=carro, cliente=cliente, vendedor=vendedor, loja_id=vendedor.loja_fk_id,
+            preco_anunciado=carro.preco,
+            preco_final=carro.preco if preco_final is None else preco_final,
+            vendida_em=vendida_em or timezone.now(),
+        )
+        carro.status, carro.vendido_em = Carro.VENDIDO, venda.vendida_em
+        carro.save(update_fields=['status'])
+    return venda
+
+
+def reconstruir_vendas_mensais(tamanho_chunk: int = 50000) -> int:
+    """
+    Recalcula VendaMensal a partir de Venda, agregando no banco um intervalo
+    de ids por vez e somando os parciais, e substitui a tabela de resumo.
+    Retorna o número de grupos gravados.
+    """
+    limites = Venda.objects.aggregate(menor=Min('id'), maior=Max('id'))
+    totais = {}
+    if limites['menor'] is not None:
+        for inicio in range(limites['menor'], limites['maior'] + 1, tamanho_chunk):
+            parciais = Venda.objects.filter(id__gte=inicio, id__lt=inicio + tamanho_chunk) \
+                .annotate(mes=TruncMonth('vendida_em')) \
+                .values('mes', 'loja_id', 'vendedor_id') \
+                .annotate(quantidade=Count('id'), receita=Sum('preco_final'), soma_anunciado=Sum('preco_anunciado')) \
+                .order_by()
+            for parcial in parciais:
+                grupo = (parcial['mes'].date(), parcial['loja_id'], parcial['vendedor_id'])
+                total = totais.setdefault(grupo, [0, Decimal(0), Decimal(0)])
+                total[0] += parcial['quantidade']
+                total[1] += parcial['receita']
+                total[2] += parcial['soma_anunciado']
+    novas = [
+        VendaMensal(
+            mes=mes, loja_id=loja_id, vendedor_id=vendedor_id, quantidade=quantidade, receita=receita,
+            soma_anunciado=soma_anunciado, soma_descontos=soma_anunciado - receita,
+        )
+        for (mes, loja_id, vendedor_id), (quantidade, receita, soma_anunciado) in totais.items()
+    ]
+    with transaction.atomic():
+        VendaMensal.objects.all().delete()
+        VendaMensal.objects.bulk_create(novas, batch_size=1000)
+    return len(novas)
+
+
+def _indicadores(quantidade: int, receita: Decimal, soma_anunciado: Decimal, soma_descontos: Decimal) -> dict:
+    return {
+        'quantidade': quantidade,
+        'receita': str(receita),
+        'desconto_medio': str((soma_descontos / quantidade).quantize(Decimal('0.01'))),
+        'desconto_percentual': round(float(soma_descontos / soma_anunciado * 100), 1) if soma_anunciado else 0.0,
+    }
+
+
+def ranking_mensal(mes, loja: int = None) -> dict:
+    """
+    Ranking de vendedores e de lojas por receita em um mês, lido só das
+    linhas de VendaMensal do mês (uma por vendedor que vendeu).
+
+    Retorna {'vendedores': [...], 'lojas': [...]}, cada item com posicao,
+    quantidade, receita, desconto_medio e desconto_percentual.
+    """
+    linhas = VendaMensal.objects.filter(mes=mes.replace(day=1), quantidade__gt=0)
+    if loja is not None:
+        linhas = linhas.filter(loja_id=loja)
+    linhas = linhas.order_by('-receita', 'vendedor_id').values(
+        'vendedor_id', 'vendedor__username', 'vendedor__first_name', 'vendedor__last_name', 'loja_id', 'loja__nome',
+        'quantidade', 'receita', 'soma_anunciado', 'soma_descontos',
+    )
+    vendedores, lojas = [], {}
+    for linha in linhas:
+        somas = (linha['quantidade'], linha['receita'], linha['soma_anunciado'], linha['soma_descontos'])
+        nome = f"{linha['vendedor__first_name']} {linha['vendedor__last_name']}".strip()
+        vendedores.append({
+            'posicao': len(vendedores) + 1,
+            'vendedor': {'id': linha['vendedor_id'], 'username': linha['vendedor__username'],
+                         'nome': nome or linha['vendedor__username']},
+            'loja': {'id': linha['loja_id'], 'nome': linha['loja__nome']},
+            **_indicadores(*somas),
+        })
+        total = lojas.setdefault(linha['loja_id'], [linha['loja__nome'], 0, Decimal(0), Decimal(0), Decimal(0)])
+        for indice, valor in enumerate(somas, start=1):
+            total[indice] += valor
+    ranking_lojas = sorted(lojas.items(), key=lambda item: (-item[1][2], item[0]))
+    return {
+        'vendedores': vendedores,
+        'lojas': [
+            {'posicao': posicao, 'loja': {'id': loja_id, 'nome': nome}, **_indicadores(*somas)}
+            for posicao, (loja_id, (nome, *somas)) in enumerate(ranking_lojas, start=1)
+        ],
+    }
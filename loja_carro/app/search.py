@@ -0,0 +1,148 @@
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from django.db.models import Q
+
+from .fulltext import filtrar_busca_textual
+from .models import Carro
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+
+# Cada ordenação termina em 'id' para que a chave de paginação seja única.
+ORDENACOES = {
+    'recentes': ('-id',),
+    'preco': ('preco', 'id'),
+    '-preco': ('-preco', '-id'),
+    'km': ('km', 'id'),
+    # Só disponível quando há busca textual ('q').
+    'relevancia': ('-relevancia', '-id'),
+}
+
+_CONVERSORES = {
+    'id': int,
+    'preco': Decimal,
+    'km': int,
+    'relevancia': float,
+    # Feed de reduções de preço (app.price_history).
+    'alterado_em': datetime.datetime.fromisoformat,
+}
+
+
+class CursorInvalido(ValueError):
+    """
+    Erro levantado quando o cursor de paginação não pode ser decodificado.
+    """
+
+
+def filtrar_carros(queryset, filtros: dict):
+    """
+    Aplica os filtros de busca do inventário sobre um queryset de Carro.
+
+    Todos os filtros são igualdades ou intervalos sobre colunas indexadas,
+    de modo que o banco consegue usar os índices compostos de Carro.
+
+    Parâmetros:
+        queryset (QuerySet): O queryset de Carro a ser filtrado.
+        filtros (dict): Valores já validados (marca, modelo, ano_min, ano_max,
+            preco_min, preco_max, km_max, cor, q). Chaves ausentes ou None são ignoradas.
+    """
+    if filtros.get('q'):
+        queryset = filtrar_busca_textual(queryset, filtros['q'])
+    if filtros.get('marca'):
+        queryset = queryset.filter(marca=filtros['marca'])
+    if filtros.get('modelo'):
+        queryset = queryset.filter(modelo=filtros['modelo'])
+    if filtros.get('cor'):
+        queryset = queryset.filter(cor=filtros['cor'])
+    queryset = queryset.ano_entre(filtros.get('ano_min'), filtros.get('ano_max'))
+    if filtros.get('preco_min') is not None:
+        queryset = queryset.filter(preco__gte=filtros['preco_min'])
+    if filtros.get('preco_max') is not None:
+        queryset = queryset.filter(preco__lte=filtros['preco_max'])
+    if filtros.get('km_max') is not None:
+        queryset = queryset.filter(km__lte=filtros['km_max'])
+    return queryset
+
+
+def codificar_cursor(carro, ordenacao: tuple) -> str:
+    """
+    Gera o cursor opaco que aponta para a posição logo após o carro informado.
+    """
+    valores = [str(getattr(carro, campo.lstrip('-'))) for campo in ordenacao]
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+def decodificar_cursor(cursor: str, ordenacao: tuple) -> list:
+    """
+    Decodifica um cursor gerado por codificar_cursor para a ordenação dada.
+    """
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(valores, list) or len(valores) != len(ordenacao):
+            raise CursorInvalido(cursor)
+        return [
+            _CONVERSORES[campo.lstrip('-')](valor)
+            for campo, valor in zip(ordenacao, valores)
+        ]
+    except (ValueError, TypeError, ArithmeticError) as exc:
+        raise CursorInvalido(cursor) from exc
+
+
+def filtro_keyset(ordenacao: tuple, valores: list) -> Q:
+    """
+    Monta a condição "depois deste registro" para paginação por chave (seek).
+
+    Para a ordenação (a, b) gera ``a > va OR (a = va AND b > vb)``, trocando
+    o operador para ``<`` nos campos em ordem decrescente.
+    """
+    condicao = Q()
+    for i, campo in enumerate(ordenacao):
+        nome = campo.lstrip('-')
+        operador = 'lt' if campo.startswith('-') else 'gt'
+        igualdades = {
+            anterior.lstrip('-'): valor
+            for anterior, valor in zip(ordenacao[:i], valores[:i])
+        }
+        condicao |= Q(**igualdades, **{f'{nome}__{operador}': valores[i]})
+    return condicao
+
+
+def consulta_pagina(filtros: dict, ordem: str = 'recentes', cursor: str = None, limite: int = LIMITE_PADRAO) -> tuple:
+    """
+    Monta, sem executar, a consulta de uma página da busca do inventário.
+
+    Retorna (queryset, ordenacao, limite). O queryset já traz um registro a
+    mais que o limite, apenas para saber se existe próxima página. Levanta
+    CursorInvalido antes de qualquer acesso ao banco.
+    """
+    ordenacao = ORDENACOES[ordem]
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+    queryset = filtrar_carros(Carro.objects.disponiveis(), filtros).order_by(*ordenacao)
+    if cursor:
+        queryset = queryset.filter(filtro_keyset(ordenacao, decodificar_cursor(cursor, ordenacao)))
+    return queryset[:limite + 1], ordenacao, limite
+
+
+def paginar(carros: list, ordenacao: tuple, limite: int) -> tuple:
+    """
+    Corta o registro excedente de consulta_pagina e gera o próximo cursor.
+    """
+    proximo_cursor = None
+    if len(carros) > limite:
+        carros = carros[:limite]
+        proximo_cursor = codificar_cursor(carros[-1], ordenacao)
+    return carros, proximo_cursor
+
+
+def buscar_carros(filtros: dict, ordem: str = 'recentes', cursor: str = None, limite: int = LIMITE_PADRAO):
+    """
+    Executa a busca do inventário paginada por chave em vez de OFFSET.
+
+    Retorna uma tupla (carros, proximo_cursor). proximo_cursor é None
+    quando não há mais páginas.
+    """
+    queryset, ordenacao, limite = consulta_pagina(filtros, ordem, cursor, limite)
+    return paginar(list(queryset), ordenacao, limite)
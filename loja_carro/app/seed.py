@@ -0,0 +1,212 @@
+import csv
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+
+from .bulk import inserir_herdados
+from .callerid import reconstruir_diretorio
+from .facets import reconstruir_facetas
+from .geo import CENTROIDES_PADRAO
+from .models import Carro, Cliente, Endereco, Loja_Unidade, Vendedor, VendedorResumo
+from .read_models import valores_resumo
+from .stats import reconstruir_estatisticas
+
+ANO_REFERENCIA = 2025
+
+# Marcas e modelos com peso aproximado de participação no mercado de usados.
+MARCAS = {
+    'Chevrolet': (18, ['Onix', 'Tracker', 'S10', 'Cruze', 'Spin']),
+    'Volkswagen': (16, ['Gol', 'Polo', 'T-Cross', 'Virtus', 'Saveiro']),
+    'Fiat': (16, ['Argo', 'Mobi', 'Strada', 'Toro', 'Pulse']),
+    'Toyota': (9, ['Corolla', 'Hilux', 'Yaris', 'SW4']),
+    'Hyundai': (9, ['HB20', 'Creta', 'Tucson']),
+    'Renault': (8, ['Kwid', 'Sandero', 'Duster', 'Logan']),
+    'Honda': (7, ['Civic', 'HR-V', 'Fit', 'City']),
+    'Jeep': (6, ['Renegade', 'Compass', 'Commander']),
+    'Ford': (6, ['Ka', 'Ranger', 'EcoSport']),
+    'Nissan': (5, ['Kicks', 'Versa', 'Frontier']),
+}
+CORES = {'Branco': 30, 'Prata': 22, 'Preto': 18, 'Cinza': 16, 'Vermelho': 6, 'Azul': 5, 'Marrom': 2, 'Verde': 1}
+OPCIONAIS = [
+    'Ar-condicionado', 'Direção elétrica', 'Vidros elétricos', 'Travas elétricas', 'Airbag', 'Freios ABS',
+    'Central multimídia', 'Câmera de ré', 'Sensor de estacionamento', 'Bancos de couro', 'Teto solar',
+    'Rodas de liga leve',
+]
+DESCRICOES = [
+    'Único dono, revisões na concessionária.', 'Carro de garagem, pneus novos.', 'Manual e chave reserva.',
+    'Aceita troca.', 'IPVA pago.', 'Laudo cautelar aprovado.',
+]
+NOMES = ['Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Henrique', 'Isabela', 'João',
+         'Larissa', 'Marcos', 'Natália', 'Otávio', 'Paula', 'Rafael', 'Sofia', 'Thiago', 'Vanessa', 'Lucas']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Lima', 'Pereira', 'Costa', 'Ferreira', 'Almeida',
+              'Ribeiro', 'Carvalho', 'Gomes', 'Martins', 'Rocha', 'Barbosa']
+RUAS = ['Rua das Flores', 'Avenida Brasil', 'Rua XV de Novembro', 'Avenida Paulista', 'Rua da Praia',
+        'Avenida Beira-Mar', 'Rua Sete de Setembro', 'Rua Tiradentes']
+DDD_POR_UF = {
+    'AC': 68, 'AL': 82, 'AP': 96, 'AM': 92, 'BA': 71, 'CE': 85, 'DF': 61, 'ES': 27, 'GO': 62, 'MA': 98,
+    'MT': 65, 'MS': 67, 'MG': 31, 'PA': 91, 'PB': 83, 'PR': 41, 'PE': 81, 'PI': 86, 'RJ': 21, 'RN': 84,
+    'RS': 51, 'RO': 69, 'RR': 95, 'SC': 48, 'SP': 11, 'SE': 79, 'TO': 63,
+}
+
+
+def _capitais() -> list:
+    with open(CENTROIDES_PADRAO, encoding='utf-8', newline='') as arquivo:
+        return [
+            (linha['cidade'], linha['uf'], float(linha['latitude']), float(linha['longitude']))
+            for linha in csv.DictReader(arquivo)
+        ]
+
+
+class GeradorDados:
+    """
+    Gera um inventário sintético, porém plausível, de forma determinística.
+
+    A mesma semente, aplicada ao mesmo banco, produz os mesmos registros.
+    Usernames, telefones e referências continuam a numeração dos registros já
+    existentes, para que gerações sucessivas não colidam nos campos únicos.
+
+    Atributos:
+        semente (int): A semente do gerador pseudoaleatório.
+        tamanho_lote (int): Linhas por INSERT.
+    """
+
+    def __init__(self, semente: int = 42, tamanho_lote: int = 2000):
+        self.semente = semente
+        self.tamanho_lote = tamanho_lote
+        self.rng = random.Random(semente)
+        self.senha = make_password(None)
+        # Preço de referência de cada modelo zero-quilômetro.
+        self.precos_base = {
+            modelo: self.rng.randrange(60000, 280000, 1000)
+            for _, modelos in MARCAS.values() for modelo in modelos
+        }
+
+    def _nome(self) -> tuple:
+        return self.rng.choice(NOMES), self.rng.choice(SOBRENOMES)
+
+    def enderecos(self, quantidade: int) -> list:
+        capitais = _capitais()
+        # As capitais do Sudeste e do Sul concentram a maior parte das lojas.
+        pesos = [6 if uf in ('SP', 'RJ', 'MG', 'PR', 'SC', 'RS') else 1 for _, uf, _, _ in capitais]
+        enderecos = []
+        for _ in range(quantidade):
+            cidade, uf, lat, lon = self.rng.choices(capitais, pesos)[0]
+            enderecos.append(Endereco(
+                rua=self.rng.choice(RUAS),
+                cidade=cidade,
+                estado=uf,
+                numero=str(self.rng.randint(1, 4000)),
+                cep=f'{self.rng.randint(1000000, 99999999):08d}',
+                latitude=round(lat + self.rng.uniform(-0.1, 0.1), 6),
+                longitude=round(lon + self.rng.uniform(-0.1, 0.1), 6),
+            ))
+        return Endereco.objects.bulk_create(enderecos, batch_size=self.tamanho_lote)
+
+    def lojas(self, enderecos: list) -> list:
+        inicio = Loja_Unidade.objects.count()
+        lojas = [
+            Loja_Unidade(
+                nome=f'Loja {endereco.cidade} {inicio + i + 1}',
+                telefone=f'+55{DDD_POR_UF[endereco.estado]}3{inicio + i:07d}',
+                endereco_fk=endereco,
+            )
+            for i, endereco in enumerate(enderecos)
+        ]
+        return Loja_Unidade.objects.bulk_create(lojas, batch_size=self.tamanho_lote)
+
+    def vendedores(self, lojas: list, por_loja: int) -> list:
+        inicio = Vendedor.objects.count()
+        vendedores = []
+        for loja in lojas:
+            for _ in range(por_loja):
+                n = inicio + len(vendedores)
+                nome, sobrenome = self._nome()
+                vendedores.append(Vendedor(
+                    username=f'vendedor{n}', first_name=nome, last_name=sobrenome, password=self.senha,
+                    email=f'vendedor{n}@loja.example', telefone=f'+55{DDD_POR_UF[loja.endereco_fk.estado]}98{n:07d}',
+                    loja_fk=loja,
+                ))
+        return inserir_herdados(Vendedor, vendedores, self.tamanho_lote)
+
+    def clientes(self, vendedores: list, quantidade: int) -> int:
+        inicio = Cliente.objects.count()
+        lote = []
+        for i in range(quantidade):
+            n = inicio + i
+            vendedor = self.rng.choice(vendedores)
+            nome, sobrenome = self._nome()
+            lote.append(Cliente(
+                username=f'cliente{n}', first_name=nome, last_name=sobrenome, password=self.senha,
+                email=f'cliente{n}@example.com',
+                telefone=f'+55{DDD_POR_UF[vendedor.loja_fk.endereco_fk.estado]}99{n:07d}',
+                data_nascimento=datetime.date(1950, 1, 1) + datetime.timedelta(days=self.rng.randint(0, 20000)),
+                avaliacao=self.rng.choice(DESCRICOES) if self.rng.random() < 0.3 else None,
+                vendedor_fk=vendedor,
+            ))
+            if len(lote) >= self.tamanho_lote:
+                inserir_herdados(Cliente, lote, self.tamanho_lote)
+                lote = []
+        inserir_herdados(Cliente, lote, self.tamanho_lote)
+        return quantidade
+
+    def carro(self, n: int) -> Carro:
+        marcas = list(MARCAS)
+        marca = self.rng.choices(marcas, [MARCAS[m][0] for m in marcas])[0]
+        modelo = self.rng.choice(MARCAS[marca][1])
+        # Mais carros recentes que antigos.
+        idade = min(int(self.rng.expovariate(1 / 5)), 17)
+        fabricacao = ANO_REFERENCIA - idade
+        ano = f'{fabricacao}/{fabricacao + 1}' if self.rng.random() < 0.5 else str(fabricacao)
+        preco = self.precos_base[modelo] * 0.88 ** idade * self.rng.lognormvariate(0, 0.12)
+        km = max(0, int(idade * self.rng.gauss(12000, 4000) + self.rng.randint(0, 5000)))
+        cor = self.rng.choices(list(CORES), list(CORES.values()))[0]
+        carro = Carro(
+            marca=marca, modelo=modelo, ano=ano, cor=cor, km=km,
+            preco=Decimal(max(preco, 8000)).quantize(Decimal('0.01')),
+            opcionais=', '.join(self.rng.sample(OPCIONAIS, self.rng.randint(2, 7))),
+            descricao=f'{marca} {modelo} {ano} {cor.lower()}. {self.rng.choice(DESCRICOES)}',
+            referencia=f'seed-{self.semente}-{n}',
+        )
+        carro.preencher_anos()
+        return carro
+
+    def carros(self, quantidade: int, ao_gravar=None) -> int:
+        inicio = Carro.todos.filter(referencia__startswith=f'seed-{self.semente}-').count()
+        gravados = 0
+        while gravados < quantidade:
+            tamanho = min(self.tamanho_lote, quantidade - gravados)
+            Carro.objects.bulk_create([self.carro(inicio + gravados + i) for i in range(tamanho)])
+            gravados += tamanho
+            if ao_gravar:
+                ao_gravar(gravados)
+        return gravados
+
+
+def gerar_dados(lojas: int = 50, vendedores_por_loja: int = 10, clientes: int = 20000, carros: int = 100000,
+                semente: int = 42, tamanho_lote: int = 2000, ao_gravar_carros=None) -> dict:
+    """
+    Popula o banco com dados sintéticos em lote e recalcula as tabelas de
+    resumo que os sinais manteriam (VendedorResumo, diretório de telefones,
+    facetas e estatísticas). Retorna quantos registros de cada tipo foram criados.
+    """
+    gerador = GeradorDados(semente, tamanho_lote)
+    lojas_criadas = gerador.lojas(gerador.enderecos(lojas))
+    vendedores = gerador.vendedores(lojas_criadas, vendedores_por_loja)
+    VendedorResumo.objects.bulk_create(
+        [VendedorResumo(vendedor_id=vendedor.pk, **valores_resumo(vendedor)) for vendedor in vendedores],
+        batch_size=tamanho_lote,
+    )
+    total_clientes = gerador.clientes(vendedores, clientes) if vendedores else 0
+    total_carros = gerador.carros(carros, ao_gravar_carros)
+    reconstruir_diretorio()
+    reconstruir_facetas()
+    reconstruir_estatisticas()
+    return {
+        'enderecos': len(lojas_criadas),
+        'lojas': len(lojas_criadas),
+        'vendedores': len(vendedores),
+        'clientes': total_clientes,
+        'carros': total_carros,
+    }
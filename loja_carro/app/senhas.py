@@ -0,0 +1,15 @@
+"""
+Funções executadas nos processos do pool de app.onboarding. O módulo não
+importa modelos, então pode ser carregado por um processo novo antes de
+django.setup().
+"""
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def iniciar_processo():
+    django.setup()
+
+
+def calcular_hashes(senhas: list) -> list:
+    return [make_password(senha) for senha in senhas]
@@ -0,0 +1,18 @@
+def serializar_carro(carro) -> dict:
+    """
+    Converte um Carro em um dicionário pronto para JSON.
+
+    O preço é devolvido como string para não perder as casas decimais.
+    """
+    return {
+        'id': carro.id,
+        'marca': carro.marca,
+        'modelo': carro.modelo,
+        'ano': carro.ano,
+        'preco': str(carro.preco),
+        'km': carro.km,
+        'cor': carro.cor,
+        'opcionais': carro.opcionais,
+        'descricao': carro.descricao,
+        'status': carro.status,
+    }
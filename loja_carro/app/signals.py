@@ -0,0 +1,161 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import callerid, carro_cache, conditional, facets, photos, price_history, read_models, sales, stats
+from .models import Carro, CarroFoto, Cliente, Endereco, Loja_Unidade, Venda, Vendedor
+
+# Campos de Carro dos quais dependem as tabelas de resumo.
+CAMPOS_RESUMO = ('marca', 'modelo', 'cor', 'ano', 'ano_fabricacao', 'preco', 'km', 'status')
+# Campos de User copiados para VendedorResumo e para o diretório de telefones.
+CAMPOS_USUARIO_COPIADOS = frozenset({'username', 'first_name', 'last_name', 'email'})
+
+
+def _valores(carro) -> dict:
+    return {campo: getattr(carro, campo) for campo in CAMPOS_RESUMO}
+
+
+def _a_venda(valores):
+    """
+    Facetas e estatísticas descrevem só os carros à venda: reservados e
+    vendidos contam como excluídos.
+    """
+    return valores if valores and valores['status'] == Carro.DISPONIVEL else None
+
+
+@receiver(pre_save, sender=Carro)
+def carro_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Guarda no próprio objeto os valores que o carro tinha no banco antes da gravação.
+    """
+    instance._valores_antes = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    # Lê do mesmo banco em que a gravação acontece, nunca de uma réplica.
+    antigo = sender._base_manager.using(using).filter(pk=instance.pk)
+    instance._valores_antes = antigo.values(*CAMPOS_RESUMO).first()
+
+
+@receiver(post_save, sender=Carro)
+def carro_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    antes = getattr(instance, '_valores_antes', None)
+    antes_venda, depois_venda = _a_venda(antes), _a_venda(_valores(instance))
+    facets.aplicar_alteracao(
+        antes=facets.valores_faceta(antes_venda) if antes_venda else None,
+        depois=facets.valores_faceta(depois_venda) if depois_venda else None,
+    )
+    stats.aplicar_alteracao(antes=antes_venda, depois=depois_venda)
+    if antes:
+        price_history.registrar_alteracao(instance, antes['preco'])
+    carro_cache.agendar_invalidacao(instance.pk)
+
+
+@receiver(post_delete, sender=Carro)
+def carro_post_delete(sender, instance, **kwargs):
+    antes = _a_venda(_valores(instance))
+    if antes:
+        facets.aplicar_alteracao(antes=facets.valores_faceta(antes))
+        stats.aplicar_alteracao(antes=antes)
+        # Só os carros à venda aparecem nas listagens; arquivar vendidos não as muda.
+        conditional.registrar_exclusao('carros')
+    carro_cache.agendar_invalidacao(instance.pk)
+
+
+@receiver(post_save, sender=Vendedor)
+def vendedor_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    read_models.sincronizar_vendedor(instance)
+    callerid.sincronizar(instance)
+
+
+@receiver(post_save, sender=Cliente)
+def cliente_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    callerid.sincronizar(instance)
+
+
+@receiver(post_save, sender=User)
+def user_post_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Vendedores e clientes também podem ser editados pelo seu registro de User.
+    Gravações parciais que não tocam os campos copiados, como a de last_login
+    a cada login, não fazem nenhuma consulta.
+    """
+    if raw or (update_fields is not None and CAMPOS_USUARIO_COPIADOS.isdisjoint(update_fields)):
+        return
+    vendedor = Vendedor.objects.select_related('loja_fk__endereco_fk').filter(pk=instance.pk).first()
+    if vendedor is not None:
+        read_models.sincronizar_vendedor(vendedor)
+        callerid.sincronizar(vendedor)
+    cliente = Cliente.objects.filter(pk=instance.pk).first()
+    if cliente is not None:
+        callerid.sincronizar(cliente)
+
+
+@receiver(post_save, sender=Loja_Unidade)
+def loja_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    read_models.sincronizar_loja(instance)
+    callerid.sincronizar(instance)
+
+
+@receiver(post_delete, sender=Cliente)
+@receiver(post_delete, sender=Vendedor)
+@receiver(post_delete, sender=Loja_Unidade)
+def telefone_post_delete(sender, instance, **kwargs):
+    callerid.remover(instance)
+
+
+@receiver(post_delete, sender=Loja_Unidade)
+@receiver(post_delete, sender=Endereco)
+def loja_post_delete(sender, instance, **kwargs):
+    conditional.registrar_exclusao('lojas')
+
+
+@receiver(post_save, sender=Endereco)
+def endereco_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    read_models.sincronizar_endereco(instance)
+
+
+@receiver(post_save, sender=CarroFoto)
+def foto_post_save(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    photos.marcar_carros_alterados([instance.carro_id])
+    # Também quando o arquivo de uma foto existente é substituído (ver CarroFoto.clean).
+    if instance.status == CarroFoto.PENDENTE and (created or update_fields is None):
+        photos.agendar_processamento(instance.pk)
+
+
+@receiver(post_delete, sender=CarroFoto)
+def foto_post_delete(sender, instance, **kwargs):
+    photos.marcar_carros_alterados([instance.carro_id])
+
+
+@receiver(pre_save, sender=Venda)
+def venda_pre_save(sender, instance, raw=False, using=None, **kwargs):
+    instance._valores_antes = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    antiga = sender._base_manager.using(using).filter(pk=instance.pk)
+    antes = antiga.values('vendida_em', 'loja_id', 'vendedor_id', 'preco_anunciado', 'preco_final').first()
+    instance._valores_antes = sales.valores_venda(antes) if antes else None
+
+
+@receiver(post_save, sender=Venda)
+def venda_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sales.aplicar_alteracao(antes=getattr(instance, '_valores_antes', None), depois=sales.valores_venda(instance))
+
+
+@receiver(post_delete, sender=Venda)
+def venda_post_delete(sender, instance, **kwargs):
+    sales.aplicar_alteracao(antes=sales.valores_venda(instance))
@@ -0,0 +1,136 @@
+import mimetypes
+import os
+import re
+import threading
+from email.utils import formatdate
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, HttpResponseNotModified
+
+# Nomes com hash nunca mudam de conteúdo.
+CACHE_IMUTAVEL = 'public, max-age=31536000, immutable'
+# Nomes sem hash podem mudar a cada deploy.
+CACHE_CURTO = 'public, max-age=60'
+
+_ACEITA_GZIP = re.compile(r'(?:^|,)\s*gzip\s*(?:;\s*q=(?!0(?:\.0*)?\s*(?:,|$))[\d.]+\s*)?(?:,|$)')
+
+
+def aceita_gzip(accept_encoding: str) -> bool:
+    """
+    Se o cabeçalho Accept-Encoding aceita gzip (ignorando 'gzip;q=0').
+    """
+    return bool(_ACEITA_GZIP.search(accept_encoding.lower()))
+
+
+class ArquivoEstatico:
+    """
+    Um arquivo de STATIC_ROOT e sua variante .gz, com os cabeçalhos calculados
+    uma vez.
+
+    Atributos:
+        caminho (str): Caminho do arquivo no disco.
+        caminho_gz (str): Caminho da variante .gz, ou None.
+        imutavel (bool): Se o nome contém o hash do conteúdo.
+    """
+
+    def __init__(self, caminho: str, imutavel: bool):
+        self.caminho = caminho
+        self.caminho_gz = caminho + '.gz' if os.path.isfile(caminho + '.gz') else None
+        self.imutavel = imutavel
+        tipo, _ = mimetypes.guess_type(caminho)
+        self.tipo = tipo or 'application/octet-stream'
+        info = os.stat(caminho)
+        self.tamanho = info.st_size
+        self.tamanho_gz = os.stat(self.caminho_gz).st_size if self.caminho_gz else None
+        self.ultima_modificacao = formatdate(info.st_mtime, usegmt=True)
+        self.etag = f'"{int(info.st_mtime):x}-{info.st_size:x}"'
+
+    def responder(self, request):
+        gzip = self.caminho_gz is not None and aceita_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        etag = self.etag[:-1] + '-gz"' if gzip else self.etag
+        if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+            resposta = HttpResponseNotModified()
+        else:
+            resposta = FileResponse(open(self.caminho_gz if gzip else self.caminho, 'rb'), content_type=self.tipo)
+            resposta['Content-Length'] = self.tamanho_gz if gzip else self.tamanho
+            if gzip:
+                resposta['Content-Encoding'] = 'gzip'
+        resposta['ETag'] = etag
+        resposta['Last-Modified'] = self.ultima_modificacao
+        resposta['Cache-Control'] = CACHE_IMUTAVEL if self.imutavel else CACHE_CURTO
+        if self.caminho_gz is not None:
+            resposta['Vary'] = 'Accept-Encoding'
+        return resposta
+
+
+class ArquivosEstaticosMiddleware:
+    """
+    Serve os arquivos coletados em STATIC_ROOT sem passar pelo resto da pilha.
+
+    Na primeira requisição indexa STATIC_ROOT (reinicie o processo após um
+    collectstatic). Escolhe a variante .gz quando o cliente aceita gzip e usa
+    cache imutável para os nomes com hash do manifesto do collectstatic.
+    Caminhos fora do índice seguem para as views normalmente.
+
+    Sob ASGI só os caminhos dentro de STATIC_URL passam por uma thread (a
+    indexação e a abertura do arquivo bloqueiam); as demais requisições
+    seguem assíncronas.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.prefixo = '/' + settings.STATIC_URL.lstrip('/')
+        self._indice = None
+        self._trava = threading.Lock()
+
+    def indexar(self) -> dict:
+        raiz = settings.STATIC_ROOT
+        hashed_files = getattr(staticfiles_storage, 'hashed_files', None) or {}
+        imutaveis = set(hashed_files.values())
+        indice = {}
+        for diretorio, _, arquivos in os.walk(raiz or ''):
+            for nome in arquivos:
+                if nome.endswith('.gz') and os.path.isfile(os.path.join(diretorio, nome[:-3])):
+                    continue
+                caminho = os.path.join(diretorio, nome)
+                relativo = os.path.relpath(caminho, raiz).replace(os.sep, '/')
+                indice[relativo] = ArquivoEstatico(caminho, relativo in imutaveis)
+        return indice
+
+    def _estatico(self, request) -> bool:
+        return request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefixo)
+
+    def _servir(self, request):
+        """
+        Retorna a resposta do arquivo pedido, ou None se ele não está no índice.
+        """
+        if self._indice is None:
+            with self._trava:
+                if self._indice is None:
+                    self._indice = self.indexar()
+        arquivo = self._indice.get(request.path_info[len(self.prefixo):])
+        return arquivo.responder(request) if arquivo is not None else None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._estatico(request):
+            resposta = self._servir(request)
+            if resposta is not None:
+                return resposta
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self._estatico(request):
+            resposta = await sync_to_async(self._servir)(request)
+            if resposta is not None:
+                return resposta
+        return await self.get_response(request)
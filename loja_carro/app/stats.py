@@ -0,0 +1,249 @@
+import bisect
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Max, Min, Sum, Value, When
+
+from .models import Carro, EstatisticaCarro, FaixaEstatisticaCarro
+
+PERCENTIS_PADRAO = (25, 50, 75, 90)
+
+
+def _limites_geometricos(inicio: int, fim: int, faixas: int) -> list:
+    """
+    Limites de faixas de largura relativa constante entre inicio e fim,
+    precedidos por uma faixa [0, inicio).
+    """
+    razao = (fim / inicio) ** (1 / faixas)
+    return [0] + [round(inicio * razao ** i) for i in range(faixas + 1)]
+
+
+# Faixas com cerca de 7% de largura relativa: o erro de um percentil fica
+# limitado à largura da faixa em que ele cai.
+LIMITES_PRECO = _limites_geometricos(5000, 5_000_000, 100)
+LIMITES_KM = _limites_geometricos(1000, 1_000_000, 100)
+
+
+def indice_faixa(limites: list, valor) -> int:
+    """
+    Retorna o índice da faixa do histograma que contém o valor. Valores fora
+    do intervalo caem na primeira ou na última faixa.
+    """
+    indice = bisect.bisect_right(limites, valor) - 1
+    return min(max(indice, 0), len(limites) - 2)
+
+
+def percentil(contagens: list, limites: list, p: float):
+    """
+    Estima o percentil p (0-100) de um histograma, interpolando linearmente
+    dentro da faixa em que ele cai. Retorna None para histogramas vazios.
+    """
+    total = sum(contagens)
+    if total <= 0:
+        return None
+    alvo = total * p / 100
+    acumulado = 0
+    for indice, contagem in enumerate(contagens):
+        if contagem > 0 and acumulado + contagem >= alvo:
+            fracao = (alvo - acumulado) / contagem
+            return limites[indice] + fracao * (limites[indice + 1] - limites[indice])
+        acumulado += contagem
+    return float(limites[-1])
+
+
+class Agregado:
+    """
+    Agregados mescláveis de preço e quilometragem de um grupo de carros.
+
+    Atributos:
+        quantidade (int): Quantos carros foram somados.
+        soma_preco (Decimal): Soma dos preços.
+        soma_km (int): Soma das quilometragens.
+        histograma_preco (list): Contagens por faixa de LIMITES_PRECO.
+        histograma_km (list): Contagens por faixa de LIMITES_KM.
+    """
+
+    def __init__(self, quantidade=0, soma_preco=Decimal(0), soma_km=0):
+        self.quantidade = quantidade
+        self.soma_preco = Decimal(soma_preco)
+        self.soma_km = soma_km
+        self.histograma_preco = [0] * (len(LIMITES_PRECO) - 1)
+        self.histograma_km = [0] * (len(LIMITES_KM) - 1)
+
+    def histograma(self, dimensao: str) -> list:
+        return self.histograma_preco if dimensao == FaixaEstatisticaCarro.PRECO else self.histograma_km
+
+    def mesclar(self, outro):
+        self.quantidade += outro.quantidade
+        self.soma_preco += outro.soma_preco
+        self.soma_km += outro.soma_km
+        self.histograma_preco = [a + b for a, b in zip(self.histograma_preco, outro.histograma_preco)]
+        self.histograma_km = [a + b for a, b in zip(self.histograma_km, outro.histograma_km)]
+
+    def resumo(self, percentis=PERCENTIS_PADRAO) -> dict:
+        return {
+            'quantidade': self.quantidade,
+            'preco_medio': str((self.soma_preco / self.quantidade).quantize(Decimal('0.01'))),
+            'km_medio': round(self.soma_km / self.quantidade),
+            'preco_percentis': {
+                f'p{p}': round(percentil(self.histograma_preco, LIMITES_PRECO, p), 2) for p in percentis
+            },
+            'km_percentis': {
+                f'p{p}': round(percentil(self.histograma_km, LIMITES_KM, p)) for p in percentis
+            },
+        }
+
+
+def chave(valores: dict) -> tuple:
+    return valores['marca'], valores['modelo'], valores['ano_fabricacao'] or 0
+
+
+def _somar(model, chave: dict, **deltas):
+    """
+    Soma os deltas aos contadores da linha com a chave, criando-a se ainda
+    não existe, no padrão de app.facets: um UPDATE relativo, sem ler nem
+    bloquear a linha antes.
+    """
+    incrementos = {campo: F(campo) + delta for campo, delta in deltas.items()}
+    if model.objects.filter(**chave).update(**incrementos) or deltas['quantidade'] < 0:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**chave, **deltas)
+    except IntegrityError:
+        # Outro processo criou a linha ao mesmo tempo; basta incrementá-la.
+        model.objects.filter(**chave).update(**incrementos)
+
+
+def _ajustar(marca, modelo, ano, preco, km, sinal: int):
+    grupo = {'marca': marca, 'modelo': modelo, 'ano': ano}
+    with transaction.atomic():
+        _somar(EstatisticaCarro, grupo, quantidade=sinal, soma_preco=sinal * Decimal(preco), soma_km=sinal * km)
+        _somar(FaixaEstatisticaCarro, {**grupo, 'dimensao': FaixaEstatisticaCarro.PRECO,
+                                       'faixa': indice_faixa(LIMITES_PRECO, preco)}, quantidade=sinal)
+        _somar(FaixaEstatisticaCarro, {**grupo, 'dimensao': FaixaEstatisticaCarro.KM,
+                                       'faixa': indice_faixa(LIMITES_KM, km)}, quantidade=sinal)
+        if sinal < 0 and EstatisticaCarro.objects.filter(**grupo, quantidade__lte=0).delete()[0]:
+            FaixaEstatisticaCarro.objects.filter(**grupo).delete()
+
+
+def aplicar_alteracao(antes: dict = None, depois: dict = None):
+    """
+    Atualiza os agregados a partir dos valores de um carro antes e depois de
+    uma alteração (marca, modelo, ano_fabricacao, preco, km). Use antes=None
+    para inclusões e depois=None para exclusões.
+    """
+    if antes and depois and chave(antes) == chave(depois) \
+            and Decimal(antes['preco']) == Decimal(depois['preco']) and antes['km'] == depois['km']:
+        return
+    if antes:
+        _ajustar(*chave(antes), antes['preco'], antes['km'], -1)
+    if depois:
+        _ajustar(*chave(depois), depois['preco'], depois['km'], 1)
+
+
+def consultar_estatisticas(marca: str, modelo: str = None, ano: int = None, percentis=PERCENTIS_PADRAO):
+    """
+    Retorna média e percentis de preço e km para uma marca, opcionalmente
+    restrita a um modelo e a um ano de fabricação. Os grupos que casam são
+    somados no banco, então consultar só a marca soma todos os seus modelos
+    e anos. Retorna None quando não há carros.
+    """
+    filtro = {'marca': marca}
+    if modelo:
+        filtro['modelo'] = modelo
+    if ano is not None:
+        filtro['ano'] = ano
+    somas = EstatisticaCarro.objects.filter(**filtro).aggregate(
+        quantidade=Sum('quantidade'), soma_preco=Sum('soma_preco'), soma_km=Sum('soma_km')
+    )
+    if not somas['quantidade'] or somas['quantidade'] <= 0:
+        return None
+    total = Agregado(**somas)
+    faixas = FaixaEstatisticaCarro.objects.filter(**filtro).order_by().values('dimensao', 'faixa') \
+        .annotate(total=Sum('quantidade')).values_list('dimensao', 'faixa', 'total')
+    for dimensao, faixa, quantidade in faixas:
+        total.histograma(dimensao)[faixa] += quantidade
+    return total.resumo(percentis)
+
+
+def _faixa_sql(campo: str, limites: list) -> Case:
+    """
+    O índice de indice_faixa(limites, campo) calculado pelo banco.
+    """
+    return Case(
+        *[When(**{f'{campo}__gte': limites[indice]}, then=Value(indice)) for indice in range(len(limites) - 2, 0, -1)],
+        default=Value(0), output_field=IntegerField(),
+    )
+
+
+def _agregar_intervalo(inicio: int, fim: int, fechar_conexao: bool) -> dict:
+    """
+    Agrega no banco, com GROUP BY, os carros com id em [inicio, fim): uma
+    consulta para contagens e somas e uma por histograma. Em threads
+    auxiliares fecha a conexão própria ao terminar.
+    """
+    agregados = defaultdict(Agregado)
+    grupo = ('marca', 'modelo', 'ano_fabricacao')
+    try:
+        # Lê sempre do primário: as threads auxiliares não herdam a fixação
+        # feita pelo roteador de réplicas, e a reconstrução não pode usar
+        # dados atrasados.
+        carros = Carro.objects.using(DEFAULT_DB_ALIAS).disponiveis().filter(id__gte=inicio, id__lt=fim).order_by()
+        somas = carros.values(*grupo).annotate(quantidade=Count('id'), soma_preco=Sum('preco'), soma_km=Sum('km'))
+        for linha in somas:
+            agregado = agregados[linha['marca'], linha['modelo'], linha['ano_fabricacao'] or 0]
+            agregado.mesclar(Agregado(linha['quantidade'], linha['soma_preco'], linha['soma_km']))
+        for dimensao, limites in ((FaixaEstatisticaCarro.PRECO, LIMITES_PRECO), (FaixaEstatisticaCarro.KM, LIMITES_KM)):
+            faixas = carros.values(*grupo, faixa=_faixa_sql(dimensao, limites)).annotate(quantidade=Count('id'))
+            for linha in faixas:
+                agregado = agregados[linha['marca'], linha['modelo'], linha['ano_fabricacao'] or 0]
+                agregado.histograma(dimensao)[linha['faixa']] += linha['quantidade']
+    finally:
+        if fechar_conexao:
+            connection.close()
+    return agregados
+
+
+def reconstruir_estatisticas(workers: int = 4, tamanho_chunk: int = 50000) -> int:
+    """
+    Recalcula todos os agregados a partir dos carros à venda e substitui as
+    tabelas de resumo. A tabela é dividida em intervalos de id agregados pelo
+    banco; as threads só esperam pelas consultas, então rodam em paralelo
+    apesar do GIL. Retorna o número de grupos gravados.
+    """
+    limites = Carro.objects.using(DEFAULT_DB_ALIAS).aggregate(menor=Min('id'), maior=Max('id'))
+    totais = defaultdict(Agregado)
+    if limites['menor'] is not None:
+        intervalos = [
+            (inicio, inicio + tamanho_chunk)
+            for inicio in range(limites['menor'], limites['maior'] + 1, tamanho_chunk)
+        ]
+        # Dentro de uma transação aberta as outras conexões não veriam os
+        # dados ainda não confirmados, então agrega na própria thread.
+        if workers <= 1 or connection.in_atomic_block:
+            parciais = [_agregar_intervalo(inicio, fim, False) for inicio, fim in intervalos]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                parciais = list(executor.map(lambda intervalo: _agregar_intervalo(*intervalo, True), intervalos))
+        for parcial in parciais:
+            for grupo, agregado in parcial.items():
+                totais[grupo].mesclar(agregado)
+    novas, faixas = [], []
+    for (marca, modelo, ano), agregado in totais.items():
+        novas.append(EstatisticaCarro(marca=marca, modelo=modelo, ano=ano, quantidade=agregado.quantidade,
+                                      soma_preco=agregado.soma_preco, soma_km=agregado.soma_km))
+        for dimensao in (FaixaEstatisticaCarro.PRECO, FaixaEstatisticaCarro.KM):
+            faixas.extend(
+                FaixaEstatisticaCarro(marca=marca, modelo=modelo, ano=ano, dimensao=dimensao, faixa=faixa,
+                                      quantidade=quantidade)
+                for faixa, quantidade in enumerate(agregado.histograma(dimensao)) if quantidade
+            )
+    with transaction.atomic():
+        EstatisticaCarro.objects.all().delete()
+        FaixaEstatisticaCarro.objects.all().delete()
+        EstatisticaCarro.objects.bulk_create(novas, batch_size=1000)
+        FaixaEstatisticaCarro.objects.bulk_create(faixas, batch_size=1000)
+    return len(novas)
@@ -0,0 +1,122 @@
+import gzip
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage, storages
+from django.utils.functional import cached_property
+
+
+class _ConteudoExistente(FileExistsError):
+    pass
+
+
+class ArmazenamentoConteudo(FileSystemStorage):
+    """
+    Armazenamento endereçado pelo conteúdo: o nome de cada arquivo deriva do
+    hash do seu conteúdo, então um nome já existente tem o mesmo conteúdo e
+    não é gravado de novo. Os arquivos nunca mudam, o que permite servi-los
+    com cache permanente.
+
+    Atributos:
+        subdiretorio (str): Subdiretório de MEDIA_ROOT (e de MEDIA_URL) usado
+            quando location e base_url não são informados.
+    """
+
+    def __init__(self, subdiretorio: str = '', **kwargs):
+        self.subdiretorio = subdiretorio
+        self._gravando = threading.local()
+        super().__init__(**kwargs)
+
+    # Com subdiretorio, location e base_url acompanham MEDIA_ROOT e MEDIA_URL,
+    # inclusive quando alterados em testes.
+    @cached_property
+    def base_location(self):
+        return os.path.join(self._value_or_setting(self._location, settings.MEDIA_ROOT), self.subdiretorio)
+
+    @cached_property
+    def base_url(self):
+        url = self._value_or_setting(self._base_url, settings.MEDIA_URL)
+        if self.subdiretorio:
+            url = f"{url.rstrip('/')}/{self.subdiretorio}/"
+        return url
+
+    def get_available_name(self, name, max_length=None):
+        # FileSystemStorage._save pede outro nome quando o arquivo já existe.
+        # Aqui o mesmo nome é o mesmo conteúdo: interrompe a gravação em vez
+        # de tentar de novo com o mesmo nome para sempre.
+        if getattr(self._gravando, 'nome', None) == name:
+            raise _ConteudoExistente(name)
+        # Nunca acrescenta sufixos: o mesmo nome é o mesmo arquivo.
+        return name
+
+    def _save(self, name, content):
+        # Sem verificar exists() antes: a criação exclusiva do arquivo é que
+        # decide, inclusive entre dois envios simultâneos da mesma foto.
+        self._gravando.nome = name
+        try:
+            return super()._save(name, content)
+        except _ConteudoExistente:
+            return name
+        finally:
+            self._gravando.nome = None
+
+
+# Formatos que já são comprimidos: gzip não reduziria o tamanho.
+EXTENSOES_COMPRIMIDAS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.woff', '.woff2', '.gz', '.br', '.zip', '.mp4', '.webm',
+}
+# Só grava a variante .gz se ela economizar ao menos esta fração do arquivo.
+ECONOMIA_MINIMA = 0.05
+
+
+def comprimir_gzip(caminho: str) -> bool:
+    """
+    Grava caminho + '.gz' com compressão máxima se isso valer a pena.
+    Retorna se a variante foi gravada.
+    """
+    if os.path.splitext(caminho)[1].lower() in EXTENSOES_COMPRIMIDAS:
+        return False
+    with open(caminho, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    # mtime=0 deixa o .gz idêntico entre execuções do collectstatic.
+    comprimido = gzip.compress(conteudo, compresslevel=9, mtime=0)
+    if len(comprimido) > len(conteudo) * (1 - ECONOMIA_MINIMA):
+        return False
+    with open(caminho + '.gz', 'wb') as arquivo:
+        arquivo.write(comprimido)
+    return True
+
+
+class ArmazenamentoEstatico(ManifestStaticFilesStorage):
+    """
+    Arquivos estáticos com o hash do conteúdo no nome e, no collectstatic,
+    variantes .gz pré-comprimidas ao lado de cada arquivo compressível.
+    Servidos por app.static_files.ArquivosEstaticosMiddleware.
+
+    Enquanto o collectstatic não rodou (desenvolvimento e testes), não há
+    manifesto e as URLs usam os nomes originais em vez de falhar.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        for original, processado, alterado in super().post_process(paths, dry_run=dry_run, **options):
+            yield original, processado, alterado
+            if dry_run or isinstance(alterado, Exception) or not processado:
+                continue
+            for nome in {original, processado}:
+                if self.exists(nome):
+                    comprimir_gzip(self.path(nome))
+
+
+def armazenamento_fotos():
+    """
+    O armazenamento configurado em STORAGES['fotos'], resolvido em tempo de
+    execução para que as migrações não guardem a configuração.
+    """
+    return storages['fotos']
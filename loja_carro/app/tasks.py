@@ -0,0 +1,36 @@
+"""
+As tarefas que podem ser enfileiradas em app.jobs. Importado por
+AppConfig.ready, para que o registro esteja completo em qualquer processo.
+"""
+from django.core.files.storage import default_storage
+
+from . import archive, facets, photos, sales, stats
+from .importer import abrir_leitor, importar_carros
+from .jobs import registrar
+
+
+def importar_arquivo(armazenado: str, formato: str = None, tamanho_lote: int = 1000, resumos: bool = True) -> dict:
+    """
+    O que o comando import_carros faz, como tarefa: importa o arquivo e, se
+    algum carro foi gravado, recalcula facetas e estatísticas.
+
+    armazenado é o nome do arquivo no armazenamento padrão (STORAGES['default']),
+    para onde import_carros --em-segundo-plano o copia; ele é apagado depois da importação.
+    Com vários nós, esse armazenamento precisa ser compartilhado por eles.
+    """
+    arquivo, leitor = abrir_leitor(armazenado, formato, armazenamento=default_storage)
+    with arquivo:
+        gravados, rejeitados = importar_carros(leitor, tamanho_lote=tamanho_lote)
+    default_storage.delete(armazenado)
+    if gravados and resumos:
+        facets.reconstruir_facetas()
+        stats.reconstruir_estatisticas()
+    return {'gravados': gravados, 'rejeitados': rejeitados}
+
+
+registrar('fotos.processar', photos.processar_foto)
+registrar('carros.importar', importar_arquivo, tentativas=1)
+registrar('carros.arquivar_vendidos', archive.arquivar_vendidos)
+registrar('facetas.reconstruir', facets.reconstruir_facetas)
+registrar('estatisticas.reconstruir', stats.reconstruir_estatisticas)
+registrar('vendas.reconstruir_resumo', sales.reconstruir_vendas_mensais)
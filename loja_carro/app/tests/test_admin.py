@@ -0,0 +1,102 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Carro, Cliente, Endereco, Loja_Unidade, Vendedor
+from ..pagination import PaginadorContagemEstimada
+from ..sales import registrar_venda
+
+
+class AdminTabelaGrandeTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria um superusuário e uma loja com vendedor para navegar pelo admin.
+        '''
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@loja.com', 'password123'))
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=endereco)
+        self.vendedor = Vendedor.objects.create(username='vendedor', telefone='+5548999990000', loja_fk=loja)
+
+    def criar_clientes(self, inicio, quantidade):
+        for i in range(inicio, inicio + quantidade):
+            Cliente.objects.create(username=f'cliente{i}', data_nascimento=date(1990, 1, 1),
+                                   telefone=f'+55489888{i:05d}', vendedor_fk=self.vendedor)
+
+    def consultas_changelist(self):
+        with CaptureQueriesContext(connection) as contexto:
+            resposta = self.client.get(reverse('admin:app_cliente_changelist'))
+        self.assertEqual(resposta.status_code, 200)
+        return len(contexto)
+
+    def test_changelist_com_numero_fixo_de_consultas(self):
+        '''
+        Verifica que a lista de clientes não faz uma consulta por vendedor exibido.
+        '''
+        self.criar_clientes(0, 2)
+        poucas = self.consultas_changelist()
+        self.criar_clientes(2, 20)
+        self.assertEqual(self.consultas_changelist(), poucas)
+
+    def test_busca_por_telefone(self):
+        '''
+        Verifica a busca exata pelo telefone do cliente.
+        '''
+        self.criar_clientes(0, 3)
+        resposta = self.client.get(reverse('admin:app_cliente_changelist'), {'q': '+5548988800001'})
+        self.assertContains(resposta, 'cliente1')
+        self.assertNotContains(resposta, 'cliente2')
+
+    def test_autocomplete_de_vendedor_por_prefixo(self):
+        '''
+        Verifica que o autocomplete de vendedor do cliente encontra o vendedor pelo início do username.
+        '''
+        url = reverse('admin:autocomplete')
+        parametros = {'app_label': 'app', 'model_name': 'cliente', 'field_name': 'vendedor_fk'}
+        resposta = self.client.get(url, {**parametros, 'term': 'Vend'})
+        self.assertEqual([item['text'] for item in resposta.json()['results']], ['vendedor'])
+        self.assertEqual(self.client.get(url, {**parametros, 'term': 'endedor'}).json()['results'], [])
+
+    def test_paginador_usa_estimativa_apenas_sem_filtros(self):
+        '''
+        Verifica que a estimativa só substitui a contagem exata em querysets sem filtro.
+        '''
+        self.criar_clientes(0, 3)
+        with mock.patch('app.pagination.estimar_linhas', return_value=5_000_000):
+            self.assertEqual(PaginadorContagemEstimada(Cliente.objects.order_by('pk'), 100).count, 5_000_000)
+            filtrado = Cliente.objects.filter(username='cliente1').order_by('pk')
+            self.assertEqual(PaginadorContagemEstimada(filtrado, 100).count, 1)
+        self.assertEqual(PaginadorContagemEstimada(Cliente.objects.order_by('pk'), 100).count, 3)
+
+    def test_vendas_com_carro_sem_n_mais_um(self):
+        '''
+        Verifica que a lista de vendas busca os carros em uma consulta e mantém as vendas de carros arquivados.
+        '''
+        self.criar_clientes(0, 1)
+        cliente = Cliente.objects.get()
+        url = reverse('admin:app_venda_changelist')
+
+        def vender(quantidade):
+            for _ in range(quantidade):
+                carro = Carro.objects.create(marca='Fiat', modelo='Argo', ano='2022', preco=Decimal('70000'),
+                                             km=1000, cor='Branco')
+                registrar_venda(carro, cliente, self.vendedor, Decimal('68000'))
+
+        def consultas():
+            with CaptureQueriesContext(connection) as contexto:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(contexto)
+
+        vender(2)
+        poucas = consultas()
+        vender(10)
+        self.assertEqual(consultas(), poucas)
+        arquivado = Carro.todos.order_by('pk').first()
+        Carro.todos.filter(pk=arquivado.pk).delete()
+        self.assertContains(self.client.get(url), f'{arquivado.pk} (arquivado)')
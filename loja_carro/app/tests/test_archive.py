@@ -0,0 +1,134 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import arquivar_vendidos, vendas
+from ..facets import obter_facetas
+from ..models import Carro, CarroArquivado, HistoricoPreco
+from ..stats import consultar_estatisticas
+
+
+def criar_carro(**extras) -> Carro:
+    dados = {'marca': 'Fiat', 'modelo': 'Argo', 'ano': '2022', 'preco': 70000, 'km': 10000, 'cor': 'Branco'}
+    return Carro.objects.create(**{**dados, **extras})
+
+
+class CarroStatusTest(TestCase):
+
+    def test_objects_ve_apenas_o_estoque(self):
+        '''
+        Testa se Carro.objects esconde os vendidos, que continuam em Carro.todos.
+        '''
+        disponivel = criar_carro()
+        reservado = criar_carro(status=Carro.RESERVADO)
+        vendido = criar_carro(status=Carro.VENDIDO)
+        self.assertCountEqual(Carro.objects.values_list('pk', flat=True), [disponivel.pk, reservado.pk])
+        self.assertEqual(list(Carro.objects.disponiveis().values_list('pk', flat=True)), [disponivel.pk])
+        self.assertEqual(Carro.todos.count(), 3)
+        self.assertIsNotNone(vendido.vendido_em)
+
+    def test_unicidade_considera_os_vendidos(self):
+        '''
+        Testa se a validação de unicidade, que usa o manager padrão, enxerga a referência de um carro vendido.
+        '''
+        criar_carro(referencia='R1', status=Carro.VENDIDO)
+        with self.assertRaises(ValidationError) as erro:
+            Carro(marca='Fiat', modelo='Mobi', ano='2021', preco=50000, km=0, cor='Preto', referencia='R1').full_clean()
+        self.assertIn('referencia', erro.exception.message_dict)
+
+    def test_vendido_em_acompanha_o_status(self):
+        '''
+        Testa se vendido_em é preenchido na venda, também com update_fields, e limpo ao desfazê-la.
+        '''
+        carro = criar_carro()
+        self.assertIsNone(carro.vendido_em)
+        carro.status = Carro.VENDIDO
+        carro.save(update_fields=['status'])
+        self.assertIsNotNone(Carro.todos.get(pk=carro.pk).vendido_em)
+        carro.status = Carro.DISPONIVEL
+        carro.save()
+        self.assertIsNone(Carro.objects.get(pk=carro.pk).vendido_em)
+
+    def test_resumos_contam_so_carros_a_venda(self):
+        '''
+        Testa se reservar ou vender tira o carro das facetas e estatísticas, e voltar à venda o devolve.
+        '''
+        carro = criar_carro(marca='Toyota')
+        criar_carro(marca='Toyota', preco=90000)
+        carro.status = Carro.RESERVADO
+        carro.save()
+        self.assertEqual(obter_facetas()['marca'], {'Toyota': 1})
+        self.assertEqual(consultar_estatisticas('Toyota')['quantidade'], 1)
+        carro.status = Carro.VENDIDO
+        carro.save()
+        carro.delete()
+        self.assertEqual(obter_facetas()['marca'], {'Toyota': 1})
+        outro = Carro.todos.get(marca='Toyota')
+        outro.status = Carro.VENDIDO
+        outro.save()
+        outro.status = Carro.DISPONIVEL
+        outro.save()
+        self.assertEqual(consultar_estatisticas('Toyota')['quantidade'], 1)
+
+    def test_busca_mostra_so_disponiveis(self):
+        '''
+        Testa se a busca pública não lista carros reservados ou vendidos.
+        '''
+        disponivel = criar_carro()
+        criar_carro(status=Carro.RESERVADO)
+        criar_carro(status=Carro.VENDIDO)
+        resultados = self.client.get(reverse('app:busca_carros')).json()['resultados']
+        self.assertEqual([carro['id'] for carro in resultados], [disponivel.pk])
+
+
+class ArquivamentoTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria um carro vendido há um ano, com histórico de preço, um vendido ontem e um disponível.
+        '''
+        self.antigo = criar_carro(referencia='A1')
+        self.antigo.preco = Decimal('65000')
+        self.antigo.save()
+        self.antigo.status = Carro.VENDIDO
+        self.antigo.vendido_em = timezone.now() - datetime.timedelta(days=365)
+        self.antigo.save()
+        self.recente = criar_carro(status=Carro.VENDIDO, vendido_em=timezone.now() - datetime.timedelta(days=1))
+        self.disponivel = criar_carro()
+
+    def test_arquiva_vendidos_antigos(self):
+        '''
+        Testa se só o vendido há mais tempo que o limite sai de app_carro, levando o histórico de preços.
+        '''
+        self.assertEqual(arquivar_vendidos(dias=30, tamanho_lote=1), 1)
+        self.assertFalse(Carro.todos.filter(pk=self.antigo.pk).exists())
+        self.assertFalse(HistoricoPreco.objects.filter(carro_id=self.antigo.pk).exists())
+        arquivado = CarroArquivado.objects.get(pk=self.antigo.pk)
+        self.assertEqual((arquivado.referencia, arquivado.preco), ('A1', Decimal('65000')))
+        self.assertEqual(arquivado.historico_precos[0]['preco_anterior'], '70000.00')
+        self.assertEqual(Carro.todos.count(), 2)
+        self.assertEqual(arquivar_vendidos(dias=30), 0)
+
+    def test_historico_de_vendas_inclui_arquivados(self):
+        '''
+        Testa se vendas() junta os vendidos ainda em app_carro e os arquivados, dos mais recentes para os mais antigos.
+        '''
+        arquivar_vendidos(dias=30)
+        self.assertEqual([venda['id'] for venda in vendas()], [self.recente.pk, self.antigo.pk])
+        desde = timezone.now() - datetime.timedelta(days=30)
+        self.assertEqual([venda['id'] for venda in vendas(desde=desde)], [self.recente.pk])
+
+    def test_comando(self):
+        '''
+        Testa o comando archive_sold.
+        '''
+        saida = StringIO()
+        call_command('archive_sold', '--dias', '30', stdout=saida)
+        self.assertIn('1 carros', saida.getvalue())
+        self.assertTrue(CarroArquivado.objects.filter(pk=self.antigo.pk).exists())
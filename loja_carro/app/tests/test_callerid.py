@@ -0,0 +1,100 @@
+import datetime
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..callerid import identificar, identificar_lote, normalizar_telefone, reconstruir_diretorio
+from ..models import Cliente, DiretorioTelefone, Endereco, Loja_Unidade, Vendedor
+
+
+class CallerIdTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria uma loja, um vendedor e um cliente com telefones diferentes.
+        '''
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=endereco)
+        self.vendedor = Vendedor.objects.create(username='ana', first_name='Ana', last_name='Silva',
+                                                telefone='+5548999990000', loja_fk=self.loja)
+        self.cliente = Cliente.objects.create(username='carlos', telefone='+5548988880000', vendedor_fk=self.vendedor,
+                                              data_nascimento=datetime.date(1990, 1, 1))
+
+    def test_normaliza_formatos(self):
+        '''
+        Verifica que formatos nacionais e internacionais viram o mesmo E.164.
+        '''
+        for texto in ('(48) 99999-0000', '+55 48 99999 0000', '48999990000', '+5548999990000'):
+            self.assertEqual(normalizar_telefone(texto), '+5548999990000')
+        self.assertIsNone(normalizar_telefone('123'))
+
+    def test_identifica_em_uma_consulta(self):
+        '''
+        Verifica que cada tipo de dono é encontrado com uma única consulta.
+        '''
+        with self.assertNumQueries(1):
+            donos = identificar('(48) 3333-0000')
+        self.assertEqual(donos, [{'numero': '+554833330000', 'tipo': 'loja', 'objeto_id': self.loja.pk,
+                                  'nome': 'Loja Centro'}])
+        self.assertEqual(identificar('48 99999-0000')[0]['nome'], 'Ana Silva')
+        self.assertEqual(identificar('48 98888-0000')[0]['tipo'], 'cliente')
+        self.assertEqual(identificar('48 97777-0000'), [])
+
+    def test_sinais_mantem_o_diretorio(self):
+        '''
+        Verifica que alterar o telefone, o nome pelo User ou excluir o dono atualiza o diretório.
+        '''
+        self.cliente.telefone = '+5548977770000'
+        self.cliente.save()
+        self.assertEqual(identificar('48988880000'), [])
+        user = User.objects.get(pk=self.cliente.pk)
+        user.first_name = 'Carlos'
+        user.save()
+        self.assertEqual(identificar('48977770000')[0]['nome'], 'Carlos')
+        self.cliente.delete()
+        self.assertEqual(identificar('48977770000'), [])
+        self.assertEqual(DiretorioTelefone.objects.count(), 2)
+
+    def test_lote(self):
+        '''
+        Verifica a identificação em lote com números repetidos, inválidos e desconhecidos.
+        '''
+        with self.assertNumQueries(1):
+            resultado = identificar_lote(['(48) 3333-0000', '+554833330000', 'xyz', '48 97777-0000'])
+        self.assertEqual(resultado['(48) 3333-0000'], resultado['+554833330000'])
+        self.assertEqual(resultado['xyz'], {'e164': None, 'donos': []})
+        self.assertEqual(resultado['48 97777-0000']['donos'], [])
+
+    def test_reconstrucao_e_comando(self):
+        '''
+        Verifica a reconstrução do diretório e o CSV do comando identify_callers.
+        '''
+        DiretorioTelefone.objects.all().delete()
+        self.assertEqual(reconstruir_diretorio(), 3)
+        saida = StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as arquivo:
+            arquivo.write('(48) 99999-0000\n123\n')
+        try:
+            call_command('identify_callers', arquivo.name, stdout=saida)
+        finally:
+            os.remove(arquivo.name)
+        linhas = saida.getvalue().splitlines()
+        self.assertEqual(linhas[1], f'(48) 99999-0000,+5548999990000,vendedor,{self.vendedor.pk},Ana Silva')
+        self.assertEqual(linhas[2], '123,,,,')
+
+    def test_endpoint(self):
+        '''
+        Verifica que o endpoint exige login de staff e aceita vários números.
+        '''
+        url = reverse('app:identificar_telefone')
+        self.assertEqual(self.client.get(url, {'numero': '48999990000'}).status_code, 302)
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        corpo = self.client.get(url, {'numero': ['48999990000', '48933330000']}).json()
+        self.assertEqual(corpo['resultados'][0]['donos'][0]['tipo'], 'vendedor')
+        self.assertEqual(corpo['resultados'][1]['donos'], [])
+        self.assertEqual(self.client.get(url).status_code, 400)
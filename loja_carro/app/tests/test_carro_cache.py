@@ -0,0 +1,118 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import carro_cache
+from ..carro_cache import LRU, aobter_carro, obter_carro
+from ..importer import importar_carros
+from ..models import Carro
+
+
+class LRUTest(TestCase):
+
+    def test_descarta_o_menos_usado(self):
+        '''
+        Verifica que o LRU respeita o tamanho máximo e mantém os itens lidos recentemente.
+        '''
+        lru = LRU(tamanho_maximo=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(len(lru), 2)
+
+
+class CacheCarroTest(TestCase):
+
+    def setUp(self):
+        '''
+        Limpa os dois níveis de cache e cria um carro.
+        '''
+        cache.clear()
+        carro_cache._lru.clear()
+        self.carro = Carro.objects.create(marca='Chevrolet', modelo='Onix', ano='2022', preco=Decimal('60000.00'),
+                                          km=12000, cor='Branco')
+
+    def test_leituras_repetidas_nao_consultam_o_banco(self):
+        '''
+        Verifica que só a primeira leitura vai ao banco e que o LRU dispensa o cache compartilhado.
+        '''
+        with self.assertNumQueries(1):
+            obter_carro(self.carro.pk)
+            dados = obter_carro(self.carro.pk)
+        self.assertEqual(dados['modelo'], 'Onix')
+        carro_cache._lru.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(obter_carro(self.carro.pk), dados)
+
+    async def test_leitura_assincrona_compartilha_o_cache(self):
+        '''
+        Verifica que a versão assíncrona lê do banco e aproveita as entradas da versão síncrona.
+        '''
+        dados = await aobter_carro(self.carro.pk)
+        self.assertEqual(dados['modelo'], 'Onix')
+        carro_cache._lru.clear()
+        self.assertEqual(await aobter_carro(self.carro.pk), dados)
+        self.assertIsNone(await aobter_carro(0))
+
+    def test_gravacao_invalida_em_todos_os_processos(self):
+        '''
+        Verifica que salvar ou excluir o carro troca a versão e o detalhe reflete a mudança.
+        '''
+        obter_carro(self.carro.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.carro.preco = Decimal('55000.00')
+            self.carro.save()
+        self.assertEqual(obter_carro(self.carro.pk)['preco'], '55000.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.carro.delete()
+        self.assertIsNone(obter_carro(self.carro.pk))
+
+    def test_endpoint(self):
+        '''
+        Verifica o endpoint de detalhe e o 404 para carros inexistentes.
+        '''
+        resposta = self.client.get(reverse('app:detalhe_carro', args=[self.carro.pk]))
+        self.assertEqual(resposta.json()['marca'], 'Chevrolet')
+        self.assertEqual(self.client.get(reverse('app:detalhe_carro', args=[0])).status_code, 404)
+
+    def test_inexistente_nao_cria_versao(self):
+        '''
+        Verifica que consultar um id inexistente não grava nada no cache compartilhado.
+        '''
+        self.assertIsNone(obter_carro(0))
+        self.assertIsNone(cache.get(carro_cache._chave_versao(0)))
+
+    def test_gravacao_durante_a_leitura(self):
+        '''
+        Verifica que uma gravação confirmada entre a consulta e o cache não deixa os dados antigos alcançáveis.
+        '''
+        def ler_e_gravar(pk):
+            carro = Carro.objects.get(pk=pk)
+            Carro.objects.filter(pk=pk).update(preco=Decimal('55000.00'))
+            carro_cache.invalidar_carro(pk)
+            return carro
+
+        consulta = mock.Mock()
+        consulta.objects.using.return_value.filter = lambda pk: mock.Mock(first=lambda: ler_e_gravar(pk))
+        with mock.patch.object(carro_cache, 'Carro', consulta):
+            self.assertEqual(obter_carro(self.carro.pk)['preco'], '60000.00')
+        self.assertEqual(obter_carro(self.carro.pk)['preco'], '55000.00')
+
+    def test_upsert_da_importacao_invalida(self):
+        '''
+        Verifica que a importação, que grava sem sinais, invalida o detalhe dos carros atualizados.
+        '''
+        self.carro.referencia = 'R1'
+        self.carro.save()
+        self.assertEqual(obter_carro(self.carro.pk)['preco'], '60000.00')
+        linha = {'referencia': 'R1', 'marca': 'Chevrolet', 'modelo': 'Onix', 'ano': '2020',
+                 'preco': '5000', 'km': '1000', 'cor': 'Preto'}
+        with self.captureOnCommitCallbacks(execute=True):
+            importar_carros([linha])
+        self.assertEqual(obter_carro(self.carro.pk)['preco'], '5000.00')
@@ -0,0 +1,112 @@
+import datetime
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from ..conditional import validador_carros, validador_lojas
+from ..models import Carro, Endereco, Loja_Unidade
+
+
+def criar_carro(**extras) -> Carro:
+    dados = {'marca': 'Fiat', 'modelo': 'Argo', 'ano': '2022', 'preco': 70000, 'km': 10000, 'cor': 'Branco'}
+    return Carro.objects.create(**{**dados, **extras})
+
+
+class GetCondicionalTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria dois carros à venda e uma loja.
+        '''
+        self.carro = criar_carro()
+        criar_carro(modelo='Mobi')
+        self.endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000',
+                                                endereco_fk=self.endereco)
+
+    def envelhecer(self):
+        '''
+        Recua as datas de alteração, para que a próxima gravação seja posterior a elas.
+        '''
+        antes = timezone.now() - datetime.timedelta(minutes=5)
+        Carro.todos.update(atualizado_em=antes)
+        Loja_Unidade.objects.update(atualizado_em=antes)
+        Endereco.objects.update(atualizado_em=antes)
+
+    def test_304_sem_executar_a_listagem(self):
+        '''
+        Testa se um ETag ainda válido recebe 304 só com as consultas do validador.
+        '''
+        url = reverse('app:busca_carros')
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', resposta)
+        with self.assertNumQueries(3):
+            nao_modificada = self.client.get(url, headers={'if-none-match': resposta['ETag']})
+        self.assertEqual(nao_modificada.status_code, 304)
+        self.assertEqual(nao_modificada.content, b'')
+
+    def test_validador_muda_com_o_estoque(self):
+        '''
+        Testa se alterar, vender ou excluir um carro invalida o ETag das listagens de carros.
+        '''
+        url = reverse('app:facetas_carros')
+        etag = self.client.get(url)['ETag']
+        self.envelhecer()
+        etag_antigo = self.client.get(url)['ETag']
+        self.assertNotEqual(etag_antigo, etag)
+        self.carro.preco = 65000
+        self.carro.save(update_fields=['preco'])
+        resposta = self.client.get(url, headers={'if-none-match': etag_antigo})
+        self.assertEqual(resposta.status_code, 200)
+        etag = resposta['ETag']
+        self.carro.status = Carro.VENDIDO
+        self.carro.save()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+        ultima, total = validador_carros()
+        Carro.todos.filter(modelo='Mobi').delete()
+        self.assertEqual(validador_carros()[1], total - 1)
+        self.assertGreater(validador_carros()[0], ultima)
+
+    def test_exclusao_avanca_o_last_modified(self):
+        '''
+        Testa se excluir um carro à venda invalida um If-Modified-Since, e arquivar um vendido não.
+        '''
+        self.envelhecer()
+        url = reverse('app:busca_carros')
+        desde = self.client.get(url)['Last-Modified']
+        Carro.todos.filter(pk=self.carro.pk).update(status=Carro.VENDIDO)
+        Carro.todos.filter(pk=self.carro.pk).delete()
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': desde}).status_code, 304)
+        Carro.objects.get(modelo='Mobi').delete()
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': desde}).status_code, 200)
+
+    def test_if_modified_since(self):
+        '''
+        Testa o Last-Modified das lojas, que acompanha também as alterações dos endereços.
+        '''
+        self.envelhecer()
+        url = reverse('app:lista_lojas')
+        resposta = self.client.get(url)
+        self.assertEqual(resposta.json()['resultados'][0]['endereco']['cidade'], 'Florianópolis')
+        desde = resposta['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': desde}).status_code, 304)
+        self.endereco.cidade = 'São José'
+        self.endereco.save()
+        self.assertEqual(validador_lojas()[0], Endereco.objects.get().atualizado_em)
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': desde}).status_code, 200)
+        futuro = http_date((timezone.now() + datetime.timedelta(minutes=1)).timestamp())
+        self.assertEqual(self.client.get(url, headers={'if-modified-since': futuro}).status_code, 304)
+
+    async def test_view_assincrona(self):
+        '''
+        Testa o GET condicional no inventário, que é uma view assíncrona.
+        '''
+        url = reverse('app:inventario_carros')
+        resposta = await self.async_client.get(url)
+        self.assertEqual(resposta.status_code, 200)
+        nao_modificada = await self.async_client.get(url, headers={'if-none-match': resposta['ETag']})
+        self.assertEqual(nao_modificada.status_code, 304)
@@ -0,0 +1,98 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..export import agerar, gerar
+from ..models import Carro, Cliente, Endereco, Loja_Unidade, Vendedor
+
+
+class ExportacaoTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria uma loja com dois vendedores, cada um com clientes, e alguns carros.
+        '''
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=endereco)
+        for v in range(2):
+            vendedor = Vendedor.objects.create_user(
+                username=f'vendedor{v}', password='password123', telefone=f'+55489990000{v}', loja_fk=self.loja
+            )
+            for c in range(3):
+                Cliente.objects.create_user(
+                    username=f'cliente{v}{c}', password='password123', data_nascimento=date(1990, 1, 1),
+                    telefone=f'+5548988800{v}{c}', vendedor_fk=vendedor,
+                )
+        Carro.objects.create(marca='Fiat', modelo='Uno', ano='2015', preco=Decimal('25000.00'), km=1, cor='Branco')
+
+    def test_clientes_sem_n_mais_um(self):
+        '''
+        Verifica que a exportação de clientes traz vendedor e loja em uma única consulta.
+        '''
+        with self.assertNumQueries(1):
+            linhas = list(csv.reader(io.StringIO(''.join(gerar('clientes', 'csv')))))
+        self.assertEqual(len(linhas), 7)
+        registro = dict(zip(linhas[0], linhas[1]))
+        self.assertEqual(registro['vendedor'], 'vendedor0')
+        self.assertEqual(registro['loja'], 'Loja Centro')
+
+    def test_jsonl(self):
+        '''
+        Verifica que cada linha JSON Lines é um objeto com os valores convertidos para texto.
+        '''
+        objetos = [json.loads(linha) for linha in gerar('carros', 'jsonl')]
+        self.assertEqual(objetos[0]['preco'], '25000.00')
+        self.assertEqual(objetos[0]['km'], 1)
+
+    def test_carros_vendidos(self):
+        '''
+        Verifica que a exportação de carros inclui os vendidos, com status e data da venda.
+        '''
+        Carro.objects.create(marca='VW', modelo='Gol', ano='2018', preco=Decimal('30000.00'), km=1, cor='Preto',
+                             status=Carro.VENDIDO)
+        objetos = [json.loads(linha) for linha in gerar('carros', 'jsonl')]
+        self.assertEqual([objeto['status'] for objeto in objetos], ['disponivel', 'vendido'])
+        self.assertIsNone(objetos[0]['vendido_em'])
+        self.assertIsNotNone(objetos[1]['vendido_em'])
+
+    def test_endpoint_gzip_exige_staff(self):
+        '''
+        Verifica que o endpoint exige usuário da equipe e comprime a resposta sob demanda.
+        '''
+        url = reverse('app:exportar', args=['clientes'])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('financeiro', is_staff=True))
+        resposta = self.client.get(url, {'formato': 'jsonl', 'gzip': '1'})
+        self.assertEqual(resposta['Content-Type'], 'application/gzip')
+        conteudo = gzip.decompress(b''.join(resposta.streaming_content)).decode()
+        self.assertEqual(len(conteudo.splitlines()), 6)
+        self.assertEqual(self.client.get(reverse('app:exportar', args=['nada'])).status_code, 404)
+
+    async def test_endpoint_assincrono(self):
+        '''
+        Verifica que sob ASGI o endpoint transmite um iterador assíncrono, lido em blocos por id, com o
+        mesmo conteúdo da versão síncrona.
+        '''
+        esperado = await sync_to_async(lambda: ''.join(gerar('clientes', 'jsonl')))()
+        self.assertEqual(''.join([parte async for parte in agerar('clientes', 'jsonl', chunk_size=4)]), esperado)
+        await self.async_client.aforce_login(await User.objects.acreate(username='financeiro', is_staff=True))
+        resposta = await self.async_client.get(reverse('app:exportar', args=['clientes']), {'formato': 'jsonl'})
+        self.assertTrue(resposta.is_async)
+        self.assertEqual(b''.join([parte async for parte in resposta.streaming_content]).decode(), esperado)
+
+    def test_comando(self):
+        '''
+        Verifica o comando export_dados escrevendo na saída padrão.
+        '''
+        saida = io.StringIO()
+        call_command('export_dados', 'carros', stdout=saida)
+        self.assertEqual(saida.getvalue().splitlines()[1].split(',')[2], 'Fiat')
@@ -0,0 +1,88 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..facets import faixa_preco, invalidar_cache, obter_facetas
+from ..models import Carro, FacetaCarro
+
+
+class FacetaCarroTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria carros cujas inclusões devem alimentar a tabela de facetas.
+        '''
+        invalidar_cache()
+        self.corolla = Carro.objects.create(marca='Toyota', modelo='Corolla', ano='2019/2020',
+                                            preco=Decimal('90000.00'), km=30000, cor='Preto')
+        self.yaris = Carro.objects.create(marca='Toyota', modelo='Yaris', ano='2019',
+                                          preco=Decimal('70000.00'), km=50000, cor='Branco')
+        self.civic = Carro.objects.create(marca='Honda', modelo='Civic', ano='2021',
+                                          preco=Decimal('350000.00'), km=1000, cor='Preto')
+
+    def contagens(self):
+        return {
+            (f.dimensao, f.valor): f.total
+            for f in FacetaCarro.objects.filter(total__gt=0)
+        }
+
+    def test_faixa_preco(self):
+        '''
+        Verifica os rótulos das faixas de preço, incluindo a faixa aberta.
+        '''
+        self.assertEqual(faixa_preco(Decimal('29999.99')), '0-30000')
+        self.assertEqual(faixa_preco(Decimal('75000')), '75000-100000')
+        self.assertEqual(faixa_preco(Decimal('500000')), '300000+')
+
+    def test_inclusao_alteracao_e_exclusao(self):
+        '''
+        Verifica que as contagens acompanham inclusões, edições e exclusões de Carro.
+        '''
+        contagens = self.contagens()
+        self.assertEqual(contagens[('marca', 'Toyota')], 2)
+        self.assertEqual(contagens[('ano', '2019')], 2)
+        self.assertEqual(contagens[('faixa_preco', '300000+')], 1)
+
+        self.yaris.cor = 'Preto'
+        self.yaris.save()
+        self.civic.delete()
+        contagens = self.contagens()
+        self.assertEqual(contagens[('cor', 'Preto')], 2)
+        self.assertNotIn(('cor', 'Branco'), contagens)
+        self.assertNotIn(('marca', 'Honda'), contagens)
+
+    def test_reconstrucao(self):
+        '''
+        Verifica que o comando rebuild_facets corrige contagens desatualizadas por bulk_create.
+        '''
+        Carro.objects.bulk_create([
+            Carro(marca='Fiat', modelo='Uno', ano='2010', preco=Decimal('20000.00'), km=150000, cor='Branco'),
+        ])
+        self.assertNotIn(('marca', 'Fiat'), self.contagens())
+        call_command('rebuild_facets', stdout=StringIO())
+        self.assertEqual(self.contagens()[('marca', 'Fiat')], 1)
+        self.assertEqual(self.contagens()[('marca', 'Toyota')], 2)
+
+    def test_cache_invalidado_apos_commit(self):
+        '''
+        Verifica que as facetas em cache são descartadas quando uma alteração é confirmada.
+        '''
+        self.assertEqual(obter_facetas()['marca'], {'Toyota': 2, 'Honda': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            Carro.objects.create(marca='Honda', modelo='Fit', ano='2015', preco=Decimal('45000.00'),
+                                 km=90000, cor='Prata')
+        facetas = obter_facetas()
+        with self.assertNumQueries(0):
+            self.assertIs(obter_facetas(), facetas)
+        self.assertEqual(facetas['marca'], {'Honda': 2, 'Toyota': 2})
+
+    def test_endpoint(self):
+        '''
+        Verifica a resposta do endpoint de facetas.
+        '''
+        resposta = self.client.get(reverse('app:facetas_carros'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['cor'], {'Preto': 2, 'Branco': 1})
@@ -0,0 +1,58 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..geo import caixa_delimitadora, haversine_km, uf_de
+from ..models import Endereco, Loja_Unidade
+
+
+class GeoTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria lojas em capitais diferentes, com o estado escrito de formas variadas.
+        '''
+        lojas = [
+            ('Loja Floripa', 'Florianópolis', 'Santa Catarina', '+554833330000'),
+            ('Loja Curitiba', 'Curitiba', 'PR', '+554133330000'),
+            ('Loja SP', 'sao paulo', 'São Paulo', '+551133330000'),
+            ('Loja Manaus', 'Manaus', 'AM', '+559233330000'),
+        ]
+        for nome, cidade, estado, telefone in lojas:
+            endereco = Endereco.objects.create(rua='Rua Central', cidade=cidade, estado=estado, numero='1')
+            Loja_Unidade.objects.create(nome=nome, telefone=telefone, endereco_fk=endereco)
+        Endereco.objects.create(rua='Rua Sem Cidade', cidade='Cidade Inventada', estado='XX', numero='2')
+
+    def test_haversine_e_caixa(self):
+        '''
+        Verifica a distância Florianópolis-Curitiba e que a caixa contém o raio pedido.
+        '''
+        distancia = haversine_km(-27.5954, -48.5480, -25.4284, -49.2733)
+        self.assertAlmostEqual(distancia, 251, delta=5)
+        lat_min, lat_max, lon_min, lon_max = caixa_delimitadora(-27.5954, -48.5480, 300)
+        self.assertTrue(lat_min < -25.4284 < lat_max and lon_min < -49.2733 < lon_max)
+        self.assertEqual(uf_de('Santa  Catarina'), 'SC')
+
+    def test_geocodificacao_e_lojas_proximas(self):
+        '''
+        Verifica a geocodificação offline e que nearest devolve as lojas em ordem de distância.
+        '''
+        saida = StringIO()
+        call_command('geocode_enderecos', stdout=saida)
+        self.assertIn('4 endereços geocodificados, 1 sem centroide', saida.getvalue())
+        # Joinville fica a cerca de 150 km de Florianópolis e 100 km de Curitiba.
+        lojas = Loja_Unidade.objects.nearest(-26.3045, -48.8487, k=3)
+        self.assertEqual([loja.nome for loja in lojas], ['Loja Curitiba', 'Loja Floripa', 'Loja SP'])
+        self.assertLess(lojas[0].distancia_km, lojas[1].distancia_km)
+        self.assertEqual(len(Loja_Unidade.objects.nearest(-26.3045, -48.8487, k=10)), 4)
+
+    def test_endpoint(self):
+        '''
+        Verifica o endpoint de lojas próximas e a validação das coordenadas.
+        '''
+        call_command('geocode_enderecos', stdout=StringIO())
+        resposta = self.client.get(reverse('app:lojas_proximas'), {'lat': -3.1, 'lon': -60.0, 'k': 1})
+        self.assertEqual(resposta.json()['resultados'][0]['nome'], 'Loja Manaus')
+        self.assertEqual(self.client.get(reverse('app:lojas_proximas'), {'lat': 'x', 'lon': 0}).status_code, 400)
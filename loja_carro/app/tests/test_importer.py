@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from ..importer import ArquivoInvalido, LinhaInvalida, importar_carros, ler_json, validar_linha
+from ..jobs import processar_fila
+from ..models import Carro, FacetaCarro, Tarefa
+
+
+class ImportacaoCarroTest(TestCase):
+
+    def linha(self, **valores):
+        dados = {
+            'referencia': 'A1', 'marca': 'Toyota', 'ano': '2019/2020', 'modelo': 'Corolla',
+            'preco': '90000.00', 'km': '30000', 'cor': 'Preto', 'opcionais': '', 'descricao': '',
+        }
+        dados.update(valores)
+        return dados
+
+    def test_validacao_respeita_restricoes_do_modelo(self):
+        '''
+        Verifica que max_length, max_digits e a referência obrigatória são validados.
+        '''
+        carro = validar_linha(1, self.linha())
+        self.assertEqual(carro.preco, Decimal('90000.00'))
+        self.assertEqual(carro.km, 30000)
+        self.assertIsNone(carro.opcionais)
+        with self.assertRaises(LinhaInvalida) as contexto:
+            validar_linha(2, self.linha(ano='2019/2020/2021', preco='123456789.00'))
+        self.assertEqual(set(contexto.exception.erros), {'ano', 'preco'})
+        with self.assertRaises(LinhaInvalida):
+            validar_linha(3, self.linha(referencia=''))
+
+    def test_upsert_por_referencia(self):
+        '''
+        Verifica que reimportar uma referência atualiza o carro existente em vez de duplicá-lo.
+        '''
+        linhas = [self.linha(), self.linha(referencia='B2', marca='Honda', modelo='Civic')]
+        self.assertEqual(importar_carros(linhas, tamanho_lote=1), (2, 0))
+        rejeitadas = []
+        gravados, rejeitados = importar_carros(
+            [self.linha(preco='85000.00'), self.linha(referencia='C3', km='muito')],
+            ao_rejeitar=rejeitadas.append,
+        )
+        self.assertEqual((gravados, rejeitados), (1, 1))
+        self.assertEqual(rejeitadas[0].numero, 2)
+        self.assertEqual(Carro.objects.count(), 2)
+        self.assertEqual(Carro.objects.get(referencia='A1').preco, Decimal('85000.00'))
+
+    def test_leitura_json_em_blocos(self):
+        '''
+        Verifica que arrays JSON e JSON Lines são lidos objeto a objeto.
+        '''
+        objetos = [self.linha(referencia=str(i)) for i in range(3)]
+        self.assertEqual(list(ler_json(io.StringIO(json.dumps(objetos)))), objetos)
+        jsonl = '\n'.join(json.dumps(o) for o in objetos)
+        self.assertEqual(list(ler_json(io.StringIO(jsonl))), objetos)
+
+    def test_leitura_json_com_varios_blocos(self):
+        '''
+        Verifica que objetos que atravessam o limite entre blocos são lidos, com as linhas dos erros corretas.
+        '''
+        objetos = [self.linha(referencia=str(i), descricao='x' * 300) for i in range(1000)]
+        jsonl = '\n'.join(json.dumps(o) for o in objetos)
+        self.assertEqual(list(ler_json(io.StringIO(jsonl))), objetos)
+        with self.assertRaisesMessage(ArquivoInvalido, 'linha 1001'):
+            list(ler_json(io.StringIO(jsonl + '\n{"referencia": ')))
+
+    def test_json_fora_de_utf8(self):
+        '''
+        Verifica que um arquivo que não está em UTF-8 é rejeitado como ArquivoInvalido.
+        '''
+        arquivo = io.TextIOWrapper(io.BytesIO('[{"marca": "Citroën"}]'.encode('latin-1')), encoding='utf-8')
+        with self.assertRaisesMessage(ArquivoInvalido, 'UTF-8'):
+            list(ler_json(arquivo))
+
+    def test_registros_que_nao_sao_objetos(self):
+        '''
+        Verifica que valores soltos no array são rejeitados como linhas inválidas.
+        '''
+        rejeitadas = []
+        linhas = ler_json(io.StringIO(json.dumps(['abc', 1, self.linha()])))
+        self.assertEqual(importar_carros(linhas, ao_rejeitar=rejeitadas.append), (1, 2))
+        self.assertEqual([erro.numero for erro in rejeitadas], [1, 2])
+
+    def test_comando_json_truncado(self):
+        '''
+        Verifica que um array JSON truncado encerra o comando com a linha do erro.
+        '''
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write('[\n' + json.dumps(self.linha()) + ',\n' + json.dumps(self.linha(referencia='B2'))[:20])
+        self.addCleanup(os.remove, arquivo.name)
+        with self.assertRaisesMessage(CommandError, 'linha 3'):
+            call_command('import_carros', arquivo.name, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_comando_csv(self):
+        '''
+        Verifica o comando import_carros com um arquivo CSV e a atualização das facetas.
+        '''
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write('referencia,marca,ano,modelo,preco,km,cor\n')
+            arquivo.write('X1,Fiat,2015,Uno,25000.00,120000,Branco\n')
+            arquivo.write('X2,Fiat,2016,Mobi,35000.00,80000,Prata\n')
+        self.addCleanup(os.remove, arquivo.name)
+        saida = io.StringIO()
+        call_command('import_carros', arquivo.name, stdout=saida, stderr=io.StringIO())
+        self.assertIn('2 gravados, 0 rejeitados', saida.getvalue())
+        self.assertEqual(FacetaCarro.objects.get(dimensao='marca', valor='Fiat').total, 2)
+
+    def test_comando_em_segundo_plano(self):
+        '''
+        Verifica que o arquivo é copiado para o armazenamento padrão, importado pelo worker e apagado.
+        '''
+        midia = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, midia, ignore_errors=True)
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write('referencia,marca,ano,modelo,preco,km,cor\n')
+            arquivo.write('X1,Fiat,2015,Uno,25000.00,120000,Branco\n')
+        self.addCleanup(os.remove, arquivo.name)
+        with override_settings(MEDIA_ROOT=midia):
+            call_command('import_carros', arquivo.name, '--em-segundo-plano', stdout=io.StringIO())
+            nome = Tarefa.objects.get(nome='carros.importar').argumentos['armazenado']
+            self.assertTrue(nome.startswith('importacoes/') and nome.endswith('.csv'))
+            self.assertTrue(default_storage.exists(nome))
+            self.assertEqual(processar_fila(), 1)
+            self.assertEqual(Tarefa.objects.get().resultado, {'gravados': 1, 'rejeitados': 0})
+            self.assertFalse(default_storage.exists(nome))
+        self.assertTrue(Carro.objects.filter(referencia='X1').exists())
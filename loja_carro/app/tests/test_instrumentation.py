@@ -0,0 +1,68 @@
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..instrumentation import ColetorConsultas, SQLInstrumentationMiddleware, formato
+from ..models import Endereco, Loja_Unidade
+
+
+def listar_lojas(request):
+    # Acessa o endereço de cada loja sem select_related: um N+1 proposital.
+    return HttpResponse(', '.join(loja.endereco_fk.cidade for loja in Loja_Unidade.objects.order_by('pk')))
+
+
+class InstrumentacaoSQLTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria seis lojas, cada uma com o seu endereço.
+        '''
+        for i in range(6):
+            endereco = Endereco.objects.create(rua='Rua', cidade=f'Cidade {i}', estado='SC', numero=str(i))
+            Loja_Unidade.objects.create(nome=f'Loja {i}', telefone=f'+55483333000{i}', endereco_fk=endereco)
+
+    def test_formato_agrupa_valores(self):
+        '''
+        Verifica que listas IN e literais diferentes resultam no mesmo formato.
+        '''
+        self.assertEqual(formato('SELECT 1 FROM t WHERE id IN (%s, %s, %s)'), formato('SELECT 2 FROM t WHERE id IN (%s)'))
+        self.assertEqual(formato("SELECT * FROM t WHERE nome = 'a'"), formato("SELECT * FROM t WHERE nome = 'b'"))
+
+    def test_mede_consultas_e_detecta_n_mais_1(self):
+        '''
+        Verifica o cabeçalho Server-Timing e a linha de log com as repetições da view.
+        '''
+        with self.assertLogs('app.sql', level='INFO') as logs:
+            response = SQLInstrumentationMiddleware(listar_lojas)(RequestFactory().get('/lojas/'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="7 queries"', response['Server-Timing'])
+        self.assertIn('n1;', response['Server-Timing'])
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        registro = json.loads(logs.records[0].getMessage())
+        self.assertEqual((registro['caminho'], registro['consultas']), ('/lojas/', 7))
+        self.assertEqual(registro['n_mais_1'][0]['vezes'], 6)
+        self.assertLessEqual(len(registro['lentas']), 5)
+
+    @override_settings(SQL_INSTRUMENTACAO_AMOSTRAGEM=0)
+    def test_fora_da_amostra(self):
+        '''
+        Verifica que requisições fora da amostra não são medidas nem recebem o cabeçalho.
+        '''
+        response = SQLInstrumentationMiddleware(listar_lojas)(RequestFactory().get('/lojas/'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_coletor_guarda_as_mais_lentas(self):
+        '''
+        Verifica que o coletor mantém só as instruções mais lentas e remove o wrapper ao final.
+        '''
+        coletor = ColetorConsultas()
+        coletor.instalar()
+        try:
+            for _ in range(8):
+                list(Endereco.objects.all())
+        finally:
+            coletor.remover()
+        list(Endereco.objects.all())
+        self.assertEqual(coletor.total, 8)
+        self.assertEqual(len(coletor.lentas), 5)
@@ -0,0 +1,176 @@
+import datetime
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import jobs
+from ..jobs import Worker, enfileirar, executar, metricas, processar_fila, reservar
+from ..models import Tarefa
+
+chamadas = []
+
+
+def somar(a, b):
+    chamadas.append((a, b))
+    return a + b
+
+
+def falhar():
+    raise RuntimeError('sem conexão com o parceiro')
+
+
+def demorar(segundos):
+    time.sleep(segundos)
+
+
+class FilaTarefasTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        jobs.registrar('teste.somar', somar)
+        jobs.registrar('teste.falhar', falhar, tentativas=2, visibilidade=30)
+
+    @classmethod
+    def tearDownClass(cls):
+        jobs.TAREFAS.pop('teste.somar')
+        jobs.TAREFAS.pop('teste.falhar')
+        super().tearDownClass()
+
+    def setUp(self):
+        chamadas.clear()
+
+    def liberar(self, tarefa):
+        Tarefa.objects.filter(pk=tarefa.pk).update(disponivel_em=timezone.now() - datetime.timedelta(seconds=1))
+
+    def test_executa_e_guarda_o_resultado(self):
+        '''
+        Testa se as tarefas prontas rodam na ordem da fila e as agendadas esperam sua vez.
+        '''
+        primeira = enfileirar('teste.somar', a=1, b=2)
+        agendada = enfileirar('teste.somar', atraso=3600, a=5, b=5)
+        segunda = enfileirar('teste.somar', a=3, b=4)
+        self.assertEqual(processar_fila(), 2)
+        self.assertEqual(chamadas, [(1, 2), (3, 4)])
+        primeira.refresh_from_db()
+        self.assertEqual((primeira.status, primeira.resultado, primeira.tentativas), (Tarefa.CONCLUIDA, 3, 1))
+        self.assertIsNotNone(primeira.concluida_em)
+        self.assertEqual(Tarefa.objects.get(pk=segunda.pk).resultado, 7)
+        self.assertEqual(Tarefa.objects.get(pk=agendada.pk).status, Tarefa.PENDENTE)
+        with self.assertRaises(ValueError):
+            enfileirar('teste.inexistente')
+
+    def test_retentativas_com_backoff(self):
+        '''
+        Testa se uma falha reagenda a tarefa com backoff e se ela falha de vez ao esgotar as tentativas.
+        '''
+        tarefa = enfileirar('teste.falhar')
+        self.assertEqual(tarefa.max_tentativas, 2)
+        with self.settings(FILA_BACKOFF_SEGUNDOS=10):
+            self.assertEqual(processar_fila(), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), (Tarefa.PENDENTE, 1))
+        self.assertIn('sem conexão com o parceiro', tarefa.erro)
+        self.assertGreaterEqual(tarefa.disponivel_em, timezone.now() + datetime.timedelta(seconds=4))
+        self.assertEqual(processar_fila(), 0)
+        self.liberar(tarefa)
+        self.assertEqual(processar_fila(), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), (Tarefa.FALHOU, 2))
+        self.assertIsNotNone(tarefa.concluida_em)
+
+    def test_prazo_de_visibilidade(self):
+        '''
+        Testa se uma tarefa abandonada volta à fila após o prazo e se o worker antigo não grava o resultado.
+        '''
+        tarefa = enfileirar('teste.somar', a=1, b=1)
+        antiga, pks = reservar(5, 'no1')
+        self.assertEqual(pks, [tarefa.pk])
+        self.assertEqual(reservar(5, 'no2')[1], [])
+        self.liberar(tarefa)
+        nova, pks = reservar(5, 'no2')
+        self.assertEqual(pks, [tarefa.pk])
+        self.assertIsNone(executar(tarefa.pk, antiga))
+        self.assertTrue(executar(tarefa.pk, nova))
+        self.assertEqual(Tarefa.objects.get(pk=tarefa.pk).tentativas, 2)
+        abandonada = enfileirar('teste.falhar')
+        reservar(5, 'no1')
+        Tarefa.objects.filter(pk=abandonada.pk).update(tentativas=2)
+        self.liberar(abandonada)
+        self.assertEqual(reservar(5, 'no2')[1], [])
+        self.assertEqual(Tarefa.objects.get(pk=abandonada.pk).status, Tarefa.FALHOU)
+
+    def test_metricas(self):
+        '''
+        Testa a profundidade da fila e a vazão, também pelo endpoint de staff.
+        '''
+        enfileirar('teste.somar', a=1, b=1)
+        enfileirar('teste.somar', a=2, b=2)
+        enfileirar('teste.somar', atraso=3600, a=3, b=3)
+        processar_fila(limite=1)
+        reservar(1)
+        with self.assertNumQueries(3):
+            dados = metricas(janela=60)
+        self.assertEqual(
+            {chave: dados[chave] for chave in ('prontas', 'agendadas', 'executando', 'concluidas', 'falhas')},
+            {'prontas': 0, 'agendadas': 1, 'executando': 1, 'concluidas': 1, 'falhas': 0},
+        )
+        self.assertEqual((dados['por_nome'], dados['vazao_por_minuto']), ({'teste.somar': 2}, 1.0))
+        url = reverse('app:metricas_tarefas')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('operacao', is_staff=True))
+        self.assertEqual(self.client.get(url).json()['agendadas'], 1)
+        self.assertEqual(self.client.get(url, {'janela': '0'}).status_code, 400)
+
+
+class WorkerTest(TransactionTestCase):
+
+    def setUp(self):
+        jobs.registrar('teste.somar', somar)
+        chamadas.clear()
+
+    def tearDown(self):
+        jobs.TAREFAS.pop('teste.somar')
+
+    def test_pool_de_threads(self):
+        '''
+        Testa se o worker executa a fila em um pool de threads e para quando ela esvazia.
+        '''
+        for numero in range(6):
+            enfileirar('teste.somar', a=numero, b=1)
+        # Uma thread: o banco de teste do SQLite em memória não espera por locks entre conexões.
+        worker = Worker(concorrencia=1, intervalo=0.05)
+        medicoes = []
+        worker.rodar(ate_esvaziar=True, ao_medir=medicoes.append)
+        self.assertEqual((worker.concluidas, worker.falhas), (6, 0))
+        self.assertCountEqual(chamadas, [(numero, 1) for numero in range(6)])
+        self.assertFalse(Tarefa.objects.exclude(status=Tarefa.CONCLUIDA).exists())
+        self.assertEqual(medicoes[0]['prontas'], 6)
+
+    def test_renova_o_prazo_durante_a_execucao(self):
+        '''
+        Testa se uma tarefa mais longa que o prazo de visibilidade tem a reserva renovada e não volta à fila.
+        '''
+        jobs.registrar('teste.demorar', demorar, visibilidade=1)
+        self.addCleanup(jobs.TAREFAS.pop, 'teste.demorar')
+        tarefa = enfileirar('teste.demorar', segundos=1.5)
+        inicio = timezone.now()
+        self.assertEqual(processar_fila(), 1)
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), (Tarefa.CONCLUIDA, 1))
+        # A última renovação, depois de 1,33 s, adiou o prazo para 1 s além dela.
+        self.assertGreater(tarefa.disponivel_em, inicio + datetime.timedelta(seconds=2))
+
+    def test_comando_run_workers(self):
+        '''
+        Testa o comando com --ate-esvaziar.
+        '''
+        enfileirar('teste.somar', a=2, b=3)
+        saida = StringIO()
+        call_command('run_workers', '--ate-esvaziar', '--concorrencia', '2', '--intervalo', '0.05', stdout=saida)
+        self.assertIn('1 tarefas concluídas, 0 falhas.', saida.getvalue())
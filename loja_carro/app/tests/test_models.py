@@ -500,3 +500,43 @@ class ClienteModelTest(TestCase):
         """
         cliente = Cliente.objects.get(username="cliente1")
         self.assertEqual(cliente.vendedor_fk.username, "vendedor")
+
+
+from ..models import separar_ano
+
+class CarroAnoNumericoTest(TestCase):
+
+    def setUp(self):
+        """
+        Cria carros com anos em formatos diferentes.
+        """
+        for ano in ['2018', '2019/2020', '2020/2021', '21/22']:
+            Carro.objects.create(marca='Fiat', ano=ano, modelo='Argo', preco=60000, km=1000, cor='Prata')
+
+    def test_separar_ano(self):
+        '''
+        Verifica a conversão do texto de ano em ano de fabricação e ano do modelo.
+        '''
+        self.assertEqual(separar_ano('2019/2020'), (2019, 2020))
+        self.assertEqual(separar_ano('2020'), (2020, 2020))
+        self.assertEqual(separar_ano('98/99'), (1998, 1999))
+        self.assertEqual(separar_ano(''), (None, None))
+
+    def test_anos_preenchidos_ao_salvar(self):
+        '''
+        Verifica que save() mantém os anos numéricos em sincronia com o campo ano.
+        '''
+        carro = Carro.objects.get(ano='2018')
+        carro.ano = '2018/2019'
+        carro.save(update_fields=['ano'])
+        carro.refresh_from_db()
+        self.assertEqual((carro.ano_fabricacao, carro.ano_modelo), (2018, 2019))
+
+    def test_ano_entre(self):
+        '''
+        Verifica o filtro por intervalo de ano de fabricação e de ano do modelo.
+        '''
+        anos = Carro.objects.ano_entre(2019, 2020).values_list('ano', flat=True)
+        self.assertEqual(sorted(anos), ['2019/2020', '2020/2021'])
+        anos = Carro.objects.ano_entre(ano_min=2021, campo='ano_modelo').values_list('ano', flat=True)
+        self.assertEqual(sorted(anos), ['2020/2021', '21/22'])
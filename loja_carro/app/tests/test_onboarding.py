@@ -0,0 +1,165 @@
+import datetime
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from multiprocessing import get_context
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..callerid import identificar
+from ..models import Cliente, Endereco, Loja_Unidade, Vendedor, VendedorResumo
+from ..onboarding import cadastrar_usuarios, calcular_hashes, gerador_convite, gerar_convite
+from ..senhas import iniciar_processo
+
+
+class OnboardingTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria uma loja com um vendedor.
+        '''
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=endereco)
+        self.vendedor = Vendedor.objects.create(username='ana', first_name='Ana', telefone='+5548999990000',
+                                                loja_fk=self.loja)
+
+    def linha_cliente(self, n, **extras):
+        return {
+            'username': f'cliente{n}', 'email': f'cliente{n}@example.com', 'first_name': 'Cliente',
+            'last_name': str(n), 'telefone': f'+55489888{n:05d}', 'data_nascimento': '1990-01-01',
+            'vendedor_id': str(self.vendedor.pk), **extras,
+        }
+
+    def test_cadastra_clientes_em_lote_sem_hash(self):
+        '''
+        Testa se os clientes são inseridos com duas instruções por lote, sem senha utilizável e com convite.
+        '''
+        convites = []
+        with self.assertNumQueries(8):
+            gravados, rejeitados = cadastrar_usuarios(
+                'cliente', [self.linha_cliente(n) for n in range(50)], tamanho_lote=100, ao_convidar=convites.append
+            )
+        self.assertEqual((gravados, rejeitados), (50, 0))
+        cliente = Cliente.objects.get(username='cliente7')
+        self.assertFalse(cliente.has_usable_password())
+        self.assertEqual(cliente.vendedor_fk, self.vendedor)
+        self.assertEqual(identificar('48988800007')[0]['objeto_id'], cliente.pk)
+        self.assertEqual(len(convites), 50)
+        self.assertTrue(gerador_convite.check_token(User.objects.get(pk=cliente.pk), convites[7]['token']))
+
+    def test_rejeita_linhas_invalidas_e_duplicadas(self):
+        '''
+        Testa se usuário existente, telefone repetido, vendedor inexistente e dados inválidos são rejeitados.
+        '''
+        erros = []
+        linhas = [
+            self.linha_cliente(1),
+            self.linha_cliente(2, username='ana'),
+            self.linha_cliente(3, telefone='+5548988800001'),
+            self.linha_cliente(4, vendedor_id='999'),
+            self.linha_cliente(5, data_nascimento='ontem'),
+            self.linha_cliente(6, senha_hash='nao-e-um-hash'),
+        ]
+        gravados, rejeitados = cadastrar_usuarios('cliente', linhas, ao_rejeitar=erros.append)
+        self.assertEqual((gravados, rejeitados), (1, 5))
+        self.assertEqual(sorted(erro.numero for erro in erros), [2, 3, 4, 5, 6])
+        self.assertEqual(Cliente.objects.count(), 1)
+
+    def test_senhas_informadas(self):
+        '''
+        Testa se senhas em texto puro recebem hash e hashes de outro sistema são mantidos.
+        '''
+        hash_existente = make_password('senha-legada-123')
+        convites = []
+        cadastrar_usuarios('cliente', [
+            self.linha_cliente(1, senha='senha-nova-456'),
+            self.linha_cliente(2, senha_hash=hash_existente),
+        ], processos=1, ao_convidar=convites.append)
+        self.assertTrue(Cliente.objects.get(username='cliente1').check_password('senha-nova-456'))
+        self.assertEqual(Cliente.objects.get(username='cliente2').password, hash_existente)
+        self.assertEqual(convites, [])
+
+    def test_senhas_passam_pelos_validadores(self):
+        '''
+        Testa se senhas fracas e registros que não são objetos são rejeitados antes do hash.
+        '''
+        erros = []
+        linhas = [self.linha_cliente(1, senha='12345678'), self.linha_cliente(2, senha='cliente2'), 'cliente3']
+        self.assertEqual(cadastrar_usuarios('cliente', linhas, processos=1, ao_rejeitar=erros.append), (0, 3))
+        self.assertEqual([set(erro.erros) for erro in erros], [{'senha'}, {'senha'}, {'__all__'}])
+
+    def test_hashes_em_pool_de_processos(self):
+        '''
+        Testa se o cálculo dos hashes dividido entre processos preserva a ordem das senhas.
+        '''
+        senhas = [f'senha-{n}' for n in range(8)]
+        with ProcessPoolExecutor(2, mp_context=get_context('spawn'), initializer=iniciar_processo) as executor:
+            hashes = calcular_hashes(senhas, executor, processos=2)
+        usuario = User()
+        for senha, valor in zip(senhas, hashes):
+            usuario.password = valor
+            self.assertTrue(usuario.check_password(senha))
+
+    def test_cadastra_vendedores_com_resumo(self):
+        '''
+        Testa se vendedores cadastrados em lote ganham VendedorResumo, que os sinais manteriam.
+        '''
+        gravados, _ = cadastrar_usuarios('vendedor', [{
+            'username': 'bruno', 'first_name': 'Bruno', 'telefone': '+5548999990001', 'loja_id': str(self.loja.pk),
+        }])
+        self.assertEqual(gravados, 1)
+        resumo = VendedorResumo.objects.get(username='bruno')
+        self.assertEqual((resumo.loja_nome, resumo.cidade), ('Loja Centro', 'Florianópolis'))
+
+    def test_ativar_conta(self):
+        '''
+        Testa se o convite define a senha uma única vez.
+        '''
+        cadastrar_usuarios('cliente', [self.linha_cliente(1)])
+        convite = gerar_convite(User.objects.get(username='cliente1'))
+        url = reverse('app:ativar_conta', args=[convite['uid'], convite['token']])
+        self.assertEqual(self.client.get(url).json()['username'], 'cliente1')
+        fraca = self.client.post(url, {'new_password1': '123', 'new_password2': '123'})
+        self.assertEqual(fraca.status_code, 400)
+        resposta = self.client.post(url, {'new_password1': 'Xv9!carro-novo', 'new_password2': 'Xv9!carro-novo'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(User.objects.get(username='cliente1').check_password('Xv9!carro-novo'))
+        self.assertEqual(self.client.get(url).status_code, 400)
+
+    @override_settings(CONVITE_VALIDADE_DIAS=0)
+    def test_convite_expirado(self):
+        '''
+        Testa se o convite deixa de valer após CONVITE_VALIDADE_DIAS.
+        '''
+        usuario = User.objects.create(username='joao', password=make_password(None))
+        token = gerador_convite.make_token(usuario)
+        gerador_convite._now = lambda: datetime.datetime.now() + datetime.timedelta(seconds=5)
+        try:
+            self.assertFalse(gerador_convite.check_token(usuario, token))
+        finally:
+            del gerador_convite._now
+
+    def test_comando(self):
+        '''
+        Testa o comando onboard_users com um CSV e a saída de convites.
+        '''
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as arquivo:
+            arquivo.write('username,telefone,data_nascimento,vendedor_id\n')
+            arquivo.write(f'maria,+5548988800009,1985-05-05,{self.vendedor.pk}\n')
+        self.addCleanup(os.remove, arquivo.name)
+        with self.assertRaisesMessage(CommandError, 'DJANGO_SECRET_KEY'):
+            with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': ''}):
+                call_command('onboard_users', 'cliente', arquivo.name, stdout=StringIO(), stderr=StringIO())
+        saida = StringIO()
+        with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': settings.SECRET_KEY}):
+            call_command('onboard_users', 'cliente', arquivo.name, stdout=saida, stderr=StringIO())
+        linhas = saida.getvalue().splitlines()
+        self.assertEqual(linhas[0], 'username,email,uid,token')
+        self.assertTrue(linhas[1].startswith('maria,,'))
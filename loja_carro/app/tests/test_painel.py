@@ -0,0 +1,69 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Cliente, Endereco, Loja_Unidade, Vendedor
+
+
+class PainelVendedorTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria uma loja com vendedores que têm quantidades diferentes de clientes.
+        '''
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=endereco)
+        self.telefones = iter(range(100000))
+
+    def criar_vendedor(self, username, clientes):
+        vendedor = Vendedor.objects.create(username=username, telefone=f'+5548999{next(self.telefones):05d}',
+                                           loja_fk=self.loja)
+        for i in range(clientes):
+            Cliente.objects.create(
+                username=f'{username}_cliente{i}', data_nascimento=date(1990, 1, 1),
+                telefone=f'+5548988{next(self.telefones):05d}', vendedor_fk=vendedor,
+                avaliacao='Bom cliente.' if i % 2 else None,
+            )
+        return vendedor
+
+    def test_anotacoes_e_listas(self):
+        '''
+        Verifica os totais e as listas limitadas de clientes recentes e sem avaliação.
+        '''
+        self.criar_vendedor('ana', 7)
+        self.criar_vendedor('bruno', 0)
+        ana, bruno = Vendedor.objects.com_painel(limite_clientes=3).order_by('username')
+        self.assertEqual((ana.total_clientes, ana.total_sem_avaliacao), (7, 4))
+        self.assertEqual([c.username for c in ana.clientes_recentes],
+                         ['ana_cliente6', 'ana_cliente5', 'ana_cliente4'])
+        self.assertEqual([c.username for c in ana.clientes_sem_avaliacao],
+                         ['ana_cliente6', 'ana_cliente4', 'ana_cliente2'])
+        self.assertEqual((bruno.total_clientes, bruno.clientes_recentes), (0, []))
+
+    def test_numero_fixo_de_consultas(self):
+        '''
+        Verifica que o painel faz o mesmo número de consultas com 1 ou 10 vendedores.
+        '''
+        self.criar_vendedor('vendedor0', 2)
+        with self.assertNumQueries(3):
+            list(Vendedor.objects.com_painel())
+        for i in range(1, 10):
+            self.criar_vendedor(f'vendedor{i}', 2)
+        with self.assertNumQueries(3):
+            vendedores = list(Vendedor.objects.com_painel())
+            for vendedor in vendedores:
+                [c.username for c in vendedor.clientes_recentes]
+
+    def test_endpoint(self):
+        '''
+        Verifica o endpoint do painel, restrito à equipe.
+        '''
+        self.criar_vendedor('ana', 2)
+        url = reverse('app:painel_lojas')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('gerente', is_staff=True))
+        with self.assertNumQueries(6):  # sessão e usuário + lojas, vendedores e dois pré-carregamentos
+            lojas = self.client.get(url, {'loja': self.loja.pk}).json()['lojas']
+        self.assertEqual(lojas[0]['vendedores'][0]['total_clientes'], 2)
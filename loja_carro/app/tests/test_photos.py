@@ -0,0 +1,174 @@
+import io
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import photos
+from ..jobs import processar_fila
+from ..models import Carro, CarroFoto, Tarefa
+from ..views import servir_midia
+
+MIDIA_TESTE = tempfile.mkdtemp()
+
+
+def imagem_jpeg(largura=2000, altura=1000, cor=(200, 30, 30)) -> SimpleUploadedFile:
+    conteudo = io.BytesIO()
+    Image.new('RGB', (largura, altura), cor).save(conteudo, 'JPEG')
+    return SimpleUploadedFile('foto.JPG', conteudo.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MIDIA_TESTE, FOTOS_PROCESSAMENTO_SINCRONO=True)
+class CarroFotoTest(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MIDIA_TESTE, ignore_errors=True)
+
+    def setUp(self):
+        '''
+        Cria dois carros.
+        '''
+        self.carro = Carro.objects.create(marca='Fiat', modelo='Argo', ano='2022', preco=70000, km=10000, cor='Branco')
+        self.outro = Carro.objects.create(marca='Fiat', modelo='Mobi', ano='2021', preco=50000, km=20000, cor='Preto')
+
+    def test_gera_versoes_apos_o_commit(self):
+        '''
+        Verifica que as três versões são geradas uma vez, sem ampliar e mantendo a proporção.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            foto = photos.adicionar_foto(self.carro, imagem_jpeg())
+        foto.refresh_from_db()
+        self.assertEqual(foto.status, CarroFoto.PRONTA)
+        self.assertEqual(foto.original.name, f'originais/{foto.sha256[:2]}/{foto.sha256}.jpg')
+        self.assertEqual({nome: (v['largura'], v['altura']) for nome, v in foto.versoes.items()},
+                         {'miniatura': (160, 80), 'card': (480, 240), 'completa': (1280, 640)})
+        with Image.open(photos.armazenamento_fotos().open(foto.versoes['card']['nome'])) as card:
+            self.assertEqual(card.size, (480, 240))
+
+    def test_deduplica_conteudo(self):
+        '''
+        Verifica que a mesma imagem em outro carro reaproveita arquivo e versões sem reprocessar.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            primeira = photos.adicionar_foto(self.carro, imagem_jpeg())
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            segunda = photos.adicionar_foto(self.outro, imagem_jpeg())
+        # Só a invalidação do cache de detalhe; nenhum processamento agendado.
+        self.assertEqual([callback.__qualname__ for callback in callbacks],
+                         ['agendar_invalidacao_lote.<locals>.<lambda>'])
+        self.assertEqual(segunda.status, CarroFoto.PRONTA)
+        self.assertEqual(segunda.original.name, primeira.original.name)
+        self.assertEqual(photos.adicionar_foto(self.outro, imagem_jpeg()).pk, segunda.pk)
+        self.assertEqual(CarroFoto.objects.count(), 2)
+
+    def test_gravacao_simultanea_do_mesmo_conteudo(self):
+        '''
+        Verifica que gravar um nome que outro envio acabou de criar devolve o nome em vez de repetir a tentativa.
+        '''
+        armazenamento = photos.armazenamento_fotos()
+        nome = armazenamento.save('originais/ab/abcdef.jpg', ContentFile(b'primeiro'))
+        resultado = []
+        # Chama _save direto, como o segundo de dois envios que passaram juntos por Storage.save.
+        gravacao = threading.Thread(target=lambda: resultado.append(armazenamento._save(nome, ContentFile(b'x'))))
+        gravacao.start()
+        gravacao.join(timeout=5)
+        self.assertFalse(gravacao.is_alive())
+        self.assertEqual(resultado, [nome])
+        with armazenamento.open(nome) as arquivo:
+            self.assertEqual(arquivo.read(), b'primeiro')
+
+    def test_rejeita_arquivo_que_nao_e_imagem(self):
+        '''
+        Verifica que arquivos que não são imagens são recusados.
+        '''
+        with self.assertRaises(ValidationError):
+            photos.adicionar_foto(self.carro, SimpleUploadedFile('foto.jpg', b'nao sou uma imagem'))
+
+    def test_envio_pelo_admin(self):
+        '''
+        Verifica que o inline do admin recusa com erro de formulário, e não 500, imagens repetidas ou inválidas.
+        '''
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@loja.com', 'password123'))
+        photos.adicionar_foto(self.carro, imagem_jpeg())
+        url = reverse('admin:app_carro_change', args=[self.carro.pk])
+        formulario = self.client.get(url).context['adminform'].form
+        dados = {nome: valor for nome, valor in formulario.initial.items()
+                 if nome in formulario.fields and valor is not None}
+        foto = CarroFoto.objects.get()
+        dados.update({
+            'fotos-TOTAL_FORMS': '2', 'fotos-INITIAL_FORMS': '1', 'fotos-0-id': foto.pk, 'fotos-0-carro': self.carro.pk,
+            'fotos-0-ordem': '0', 'fotos-1-carro': self.carro.pk, 'fotos-1-ordem': '1',
+            'historico_precos-TOTAL_FORMS': '0', 'historico_precos-INITIAL_FORMS': '0',
+        })
+        for arquivo, erro in [(imagem_jpeg(), 'Este carro já tem esta foto.'),
+                              (SimpleUploadedFile('foto.jpg', b'nao sou uma imagem'), 'não é uma imagem válida')]:
+            resposta = self.client.post(url, {**dados, 'fotos-1-original': arquivo})
+            self.assertEqual(resposta.status_code, 200)
+            self.assertContains(resposta, erro)
+        resposta = self.client.post(url, {**dados, 'fotos-1-original': imagem_jpeg(cor=(0, 0, 255))})
+        self.assertEqual(resposta.status_code, 302)
+        self.assertEqual(CarroFoto.objects.filter(carro=self.carro).count(), 2)
+
+    def test_listagem_traz_capa_com_srcset(self):
+        '''
+        Verifica que a busca traz a primeira foto pronta de cada carro com src e srcset.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            photos.adicionar_foto(self.carro, imagem_jpeg(cor=(0, 0, 255)))
+            photos.adicionar_foto(self.carro, imagem_jpeg(300, 200))
+        resultados = self.client.get(reverse('app:busca_carros'), {'ordem': 'preco'}).json()['resultados']
+        self.assertIsNone(resultados[0]['foto'])
+        capa = resultados[1]['foto']
+        self.assertTrue(capa['src'].startswith('/media/fotos/versoes/'))
+        self.assertTrue(capa['src'].endswith('/card.jpg'))
+        self.assertEqual([parte.split()[-1] for parte in capa['srcset'].split(', ')], ['160w', '480w', '1280w'])
+
+    def test_versoes_pequenas_sem_larguras_repetidas(self):
+        '''
+        Verifica que uma imagem menor que as versões não gera larguras repetidas no srcset.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            foto = photos.adicionar_foto(self.carro, imagem_jpeg(300, 200))
+        foto.refresh_from_db()
+        self.assertEqual(photos.serializar_foto(foto)['srcset'].count('w,'), 1)
+
+    def test_processa_pendentes(self):
+        '''
+        Verifica que o comando de retomada processa as fotos que ficaram pendentes.
+        '''
+        with self.settings(FOTOS_PROCESSAMENTO_SINCRONO=False):
+            photos.adicionar_foto(self.carro, imagem_jpeg())
+        self.assertEqual(photos.processar_pendentes(), 1)
+        self.assertFalse(CarroFoto.objects.filter(status=CarroFoto.PENDENTE).exists())
+
+    def test_enfileira_para_os_workers(self):
+        '''
+        Verifica que, sem processamento síncrono, o envio enfileira uma tarefa que gera as versões.
+        '''
+        with self.settings(FOTOS_PROCESSAMENTO_SINCRONO=False):
+            foto = photos.adicionar_foto(self.carro, imagem_jpeg())
+        self.assertEqual(list(Tarefa.objects.values_list('nome', 'argumentos')), [('fotos.processar', {'pk': foto.pk})])
+        self.assertEqual(processar_fila(), 1)
+        foto.refresh_from_db()
+        self.assertEqual(foto.status, CarroFoto.PRONTA)
+
+    def test_servir_com_cache_permanente(self):
+        '''
+        Verifica que as fotos servidas pelo Django recebem cabeçalhos de cache imutável.
+        '''
+        with self.captureOnCommitCallbacks(execute=True):
+            foto = photos.adicionar_foto(self.carro, imagem_jpeg())
+        foto.refresh_from_db()
+        caminho = 'fotos/' + foto.versoes['miniatura']['nome']
+        resposta = servir_midia(RequestFactory().get('/media/' + caminho), caminho)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Cache-Control'], photos.CACHE_CONTROL)
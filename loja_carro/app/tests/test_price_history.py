@@ -0,0 +1,85 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from ..importer import importar_carros
+from ..models import Carro, HistoricoPreco
+from ..price_history import consulta_reducoes
+
+
+class HistoricoPrecoTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria um carro.
+        '''
+        self.carro = Carro.objects.create(marca='Fiat', modelo='Argo', ano='2022', preco=70000, km=10000, cor='Branco')
+
+    def test_registra_apenas_mudancas_de_preco(self):
+        '''
+        Testa se o histórico recebe uma linha só quando o preço muda.
+        '''
+        self.assertFalse(HistoricoPreco.objects.exists())
+        self.carro.km = 12000
+        self.carro.save()
+        self.carro.preco = 70000.0
+        self.carro.save()
+        self.assertFalse(HistoricoPreco.objects.exists())
+        self.carro.preco = Decimal('65000')
+        self.carro.save()
+        historico = HistoricoPreco.objects.get()
+        self.assertEqual((historico.preco_anterior, historico.preco_novo), (Decimal('70000'), Decimal('65000')))
+
+    def test_importacao_registra_precos_alterados(self):
+        '''
+        Testa se o upsert da importação, que não dispara sinais, também alimenta o histórico.
+        '''
+        linha = {'referencia': 'R1', 'marca': 'Fiat', 'modelo': 'Mobi', 'ano': '2021', 'preco': '50000',
+                 'km': '100', 'cor': 'Preto'}
+        importar_carros([linha])
+        importar_carros([linha])
+        importar_carros([{**linha, 'preco': '48000'}])
+        historico = HistoricoPreco.objects.get()
+        self.assertEqual(historico.carro.referencia, 'R1')
+        self.assertEqual(historico.preco_novo, Decimal('48000'))
+
+    def test_feed_de_reducoes(self):
+        '''
+        Testa se o feed traz só as reduções, das mais recentes para as mais antigas, paginadas por cursor.
+        '''
+        outro = Carro.objects.create(marca='Fiat', modelo='Mobi', ano='2021', preco=50000, km=20000, cor='Preto')
+        for carro, preco in [(self.carro, 68000), (outro, 52000), (outro, 47000), (self.carro, 66000)]:
+            carro.preco = preco
+            carro.save()
+        url = reverse('app:reducoes_preco')
+        primeira = self.client.get(url, {'limite': 2}).json()
+        self.assertEqual([r['preco_novo'] for r in primeira['resultados']], ['66000.00', '47000.00'])
+        self.assertEqual(primeira['resultados'][1]['reducao'], '5000.00')
+        self.assertEqual(primeira['resultados'][1]['carro']['id'], outro.pk)
+        segunda = self.client.get(url, {'limite': 2, 'cursor': primeira['proximo_cursor']}).json()
+        self.assertEqual([r['preco_novo'] for r in segunda['resultados']], ['68000.00'])
+        self.assertIsNone(segunda['proximo_cursor'])
+        self.assertEqual(self.client.get(url, {'cursor': 'x'}).status_code, 400)
+
+    def test_feed_usa_uma_consulta_com_limite(self):
+        '''
+        Testa se o feed é uma única consulta limitada, sem junção do histórico consigo mesmo.
+        '''
+        queryset, _ = consulta_reducoes(limite=10)
+        sql = str(queryset.query)
+        self.assertIn('LIMIT 11', sql)
+        # A única junção é com o carro de cada linha da página.
+        self.assertEqual(sql.count('JOIN'), 1)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('app:reducoes_preco'))
+
+    def test_particionamento_exige_postgresql(self):
+        '''
+        Testa se o comando recusa bancos sem particionamento declarativo.
+        '''
+        with self.assertRaises(CommandError):
+            call_command('partition_price_history', stdout=StringIO())
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.contrib.auth.models import User, update_last_login
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Endereco, Loja_Unidade, Vendedor, VendedorResumo
+
+
+class VendedorResumoTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria duas lojas em cidades diferentes, cada uma com um vendedor.
+        '''
+        self.endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        outro = Endereco.objects.create(rua='Rua B', cidade='Curitiba', estado='PR', numero='2')
+        self.loja = Loja_Unidade.objects.create(nome='Loja Centro', telefone='+554833330000', endereco_fk=self.endereco)
+        self.loja_pr = Loja_Unidade.objects.create(nome='Loja PR', telefone='+554133330000', endereco_fk=outro)
+        self.ana = Vendedor.objects.create(username='ana', first_name='Ana', last_name='Silva', email='ana@loja.com',
+                                           telefone='+5548999990000', loja_fk=self.loja)
+        self.bruno = Vendedor.objects.create(username='bruno', telefone='+5541999990000', loja_fk=self.loja_pr)
+
+    def test_resumo_criado_com_dados_unidos(self):
+        '''
+        Verifica que o resumo traz nome, telefone, loja e localização do vendedor.
+        '''
+        resumo = VendedorResumo.objects.get(vendedor=self.ana)
+        self.assertEqual((resumo.nome, resumo.telefone, resumo.loja_nome, resumo.cidade),
+                         ('Ana Silva', '+5548999990000', 'Loja Centro', 'Florianópolis'))
+        self.assertEqual(VendedorResumo.objects.get(vendedor=self.bruno).nome, 'bruno')
+
+    def test_busca_sem_joins(self):
+        '''
+        Verifica a busca por estado e prefixo de nome em uma única consulta sem joins.
+        '''
+        with self.assertNumQueries(1):
+            resultado = list(VendedorResumo.objects.buscar(estado='SC', nome='An'))
+        self.assertEqual([r.vendedor_id for r in resultado], [self.ana.pk])
+        self.assertNotIn('JOIN', str(VendedorResumo.objects.buscar(estado='SC').query))
+
+    def test_sincronizacao_por_loja_endereco_e_vendedor(self):
+        '''
+        Verifica que alterações em Endereco, Loja_Unidade e Vendedor chegam ao resumo.
+        '''
+        self.endereco.cidade = 'São José'
+        self.endereco.save()
+        self.loja.nome = 'Loja Kobrasol'
+        self.loja.save()
+        self.ana.loja_fk = self.loja_pr
+        self.bruno.first_name = 'Bruno'
+        self.bruno.save()
+        self.assertEqual(VendedorResumo.objects.get(vendedor=self.bruno).nome, 'Bruno')
+        resumo = VendedorResumo.objects.get(vendedor=self.ana)
+        self.assertEqual((resumo.loja_nome, resumo.cidade), ('Loja Kobrasol', 'São José'))
+        self.ana.save()
+        self.assertEqual(VendedorResumo.objects.get(vendedor=self.ana).estado, 'PR')
+
+    def test_login_nao_ressincroniza(self):
+        '''
+        Verifica que gravar só last_login no User não consulta vendedor nem cliente, e editar o nome sim.
+        '''
+        usuario = User.objects.get(pk=self.ana.pk)
+        with self.assertNumQueries(1):
+            update_last_login(None, usuario)
+        usuario.first_name = 'Ana Paula'
+        usuario.save(update_fields=['first_name'])
+        self.assertEqual(VendedorResumo.objects.get(vendedor=self.ana).nome, 'Ana Paula Silva')
+
+    def test_comando_de_consistencia(self):
+        '''
+        Verifica que o comando detecta e corrige resumos divergentes.
+        '''
+        VendedorResumo.objects.filter(vendedor=self.ana).update(cidade='Errada')
+        VendedorResumo.objects.filter(vendedor=self.bruno).delete()
+        saida = StringIO()
+        call_command('check_vendedor_resumo', stdout=saida)
+        self.assertIn('2 resumos divergentes', saida.getvalue())
+        call_command('check_vendedor_resumo', corrigir=True, stdout=StringIO())
+        saida = StringIO()
+        call_command('check_vendedor_resumo', stdout=saida)
+        self.assertIn('consistente', saida.getvalue())
+
+    def test_endpoint(self):
+        '''
+        Verifica o endpoint de busca de vendedores.
+        '''
+        resposta = self.client.get(reverse('app:busca_vendedores'), {'cidade': 'Curitiba'})
+        self.assertEqual([r['nome'] for r in resposta.json()['resultados']], ['bruno'])
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+
+from app import carro_cache, routers
+from app.facets import reconstruir_facetas
+from app.models import Carro, Cliente, Endereco, EstatisticaCarro, FacetaCarro, Loja_Unidade
+from app.stats import reconstruir_estatisticas
+
+DATABASES_COM_REPLICA = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'primario.sqlite3'},
+    'replica0': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'replica.sqlite3'},
+}
+
+
+@override_settings(DATABASES=DATABASES_COM_REPLICA, REPLICA_FIXACAO_SEGUNDOS=7)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.token_fixado = routers._fixado.set(False)
+        self.token_escreveu = routers._escreveu.set(False)
+
+    def tearDown(self):
+        routers._fixado.reset(self.token_fixado)
+        routers._escreveu.reset(self.token_escreveu)
+
+    def test_leitura_catalogo_vai_para_replica(self):
+        '''
+        Carro, Loja_Unidade e Endereco são lidos da réplica; os demais modelos do primário
+        '''
+        for model in (Carro, Loja_Unidade, Endereco):
+            self.assertEqual(self.router.db_for_read(model), 'replica0')
+        self.assertIsNone(self.router.db_for_read(Cliente))
+
+    def test_escrita_fixa_no_primario(self):
+        '''
+        Depois de gravar um carro, as leituras do mesmo contexto vão para o primário
+        '''
+        self.assertEqual(self.router.db_for_write(Carro), 'default')
+        self.assertIsNone(self.router.db_for_read(Carro))
+
+    def test_escrita_de_outro_modelo_nao_fixa(self):
+        '''
+        Gravar um modelo não replicado não muda o destino das leituras do catálogo
+        '''
+        self.router.db_for_write(Cliente)
+        self.assertEqual(self.router.db_for_read(Carro), 'replica0')
+
+    def test_middleware_renova_cookie_apos_escrita(self):
+        '''
+        Uma requisição que grava define o cookie de fixação pelo tempo configurado
+        '''
+        def view(request):
+            self.router.db_for_write(Carro)
+            return HttpResponse()
+
+        response = routers.ReplicaStickinessMiddleware(view)(RequestFactory().post('/'))
+        cookie = response.cookies[routers.COOKIE_FIXACAO]
+        self.assertEqual(cookie['max-age'], 7)
+        self.assertFalse(routers._fixado.get())
+
+    def test_middleware_respeita_cookie(self):
+        '''
+        Com o cookie de fixação, a requisição lê do primário sem renovar o cookie
+        '''
+        destinos = []
+
+        def view(request):
+            destinos.append(self.router.db_for_read(Carro))
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES[routers.COOKIE_FIXACAO] = '1'
+        response = routers.ReplicaStickinessMiddleware(view)(request)
+        routers.ReplicaStickinessMiddleware(view)(RequestFactory().get('/'))
+        self.assertEqual(destinos, [None, 'replica0'])
+        self.assertNotIn(routers.COOKIE_FIXACAO, response.cookies)
+
+
+@override_settings(DATABASE_ROUTERS=['app.routers.ReplicaRouter'])
+class LeituraNoPrimarioTest(TransactionTestCase):
+    '''
+    Usa uma réplica real em um arquivo SQLite separado, copiada do primário e
+    depois alterada, para simular uma réplica atrasada.
+    '''
+
+    def setUp(self):
+        cache.clear()
+        carro_cache._lru.clear()
+        self.carro = Carro.objects.create(marca='Fiat', modelo='Argo', ano='2021', preco=Decimal('70000.00'),
+                                          km=30000, cor='Prata')
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        caminho = os.path.join(diretorio.name, 'replica.sqlite3')
+        connections['default'].ensure_connection()
+        with sqlite3.connect(caminho) as destino:
+            connections['default'].connection.backup(destino)
+        destino.close()
+        connections.settings['replica0'] = connections.configure_settings({
+            'default': connections.settings['default'],
+            'replica0': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': caminho},
+        })['replica0']
+        self.addCleanup(self._remover_replica)
+        # A réplica ainda não recebeu o carro nem a última alteração de preço.
+        Carro.todos.using('replica0').all().delete()
+        patcher = mock.patch.object(routers, 'replicas', return_value=['replica0'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        token = routers._fixado.set(False)
+        self.addCleanup(routers._fixado.reset, token)
+
+    def _remover_replica(self):
+        connections['replica0'].close()
+        del connections['replica0']
+        del connections.settings['replica0']
+
+    def test_leitura_sem_fixacao_vai_para_a_replica(self):
+        '''
+        Sem fixação, uma leitura comum de Carro enxerga a réplica atrasada
+        '''
+        self.assertFalse(Carro.objects.filter(pk=self.carro.pk).exists())
+        self.assertTrue(Carro.objects.using('default').filter(pk=self.carro.pk).exists())
+
+    def test_cache_do_carro_le_do_primario(self):
+        '''
+        Depois de uma invalidação o cache é preenchido com os dados do primário
+        '''
+        Carro.todos.using('default').filter(pk=self.carro.pk).update(preco=Decimal('65000.00'))
+        carro_cache.invalidar_carro(self.carro.pk)
+        routers._fixado.set(False)
+        self.assertEqual(carro_cache.obter_carro(self.carro.pk)['preco'], '65000.00')
+
+    def test_reconstrucoes_leem_do_primario(self):
+        '''
+        Facetas e estatísticas são reconstruídas a partir do primário
+        '''
+        reconstruir_facetas()
+        self.assertTrue(FacetaCarro.objects.filter(dimensao='marca', valor='Fiat', total=1).exists())
+        self.assertEqual(reconstruir_estatisticas(workers=1), 1)
+        self.assertEqual(EstatisticaCarro.objects.get(marca='Fiat').quantidade, 1)
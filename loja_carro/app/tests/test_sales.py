@@ -0,0 +1,136 @@
+import datetime
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Carro, Cliente, Endereco, Loja_Unidade, Venda, VendaMensal, Vendedor
+from ..sales import ranking_mensal, reconstruir_vendas_mensais, registrar_venda
+
+MARCO = timezone.make_aware(datetime.datetime(2024, 3, 15, 12))
+ABRIL = timezone.make_aware(datetime.datetime(2024, 4, 2, 12))
+
+
+class VendaTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria duas lojas, um vendedor em cada e um cliente.
+        '''
+        self.telefones = iter(range(100000))
+        self.centro, self.norte = self.criar_loja('Loja Centro'), self.criar_loja('Loja Norte')
+        self.ana = self.criar_vendedor('ana', self.centro)
+        self.bruno = self.criar_vendedor('bruno', self.norte)
+        self.cliente = Cliente.objects.create(
+            username='carla', data_nascimento=date(1990, 1, 1), telefone=self.telefone(), vendedor_fk=self.ana,
+        )
+
+    def telefone(self) -> str:
+        return f'+5548999{next(self.telefones):05d}'
+
+    def criar_loja(self, nome) -> Loja_Unidade:
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        return Loja_Unidade.objects.create(nome=nome, telefone=self.telefone(), endereco_fk=endereco)
+
+    def criar_vendedor(self, username, loja) -> Vendedor:
+        return Vendedor.objects.create(username=username, telefone=self.telefone(), loja_fk=loja)
+
+    def vender(self, vendedor, preco, preco_final, vendida_em=MARCO) -> Venda:
+        carro = Carro.objects.create(marca='Fiat', modelo='Argo', ano='2022', preco=preco, km=1000, cor='Branco')
+        return registrar_venda(carro, self.cliente, vendedor, preco_final, vendida_em)
+
+    def resumo(self):
+        return sorted(
+            VendaMensal.objects.values_list('mes', 'loja_id', 'vendedor_id', 'quantidade', 'receita', 'soma_descontos')
+        )
+
+    def test_registrar_venda_marca_o_carro_como_vendido(self):
+        '''
+        Testa se a venda copia preço e loja, marca o carro como vendido e não pode se repetir.
+        '''
+        venda = self.vender(self.ana, 70000, Decimal('68000'))
+        carro = Carro.todos.get(pk=venda.carro_id)
+        self.assertEqual((carro.status, carro.vendido_em), (Carro.VENDIDO, MARCO))
+        self.assertEqual((venda.loja_id, venda.preco_anunciado, venda.desconto), (self.centro.pk, 70000, 2000))
+        with self.assertRaises(ValidationError):
+            registrar_venda(carro, self.cliente, self.bruno, 60000)
+        self.assertEqual(Venda.objects.count(), 1)
+
+    def test_resumo_mensal_incremental(self):
+        '''
+        Testa se inclusões, alterações de mês e exclusões mantêm VendaMensal igual à reconstrução.
+        '''
+        self.vender(self.ana, 70000, Decimal('68000'))
+        segunda = self.vender(self.ana, 50000, Decimal('50000'))
+        self.vender(self.bruno, 90000, Decimal('85000'), vendida_em=ABRIL)
+        self.assertEqual(self.resumo(), [
+            (date(2024, 3, 1), self.centro.pk, self.ana.pk, 2, Decimal('118000'), Decimal('2000')),
+            (date(2024, 4, 1), self.norte.pk, self.bruno.pk, 1, Decimal('85000'), Decimal('5000')),
+        ])
+        segunda.vendida_em = ABRIL
+        segunda.save()
+        Venda.objects.get(vendedor=self.bruno).delete()
+        incremental = self.resumo()
+        self.assertEqual(incremental, [
+            (date(2024, 3, 1), self.centro.pk, self.ana.pk, 1, Decimal('68000'), Decimal('2000')),
+            (date(2024, 4, 1), self.centro.pk, self.ana.pk, 1, Decimal('50000'), Decimal('0')),
+        ])
+        self.assertEqual(reconstruir_vendas_mensais(tamanho_chunk=1), 2)
+        self.assertEqual(self.resumo(), incremental)
+
+    def test_ranking_mensal(self):
+        '''
+        Testa a ordem por receita, o desconto médio e os totais por loja, com e sem filtro de loja.
+        '''
+        carlos = self.criar_vendedor('carlos', self.centro)
+        self.vender(self.ana, 70000, Decimal('68000'))
+        self.vender(self.ana, 50000, Decimal('49000'))
+        self.vender(self.bruno, 90000, Decimal('90000'))
+        self.vender(carlos, 40000, Decimal('40000'))
+        self.vender(carlos, 40000, Decimal('40000'), vendida_em=ABRIL)
+        with self.assertNumQueries(1):
+            ranking = ranking_mensal(date(2024, 3, 20))
+        self.assertEqual(
+            [(linha['posicao'], linha['vendedor']['username'], linha['quantidade'], linha['receita'],
+              linha['desconto_medio']) for linha in ranking['vendedores']],
+            [(1, 'ana', 2, '117000.00', '1500.00'), (2, 'bruno', 1, '90000.00', '0.00'),
+             (3, 'carlos', 1, '40000.00', '0.00')],
+        )
+        self.assertEqual(
+            [(linha['loja']['nome'], linha['quantidade'], linha['receita']) for linha in ranking['lojas']],
+            [('Loja Centro', 3, '157000.00'), ('Loja Norte', 1, '90000.00')],
+        )
+        filtrado = ranking_mensal(date(2024, 3, 1), loja=self.norte.pk)
+        self.assertEqual([linha['vendedor']['username'] for linha in filtrado['vendedores']], ['bruno'])
+
+    def test_endpoint_exige_staff_e_valida_mes(self):
+        '''
+        Testa se o ranking exige login de staff e rejeita meses mal formatados.
+        '''
+        self.vender(self.ana, 70000, Decimal('68000'))
+        url = reverse('app:ranking_vendas')
+        self.assertEqual(self.client.get(url, {'mes': '2024-03'}).status_code, 302)
+        self.client.force_login(User.objects.create_user('gerente', is_staff=True))
+        resposta = self.client.get(url, {'mes': '2024-03'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['mes'], '2024-03')
+        self.assertEqual(resposta.json()['vendedores'][0]['vendedor']['username'], 'ana')
+        self.assertEqual(self.client.get(url, {'mes': 'março'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'loja': 'x'}).status_code, 400)
+
+    def test_comando_rebuild_sales_rollup(self):
+        '''
+        Testa se o comando refaz a tabela de resumo depois de gravações que não disparam sinais.
+        '''
+        venda = self.vender(self.ana, 70000, Decimal('68000'))
+        Venda.objects.filter(pk=venda.pk).update(preco_final=Decimal('65000'))
+        saida = StringIO()
+        call_command('rebuild_sales_rollup', stdout=saida)
+        self.assertIn('1 totais mensais', saida.getvalue())
+        self.assertEqual(self.resumo()[0][-2:], (Decimal('65000'), Decimal('5000')))
@@ -0,0 +1,169 @@
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import NotSupportedError, connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..fulltext import TABELA_FTS
+from ..models import Carro
+from ..search import CursorInvalido, buscar_carros, decodificar_cursor
+
+
+class BuscaCarroTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria um pequeno inventário com marcas, anos e preços variados.
+        '''
+        dados = [
+            ('Toyota', 'Corolla', '2019/2020', '90000.00', 30000, 'Preto'),
+            ('Toyota', 'Corolla', '2021', '110000.00', 10000, 'Branco'),
+            ('Toyota', 'Yaris', '2018', '70000.00', 50000, 'Preto'),
+            ('Honda', 'Civic', '2020/2021', '95000.00', 20000, 'Prata'),
+            ('Honda', 'Fit', '2016', '55000.00', 80000, 'Preto'),
+        ]
+        for marca, modelo, ano, preco, km, cor in dados:
+            Carro.objects.create(marca=marca, modelo=modelo, ano=ano, preco=Decimal(preco), km=km, cor=cor)
+
+    def test_filtros_combinados(self):
+        '''
+        Verifica que os filtros de marca, ano, preço, km e cor são aplicados em conjunto.
+        '''
+        carros, _ = buscar_carros({'marca': 'Toyota', 'cor': 'Preto', 'km_max': 40000})
+        self.assertEqual([c.modelo for c in carros], ['Corolla'])
+
+    def test_intervalo_de_ano(self):
+        '''
+        Verifica que anos no formato "2019/2020" entram no intervalo pelo ano de fabricação.
+        '''
+        carros, _ = buscar_carros({'ano_min': 2019, 'ano_max': 2020}, ordem='preco')
+        self.assertEqual([c.ano for c in carros], ['2019/2020', '2020/2021'])
+
+    def test_paginacao_por_cursor_percorre_tudo(self):
+        '''
+        Verifica que seguir os cursores visita todos os carros, sem repetição, na ordem pedida.
+        '''
+        vistos, cursor = [], None
+        while True:
+            carros, cursor = buscar_carros({}, ordem='-preco', cursor=cursor, limite=2)
+            vistos.extend(c.preco for c in carros)
+            if cursor is None:
+                break
+        self.assertEqual(vistos, sorted(Carro.objects.values_list('preco', flat=True), reverse=True))
+
+    def test_cursor_invalido(self):
+        '''
+        Verifica que um cursor corrompido levanta CursorInvalido.
+        '''
+        with self.assertRaises(CursorInvalido):
+            decodificar_cursor('nao-e-um-cursor', ('preco', 'id'))
+
+    def test_endpoint(self):
+        '''
+        Verifica a resposta JSON do endpoint e a validação dos parâmetros.
+        '''
+        resposta = self.client.get(reverse('app:busca_carros'), {'marca': 'Honda', 'limite': 1, 'ordem': 'preco'})
+        self.assertEqual(resposta.status_code, 200)
+        corpo = resposta.json()
+        self.assertEqual(corpo['resultados'][0]['modelo'], 'Fit')
+        self.assertIsNotNone(corpo['proximo_cursor'])
+
+        resposta = self.client.get(reverse('app:busca_carros'), {'ano_min': 'abc'})
+        self.assertEqual(resposta.status_code, 400)
+
+    async def test_inventario_assincrono(self):
+        '''
+        Verifica que o endpoint assíncrono devolve a página, o total filtrado e as facetas.
+        '''
+        resposta = await self.async_client.get(reverse('app:inventario_carros'), {'marca': 'Toyota', 'limite': 2})
+        self.assertEqual(resposta.status_code, 200)
+        corpo = resposta.json()
+        self.assertEqual(len(corpo['resultados']), 2)
+        self.assertEqual(corpo['total'], 3)
+        self.assertIsNotNone(corpo['proximo_cursor'])
+        self.assertIn('marca', corpo['facetas'])
+
+        resposta = await self.async_client.get(reverse('app:inventario_carros'), {'cursor': 'invalido'})
+        self.assertEqual(resposta.status_code, 400)
+
+
+class BuscaTextualTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria carros com opcionais e descrições distintos para a busca textual.
+        '''
+        self.teto = Carro.objects.create(
+            marca='Jeep', modelo='Compass', ano='2022', preco=Decimal('150000.00'), km=5000, cor='Cinza',
+            opcionais='Teto solar panorâmico, câmbio automático', descricao='Teto solar automático e bancos de couro.',
+        )
+        self.couro = Carro.objects.create(
+            marca='Fiat', modelo='Toro', ano='2021', preco=Decimal('120000.00'), km=15000, cor='Branco',
+            opcionais='Bancos de couro', descricao='Câmbio automático, sem teto solar.',
+        )
+        Carro.objects.create(
+            marca='Fiat', modelo='Mobi', ano='2020', preco=Decimal('50000.00'), km=30000, cor='Vermelho',
+            opcionais='Ar condicionado', descricao='Econômico.',
+        )
+
+    def test_busca_ignora_acentos_e_exige_todas_as_palavras(self):
+        '''
+        Verifica que "teto solar automatico" encontra os carros com as três palavras, mesmo sem acento.
+        '''
+        carros, _ = buscar_carros({'q': 'teto solar automatico'}, ordem='relevancia')
+        self.assertEqual({c.id for c in carros}, {self.teto.id, self.couro.id})
+        self.assertEqual(carros[0], self.teto)
+
+    def test_indice_acompanha_edicoes(self):
+        '''
+        Verifica que o índice textual é atualizado quando o carro é editado ou removido.
+        '''
+        self.couro.opcionais = 'Kit multimídia'
+        self.couro.descricao = 'Revisado.'
+        self.couro.save()
+        self.assertEqual(buscar_carros({'q': 'couro'})[0], [self.teto])
+        self.assertEqual(buscar_carros({'q': 'multimidia'})[0], [self.couro])
+        self.couro.delete()
+        self.assertFalse(buscar_carros({'q': 'multimidia'})[0])
+
+    @skipUnless(connection.vendor == 'sqlite', 'Triggers FTS5 do SQLite.')
+    def test_post_migrate_recria_os_triggers(self):
+        '''
+        Verifica que o fim do migrate recria os triggers descartados por uma reconstrução de app_carro.
+        '''
+        with connection.cursor() as cursor:
+            for sufixo in ['ai', 'ad', 'au']:
+                cursor.execute(f'DROP TRIGGER {TABELA_FTS}_{sufixo}')
+        Carro.objects.create(marca='Fiat', modelo='Uno', ano='2010', preco=Decimal('20000.00'), km=150000,
+                             cor='Azul', opcionais='Trava elétrica', descricao='')
+        self.assertFalse(buscar_carros({'q': 'trava'})[0])
+        emit_post_migrate_signal(verbosity=0, interactive=False, db=connection.alias)
+        self.assertEqual([c.modelo for c in buscar_carros({'q': 'eletrica'})[0]], ['Uno'])
+
+    def test_banco_sem_busca_textual(self):
+        '''
+        Verifica que bancos sem índice textual levantam NotSupportedError com uma mensagem clara.
+        '''
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaisesMessage(NotSupportedError, 'mysql'):
+                buscar_carros({'q': 'couro'})
+
+    def test_paginacao_por_relevancia(self):
+        '''
+        Verifica que o cursor funciona com a ordenação por relevância.
+        '''
+        primeira, cursor = buscar_carros({'q': 'automatico'}, ordem='relevancia', limite=1)
+        segunda, fim = buscar_carros({'q': 'automatico'}, ordem='relevancia', cursor=cursor, limite=1)
+        self.assertEqual({primeira[0].id, segunda[0].id}, {self.teto.id, self.couro.id})
+        self.assertIsNone(fim)
+
+    def test_relevancia_exige_q(self):
+        '''
+        Verifica que o endpoint recusa a ordenação por relevância sem texto de busca.
+        '''
+        resposta = self.client.get(reverse('app:busca_carros'), {'ordem': 'relevancia'})
+        self.assertEqual(resposta.status_code, 400)
+        resposta = self.client.get(reverse('app:busca_carros'), {'q': 'couro'})
+        self.assertEqual(len(resposta.json()['resultados']), 2)
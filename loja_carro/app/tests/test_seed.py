@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..benchmark import comparar, executar_suite
+from ..bulk import inserir_herdados
+from ..callerid import identificar
+from ..models import Carro, Cliente, DiretorioTelefone, Endereco, FacetaCarro, Loja_Unidade, Vendedor, VendedorResumo
+from ..seed import gerar_dados
+
+
+class InserirHerdadosTest(TestCase):
+
+    def test_insere_pai_e_filho(self):
+        '''
+        Verifica que vendedores inseridos em lote ficam com as linhas de User e de Vendedor.
+        '''
+        endereco = Endereco.objects.create(rua='Rua A', cidade='Florianópolis', estado='SC', numero='1')
+        loja = Loja_Unidade.objects.create(nome='Loja', telefone='+554833330000', endereco_fk=endereco)
+        vendedores = [
+            Vendedor(username=f'v{i}', telefone=f'+55489999900{i:02d}', loja_fk=loja) for i in range(5)
+        ]
+        with self.assertNumQueries(2):
+            inserir_herdados(Vendedor, vendedores, batch_size=10)
+        self.assertEqual(Vendedor.objects.get(username='v3').pk, vendedores[3].pk)
+        self.assertEqual(Vendedor.objects.filter(loja_fk=loja).count(), 5)
+
+
+class SeedScaleTest(TestCase):
+
+    def test_gera_volumes_e_resumos(self):
+        '''
+        Verifica as quantidades geradas e que as tabelas de resumo acompanham os dados.
+        '''
+        criados = gerar_dados(lojas=3, vendedores_por_loja=2, clientes=20, carros=150, tamanho_lote=40)
+        self.assertEqual(criados, {'enderecos': 3, 'lojas': 3, 'vendedores': 6, 'clientes': 20, 'carros': 150})
+        self.assertEqual((Carro.objects.count(), Cliente.objects.count()), (150, 20))
+        self.assertEqual(VendedorResumo.objects.count(), 6)
+        self.assertEqual(DiretorioTelefone.objects.count(), 29)
+        self.assertEqual(sum(FacetaCarro.objects.filter(dimensao='marca').values_list('total', flat=True)), 150)
+        self.assertFalse(Carro.objects.filter(ano_fabricacao__isnull=True).exists())
+        cliente = Cliente.objects.first()
+        self.assertEqual(identificar(str(cliente.telefone))[0]['objeto_id'], cliente.pk)
+
+    def test_semente_deterministica(self):
+        '''
+        Verifica que a mesma semente gera os mesmos carros e que uma nova geração não colide.
+        '''
+        campos = ('marca', 'modelo', 'ano', 'preco', 'km', 'cor', 'opcionais')
+        gerar_dados(lojas=1, vendedores_por_loja=1, clientes=2, carros=30, semente=7)
+        primeira = list(Carro.objects.order_by('pk').values_list(*campos))
+        Carro.objects.all().delete()
+        gerar_dados(lojas=1, vendedores_por_loja=1, clientes=2, carros=30, semente=7)
+        self.assertEqual(list(Carro.objects.order_by('pk').values_list(*campos)), primeira)
+        self.assertEqual(Vendedor.objects.count(), 2)
+
+    def test_suite_de_benchmark(self):
+        '''
+        Verifica que a suíte mede todas as consultas, não deixa dados e aponta regressões.
+        '''
+        call_command('seed_scale', lojas=2, vendedores_por_loja=2, clientes=10, carros=60, stdout=StringIO())
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as arquivo:
+            saida = arquivo.name
+        try:
+            call_command('benchmark_suite', repeticoes=1, saida=saida, stderr=StringIO())
+            with open(saida, encoding='utf-8') as arquivo:
+                relatorio = json.load(arquivo)
+        finally:
+            os.remove(saida)
+        self.assertEqual(relatorio['linhas']['carros'], 60)
+        self.assertIn('admin_carros', relatorio['resultados'])
+        self.assertEqual(relatorio['resultados']['busca_marca_preco']['consultas'], 1)
+        self.assertFalse(User.objects.filter(username='benchmark-suite').exists())
+
+        atual = executar_suite(repeticoes=1, incluir_admin=False)
+        anterior = json.loads(json.dumps(atual))
+        anterior['resultados']['facetas']['consultas'] -= 1
+        self.assertEqual([r[0] for r in comparar(anterior, atual)], ['facetas'])
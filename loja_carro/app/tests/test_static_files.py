@@ -0,0 +1,126 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..static_files import ArquivosEstaticosMiddleware, aceita_gzip
+
+CSS = 'body { color: #333; }\n' * 200
+
+
+class ArquivosEstaticosTest(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        '''
+        Coleta um CSS e uma imagem em um STATIC_ROOT temporário.
+        '''
+        super().setUpClass()
+        cls.origem = tempfile.mkdtemp()
+        cls.destino = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.origem, 'img'))
+        with open(os.path.join(cls.origem, 'site.css'), 'w') as arquivo:
+            arquivo.write(CSS)
+        with open(os.path.join(cls.origem, 'img', 'foto.jpeg'), 'wb') as arquivo:
+            arquivo.write(b'\xff\xd8' + b'\x00' * 4000)
+        cls.configuracao = override_settings(STATICFILES_DIRS=[cls.origem], STATIC_ROOT=cls.destino)
+        cls.configuracao.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.css = staticfiles_storage.stored_name('site.css')
+        cls.jpeg = staticfiles_storage.stored_name('img/foto.jpeg')
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.configuracao.disable()
+        shutil.rmtree(cls.origem, ignore_errors=True)
+        shutil.rmtree(cls.destino, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.middleware = ArquivosEstaticosMiddleware(lambda request: HttpResponse('view'))
+        self.factory = RequestFactory()
+
+    def test_collectstatic_grava_nomes_com_hash_e_gzip(self):
+        '''
+        Testa se o CSS ganha hash no nome e uma variante .gz, e a imagem não é recomprimida.
+        '''
+        self.assertRegex(self.css, r'^site\.[0-9a-f]{12}\.css$')
+        with gzip.open(os.path.join(self.destino, self.css + '.gz'), 'rt') as arquivo:
+            self.assertEqual(arquivo.read(), CSS)
+        self.assertNotEqual(self.jpeg, 'img/foto.jpeg')
+        self.assertFalse(os.path.exists(os.path.join(self.destino, self.jpeg + '.gz')))
+
+    def test_serve_gzip_com_cache_imutavel(self):
+        '''
+        Testa se o cliente que aceita gzip recebe a variante comprimida com cache imutável.
+        '''
+        resposta = self.middleware(self.factory.get('/static/' + self.css, HTTP_ACCEPT_ENCODING='gzip, br'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Encoding'], 'gzip')
+        self.assertEqual(resposta['Vary'], 'Accept-Encoding')
+        self.assertEqual(resposta['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(gzip.decompress(b''.join(resposta.streaming_content)).decode(), CSS)
+
+    def test_serve_original_sem_accept_encoding(self):
+        '''
+        Testa se sem Accept-Encoding (ou com gzip;q=0) o arquivo vai sem compressão.
+        '''
+        for cabecalhos in ({}, {'HTTP_ACCEPT_ENCODING': 'gzip;q=0, br'}):
+            resposta = self.middleware(self.factory.get('/static/' + self.css, **cabecalhos))
+            self.assertFalse(resposta.has_header('Content-Encoding'))
+            self.assertEqual(b''.join(resposta.streaming_content).decode(), CSS)
+
+    def test_nome_sem_hash_tem_cache_curto(self):
+        '''
+        Testa se o nome original, que muda de conteúdo a cada deploy, não é marcado como imutável.
+        '''
+        resposta = self.middleware(self.factory.get('/static/site.css'))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn('immutable', resposta['Cache-Control'])
+
+    def test_if_none_match_responde_304(self):
+        '''
+        Testa se a revalidação com o ETag recebido responde 304.
+        '''
+        caminho = '/static/' + self.jpeg
+        etag = self.middleware(self.factory.get(caminho))['ETag']
+        resposta = self.middleware(self.factory.get(caminho, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_caminho_desconhecido_segue_para_a_view(self):
+        '''
+        Testa se arquivos fora do STATIC_ROOT e métodos de escrita passam adiante.
+        '''
+        self.assertEqual(self.middleware(self.factory.get('/static/nao-existe.css')).content, b'view')
+        self.assertEqual(self.middleware(self.factory.get('/static/../settings.py')).content, b'view')
+        self.assertEqual(self.middleware(self.factory.post('/static/' + self.css)).content, b'view')
+
+    async def test_middleware_assincrono(self):
+        '''
+        Testa se sob ASGI o middleware serve os arquivos e repassa as demais requisições sem bloquear.
+        '''
+        async def view(request):
+            return HttpResponse('view')
+
+        middleware = ArquivosEstaticosMiddleware(view)
+        resposta = await middleware(self.factory.get('/static/' + self.css))
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual((await middleware(self.factory.get('/static/nao-existe.css'))).content, b'view')
+        self.assertEqual((await middleware(self.factory.get('/carros/'))).content, b'view')
+
+    def test_aceita_gzip(self):
+        '''
+        Testa a leitura do cabeçalho Accept-Encoding.
+        '''
+        self.assertTrue(aceita_gzip('gzip, deflate, br'))
+        self.assertTrue(aceita_gzip('br;q=1.0, gzip;q=0.8'))
+        self.assertFalse(aceita_gzip('gzip;q=0'))
+        self.assertFalse(aceita_gzip('br, x-gzip2'))
+        self.assertFalse(aceita_gzip(''))
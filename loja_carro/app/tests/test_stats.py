@@ -0,0 +1,97 @@
+import random
+import statistics
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from ..models import Carro, EstatisticaCarro, FaixaEstatisticaCarro
+from ..stats import LIMITES_PRECO, consultar_estatisticas, percentil
+
+
+class EstatisticaCarroTest(TestCase):
+
+    def setUp(self):
+        '''
+        Cria carros de dois modelos e anos com preços e km conhecidos.
+        '''
+        self.carros = []
+        for i, (modelo, ano) in enumerate([('Corolla', '2019/2020')] * 4 + [('Yaris', '2020')] * 2):
+            self.carros.append(Carro.objects.create(
+                marca='Toyota', modelo=modelo, ano=ano, preco=Decimal(80000 + i * 10000), km=10000 * (i + 1), cor='Preto',
+            ))
+
+    def test_percentil_de_histograma(self):
+        '''
+        Verifica que o percentil estimado fica dentro da largura de uma faixa do valor real.
+        '''
+        gerador = random.Random(42)
+        precos = [gerador.uniform(20000, 200000) for _ in range(5000)]
+        contagens = [0] * (len(LIMITES_PRECO) - 1)
+        for preco in precos:
+            contagens[max(i for i, limite in enumerate(LIMITES_PRECO[:-1]) if limite <= preco)] += 1
+        mediana = statistics.median(precos)
+        self.assertAlmostEqual(percentil(contagens, LIMITES_PRECO, 50) / mediana, 1, delta=0.08)
+        self.assertIsNone(percentil([0, 0], [0, 1, 2], 50))
+
+    def test_agregados_por_grupo_e_mesclados(self):
+        '''
+        Verifica médias por modelo e ano e a mesclagem de todos os grupos da marca.
+        '''
+        corolla = consultar_estatisticas('Toyota', 'Corolla', 2019)
+        self.assertEqual(corolla['quantidade'], 4)
+        self.assertEqual(corolla['preco_medio'], '95000.00')
+        self.assertEqual(corolla['km_medio'], 25000)
+        marca = consultar_estatisticas('Toyota')
+        self.assertEqual(marca['quantidade'], 6)
+        self.assertLessEqual(marca['preco_percentis']['p25'], marca['preco_percentis']['p75'])
+        self.assertIsNone(consultar_estatisticas('Fiat'))
+
+    def test_alteracao_e_exclusao(self):
+        '''
+        Verifica que editar preço ou modelo e excluir carros atualizam os grupos.
+        '''
+        carro = self.carros[0]
+        carro.modelo = 'Yaris'
+        carro.ano = '2020'
+        carro.save()
+        self.assertEqual(consultar_estatisticas('Toyota', 'Corolla')['quantidade'], 3)
+        self.assertEqual(consultar_estatisticas('Toyota', 'Yaris')['quantidade'], 3)
+        for carro in self.carros[1:4]:
+            carro.delete()
+        self.assertFalse(EstatisticaCarro.objects.filter(modelo='Corolla').exists())
+        self.assertFalse(FaixaEstatisticaCarro.objects.filter(modelo='Corolla').exists())
+
+    def test_endpoint(self):
+        '''
+        Verifica o endpoint de estatísticas e a validação dos parâmetros.
+        '''
+        url = reverse('app:estatisticas_carros')
+        self.assertEqual(self.client.get(url, {'marca': 'Toyota', 'modelo': 'Yaris'}).json()['quantidade'], 2)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'marca': 'Fiat'}).status_code, 404)
+
+
+class ReconstrucaoEstatisticaTest(TransactionTestCase):
+
+    def tabelas(self):
+        grupos = EstatisticaCarro.objects.values_list('marca', 'modelo', 'ano', 'quantidade', 'soma_preco', 'soma_km')
+        faixas = FaixaEstatisticaCarro.objects.filter(quantidade__gt=0) \
+            .values_list('marca', 'modelo', 'ano', 'dimensao', 'faixa', 'quantidade')
+        return sorted(grupos), sorted(faixas)
+
+    def test_reconstrucao_paralela(self):
+        '''
+        Verifica que a reconstrução em intervalos paralelos reproduz os agregados incrementais.
+        '''
+        for i in range(30):
+            Carro.objects.create(marca='Fiat', modelo=['Uno', 'Mobi'][i % 2], ano=str(2010 + i % 3),
+                                 preco=Decimal(20000 + i * 1000), km=1000 * i, cor='Branco')
+        incremental = self.tabelas()
+        EstatisticaCarro.objects.all().delete()
+        FaixaEstatisticaCarro.objects.all().delete()
+        call_command('rebuild_stats', workers=3, tamanho_chunk=7, stdout=StringIO())
+        self.assertEqual(EstatisticaCarro.objects.count(), 6)
+        self.assertEqual(self.tabelas(), incremental)
@@ -0,0 +1,23 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'app'
+
+urlpatterns = [
+    path('carros/', views.busca_carros, name='busca_carros'),
+    path('carros/inventario/', views.inventario_carros, name='inventario_carros'),
+    path('carros/<int:pk>/', views.detalhe_carro, name='detalhe_carro'),
+    path('carros/facetas/', views.facetas_carros, name='facetas_carros'),
+    path('carros/estatisticas/', views.estatisticas_carros, name='estatisticas_carros'),
+    path('carros/reducoes/', views.reducoes_preco, name='reducoes_preco'),
+    path('lojas/', views.lista_lojas, name='lista_lojas'),
+    path('lojas/proximas/', views.lojas_proximas, name='lojas_proximas'),
+    path('vendedores/', views.busca_vendedores, name='busca_vendedores'),
+    path('painel/', views.painel_lojas, name='painel_lojas'),
+    path('vendas/ranking/', views.ranking_vendas, name='ranking_vendas'),
+    path('tarefas/metricas/', views.metricas_tarefas, name='metricas_tarefas'),
+    path('telefones/identificar/', views.identificar_telefone, name='identificar_telefone'),
+    path('exportar/<str:nome>/', views.exportar, name='exportar'),
+    path('convites/<str:uidb64>/<str:token>/', views.ativar_conta, name='ativar_conta'),
+]
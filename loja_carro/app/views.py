@@ -1,3 +1,373 @@
-from django.shortcuts import render
+import asyncio
+import datetime
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.forms import SetPasswordForm
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_http_methods
+from django.views.static import serve
+
+from . import callerid, export, jobs, photos, price_history, sales
+from .carro_cache import aobter_carro
+from .conditional import condicional, validador_carros, validador_lojas
+from .facets import obter_facetas
+from .models import Carro, Loja_Unidade, Vendedor, VendedorResumo
+from .forms import BuscaCarroForm
+from .onboarding import gerador_convite
+from .search import LIMITE_PADRAO, CursorInvalido, buscar_carros, consulta_pagina, filtrar_carros, paginar
+from .serializers import serializar_carro
+from .stats import consultar_estatisticas
+
+
+@require_GET
+@condicional(validador_carros)
+def busca_carros(request):
+    """
+    Endpoint público de busca do inventário com paginação por cursor.
+    Responde 304 a If-None-Match/If-Modified-Since enquanto o estoque não muda.
+    """
+    form = BuscaCarroForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'erros': form.errors}, status=400)
+    dados = form.cleaned_data
+    try:
+        carros, proximo_cursor = buscar_carros(
+            dados, ordem=dados['ordem'], cursor=dados['cursor'], limite=dados['limite']
+        )
+    except CursorInvalido:
+        return JsonResponse({'erros': {'cursor': ['Cursor inválido.']}}, status=400)
+    capas = photos.capas(carros)
+    return JsonResponse({
+        'resultados': [{**serializar_carro(carro), 'foto': capas.get(carro.pk)} for carro in carros],
+        'proximo_cursor': proximo_cursor,
+    })
+
+
+@require_GET
+@condicional(validador_carros)
+async def inventario_carros(request):
+    """
+    Busca do inventário com o total de resultados e as facetas, para a página
+    de listagem. Aceita os mesmos parâmetros de busca_carros.
+
+    As três consultas são independentes e rodam concorrentemente com o ORM
+    assíncrono; servida por ASGI, a view não ocupa uma thread enquanto espera.
+    """
+    form = BuscaCarroForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'erros': form.errors}, status=400)
+    dados = form.cleaned_data
+    try:
+        consulta, ordenacao, limite = consulta_pagina(
+            dados, ordem=dados['ordem'], cursor=dados['cursor'], limite=dados['limite']
+        )
+    except CursorInvalido:
+        return JsonResponse({'erros': {'cursor': ['Cursor inválido.']}}, status=400)
+
+    async def pagina():
+        return paginar([carro async for carro in consulta.aiterator()], ordenacao, limite)
+
+    (carros, proximo_cursor), total, facetas = await asyncio.gather(
+        pagina(),
+        filtrar_carros(Carro.objects.disponiveis(), dados).acount(),
+        sync_to_async(obter_facetas)(),
+    )
+    capas = await sync_to_async(photos.capas)(carros)
+    return JsonResponse({
+        'resultados': [{**serializar_carro(carro), 'foto': capas.get(carro.pk)} for carro in carros],
+        'proximo_cursor': proximo_cursor,
+        'total': total,
+        'facetas': facetas,
+    })
+
+
+@require_GET
+async def detalhe_carro(request, pk):
+    """
+    Detalhe de um carro, servido pelo cache de dois níveis de app.carro_cache.
+    """
+    dados = await aobter_carro(pk)
+    if dados is None:
+        raise Http404
+    return JsonResponse(dados)
+
+
+@require_GET
+@condicional(validador_carros)
+def facetas_carros(request):
+    """
+    Contagens de carros por marca, cor, ano e faixa de preço.
+    """
+    return JsonResponse(obter_facetas())
+
+
+@require_GET
+@staff_member_required
+def exportar(request, nome):
+    """
+    Exporta carros ou clientes em CSV ou JSON Lines como resposta em streaming.
+
+    Parâmetros GET: formato ('csv' ou 'jsonl') e gzip=1 para comprimir. Sob
+    ASGI a resposta recebe um iterador assíncrono, que o Django transmite aos
+    poucos; um iterador síncrono seria lido inteiro para a memória.
+    """
+    if nome not in export.EXPORTACOES:
+        raise Http404
+    formato = request.GET.get('formato', 'csv')
+    if formato not in export.FORMATOS:
+        return JsonResponse({'erros': {'formato': ['Formato inválido.']}}, status=400)
+    assincrono = isinstance(request, ASGIRequest)
+    partes = (export.agerar if assincrono else export.gerar)(nome, formato)
+    arquivo = f'{nome}.{formato}'
+    tipo = 'text/csv' if formato == 'csv' else 'application/x-ndjson'
+    if request.GET.get('gzip') == '1':
+        partes = (export.acomprimir_gzip if assincrono else export.comprimir_gzip)(partes)
+        arquivo += '.gz'
+        tipo = 'application/gzip'
+    resposta = StreamingHttpResponse(partes, content_type=tipo)
+    resposta['Content-Disposition'] = f'attachment; filename="{arquivo}"'
+    return resposta
+
+
+@require_GET
+def estatisticas_carros(request):
+    """
+    Média e percentis de preço e km por marca, com modelo e ano opcionais.
+    """
+    marca = request.GET.get('marca')
+    if not marca:
+        return JsonResponse({'erros': {'marca': ['Este campo é obrigatório.']}}, status=400)
+    ano = request.GET.get('ano')
+    if ano is not None and not ano.isdigit():
+        return JsonResponse({'erros': {'ano': ['Informe um número inteiro.']}}, status=400)
+    resumo = consultar_estatisticas(marca, request.GET.get('modelo'), int(ano) if ano else None)
+    if resumo is None:
+        raise Http404
+    return JsonResponse(resumo)
+
+
+@require_GET
+def reducoes_preco(request):
+    """
+    As reduções de preço mais recentes, paginadas por cursor (?cursor=,
+    ?limite= de 1 a 100).
+    """
+    limite = request.GET.get('limite', '')
+    if limite and not limite.isdigit():
+        return JsonResponse({'erros': {'limite': ['Informe um número inteiro.']}}, status=400)
+    try:
+        reducoes, proximo_cursor = price_history.reducoes_recentes(
+            request.GET.get('cursor'), int(limite) if limite else LIMITE_PADRAO
+        )
+    except CursorInvalido:
+        return JsonResponse({'erros': {'cursor': ['Cursor inválido.']}}, status=400)
+    return JsonResponse({
+        'resultados': [price_history.serializar_reducao(reducao) for reducao in reducoes],
+        'proximo_cursor': proximo_cursor,
+    })
+
+
+@require_GET
+def busca_vendedores(request):
+    """
+    Busca de vendedores por cidade, estado, loja e início do nome, lida de VendedorResumo.
+    """
+    loja = request.GET.get('loja')
+    if loja is not None and not loja.isdigit():
+        return JsonResponse({'erros': {'loja': ['Informe um número inteiro.']}}, status=400)
+    vendedores = VendedorResumo.objects.buscar(
+        cidade=request.GET.get('cidade'),
+        estado=request.GET.get('estado'),
+        loja=int(loja) if loja else None,
+        nome=request.GET.get('nome'),
+    ).values('vendedor_id', 'nome', 'email', 'telefone', 'loja_id', 'loja_nome', 'cidade', 'estado')
+    return JsonResponse({'resultados': list(vendedores[:100])})
+
+
+def _serializar_cliente_painel(cliente) -> dict:
+    return {'id': cliente.pk, 'username': cliente.username, 'nome': cliente.get_full_name()}
+
+
+@require_GET
+@staff_member_required
+def painel_lojas(request):
+    """
+    Painel dos gerentes: para cada loja, seus vendedores com total de clientes,
+    clientes mais recentes e clientes sem avaliação. Aceita ?loja=<id>.
+
+    O número de consultas é fixo (lojas, vendedores e dois pré-carregamentos
+    de clientes), qualquer que seja a quantidade de vendedores.
+    """
+    lojas = Loja_Unidade.objects.order_by('nome').prefetch_related(
+        Prefetch('vendedor_set', queryset=Vendedor.objects.com_painel().order_by('username'))
+    )
+    loja = request.GET.get('loja')
+    if loja is not None:
+        if not loja.isdigit():
+            return JsonResponse({'erros': {'loja': ['Informe um número inteiro.']}}, status=400)
+        lojas = lojas.filter(pk=int(loja))
+    return JsonResponse({'lojas': [
+        {
+            'id': loja.pk,
+            'nome': loja.nome,
+            'vendedores': [
+                {
+                    'id': vendedor.pk,
+                    'username': vendedor.username,
+                    'total_clientes': vendedor.total_clientes,
+                    'total_sem_avaliacao': vendedor.total_sem_avaliacao,
+                    'clientes_recentes': [_serializar_cliente_painel(c) for c in vendedor.clientes_recentes],
+                    'clientes_sem_avaliacao': [_serializar_cliente_painel(c) for c in vendedor.clientes_sem_avaliacao],
+                }
+                for vendedor in loja.vendedor_set.all()
+            ],
+        }
+        for loja in lojas
+    ]})
+
+
+@require_GET
+@staff_member_required
+def ranking_vendas(request):
+    """
+    Ranking mensal de vendedores e lojas por receita, com quantidade de
+    vendas e desconto médio. Aceita ?mes=AAAA-MM (padrão: o mês atual) e
+    ?loja=<id>. Lê apenas as linhas do mês na tabela de resumo VendaMensal.
+    """
+    mes = request.GET.get('mes')
+    try:
+        mes = datetime.datetime.strptime(mes, '%Y-%m').date() if mes else timezone.localdate().replace(day=1)
+    except ValueError:
+        return JsonResponse({'erros': {'mes': ['Informe o mês no formato AAAA-MM.']}}, status=400)
+    loja = request.GET.get('loja')
+    if loja is not None and not loja.isdigit():
+        return JsonResponse({'erros': {'loja': ['Informe um número inteiro.']}}, status=400)
+    ranking = sales.ranking_mensal(mes, loja=int(loja) if loja is not None else None)
+    return JsonResponse({'mes': f'{mes:%Y-%m}', **ranking})
+
+
+@require_GET
+@staff_member_required
+def metricas_tarefas(request):
+    """
+    Profundidade e vazão da fila de tarefas em segundo plano (app.jobs).
+    Aceita ?janela=<segundos> para a vazão (padrão: 60).
+    """
+    janela = request.GET.get('janela', '60')
+    if not janela.isdigit() or not 1 <= int(janela) <= 86400:
+        return JsonResponse({'erros': {'janela': ['Informe de 1 a 86400 segundos.']}}, status=400)
+    return JsonResponse(jobs.metricas(janela=int(janela)))
+
+
+@require_GET
+@condicional(validador_lojas)
+def lista_lojas(request):
+    """
+    Todas as lojas com endereço e coordenadas, para o catálogo de unidades.
+    Responde 304 a If-None-Match/If-Modified-Since enquanto lojas e endereços não mudam.
+    """
+    lojas = Loja_Unidade.objects.select_related('endereco_fk').order_by('nome', 'pk')
+    return JsonResponse({'resultados': [
+        {
+            'id': loja.pk,
+            'nome': loja.nome,
+            'telefone': str(loja.telefone),
+            'instagram': loja.instagram,
+            'facebook': loja.facebook,
+            'endereco': {
+                'rua': loja.endereco_fk.rua,
+                'numero': loja.endereco_fk.numero,
+                'cidade': loja.endereco_fk.cidade,
+                'estado': loja.endereco_fk.estado,
+                'cep': loja.endereco_fk.cep,
+                'latitude': loja.endereco_fk.latitude,
+                'longitude': loja.endereco_fk.longitude,
+            },
+        }
+        for loja in lojas
+    ]})
+
+
+@require_GET
+@condicional(validador_lojas)
+def lojas_proximas(request):
+    """
+    As k lojas mais próximas de um ponto (?lat=&lon=&k=), com a distância em km.
+    """
+    try:
+        lat = float(request.GET['lat'])
+        lon = float(request.GET['lon'])
+        k = int(request.GET.get('k', 5))
+    except (KeyError, ValueError):
+        return JsonResponse({'erros': {'__all__': ['Informe lat e lon numéricos e k inteiro.']}}, status=400)
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180 and 1 <= k <= 50):
+        return JsonResponse({'erros': {'__all__': ['Coordenadas ou k fora do intervalo.']}}, status=400)
+    return JsonResponse({'resultados': [
+        {
+            'id': loja.pk,
+            'nome': loja.nome,
+            'cidade': loja.endereco_fk.cidade,
+            'estado': loja.endereco_fk.estado,
+            'distancia_km': round(loja.distancia_km, 2),
+        }
+        for loja in Loja_Unidade.objects.nearest(lat, lon, k)
+    ]})
+
+
+@require_GET
+@staff_member_required
+def identificar_telefone(request):
+    """
+    Identifica quem está ligando: clientes, vendedores e lojas com o telefone
+    informado em ?numero=, em qualquer formato. Aceita até 100 números
+    repetindo o parâmetro.
+    """
+    numeros = request.GET.getlist('numero')
+    if not numeros or len(numeros) > 100:
+        return JsonResponse({'erros': {'numero': ['Informe de 1 a 100 números.']}}, status=400)
+    identificados = callerid.identificar_lote(numeros)
+    return JsonResponse({'resultados': [{'numero': numero, **identificados[numero]} for numero in numeros]})
+
+
+def servir_midia(request, caminho):
+    """
+    Serve MEDIA_ROOT quando SERVIR_MIDIA está ativo. As fotos têm nomes
+    derivados do conteúdo e recebem cabeçalhos de cache permanente.
+    """
+    resposta = serve(request, caminho, document_root=settings.MEDIA_ROOT)
+    if caminho.startswith('fotos/'):
+        resposta['Cache-Control'] = photos.CACHE_CONTROL
+    return resposta
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def ativar_conta(request, uidb64, token):
+    """
+    Primeiro acesso de uma conta criada pelo cadastro em lote. GET informa se
+    o convite é válido; POST com new_password1 e new_password2 define a senha,
+    o que invalida o convite. O token do link é a credencial, por isso a view
+    dispensa o CSRF.
+    """
+    try:
+        usuario = User.objects.get(pk=force_str(urlsafe_base64_decode(uidb64)))
+    except (ValueError, OverflowError, User.DoesNotExist):
+        usuario = None
+    if usuario is None or not gerador_convite.check_token(usuario, token):
+        return JsonResponse({'erros': {'token': ['Convite inválido ou expirado.']}}, status=400)
+    if request.method == 'GET':
+        return JsonResponse({'username': usuario.username, 'email': usuario.email})
+    form = SetPasswordForm(usuario, request.POST)
+    if not form.is_valid():
+        return JsonResponse({'erros': form.errors}, status=400)
+    form.save()
+    return JsonResponse({'username': usuario.username, 'ativada': True})
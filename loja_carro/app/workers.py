@@ -0,0 +1,19 @@
+"""
+Funções executadas nos pools de app.jobs. O módulo não importa modelos,
+então pode ser carregado por um processo novo antes de django.setup().
+"""
+import django
+from django.db import close_old_connections
+
+
+def iniciar_processo():
+    django.setup()
+
+
+def executar_tarefa(pk: int, reserva: str):
+    from .jobs import executar
+
+    try:
+        return executar(pk, reserva)
+    finally:
+        close_old_connections()
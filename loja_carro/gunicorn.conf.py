@@ -0,0 +1,27 @@
+"""
+Gunicorn configuration for both serving paths of the project.
+
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py   # uvicorn workers, loja_carro.asgi
+    SERVER_MODE=wsgi gunicorn -c gunicorn.conf.py   # threaded workers, loja_carro.wsgi
+
+Compare them with, for example:
+
+    python manage.py benchmark_http --servidor asgi=http://127.0.0.1:8000 --servidor wsgi=http://127.0.0.1:8001
+"""
+
+import multiprocessing
+import os
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'asgi')
+
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('WORKER_TIMEOUT', 30))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'loja_carro.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'loja_carro.wsgi:application'
+    worker_class = 'gthread'
+    threads = int(os.environ.get('THREADS', 8))
@@ -15,6 +15,8 @@ import os
 import secrets
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 env = environ.Env(
     # set casting, default value
     DEBUG=(bool, False)
@@ -30,15 +32,19 @@ environ.Env.read_env(os.path.join(BASE_DIR, '.env'))
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
 
-# SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.environ.get(
-    "DJANGO_SECRET_KEY",
-    default=secrets.token_urlsafe(nbytes=64),
-)
-
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = env('DEBUG')
 
+# SECURITY WARNING: keep the secret key used in production secret!
+# Uma chave sorteada por processo invalidaria entre processos as sessões e os
+# tokens assinados (como os convites do onboard_users), então fora do DEBUG a
+# chave é obrigatória.
+SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY")
+if not SECRET_KEY:
+    if not DEBUG:
+        raise ImproperlyConfigured('Defina DJANGO_SECRET_KEY (ou DEBUG=True em desenvolvimento).')
+    SECRET_KEY = secrets.token_urlsafe(nbytes=64)
+
 ALLOWED_HOSTS = ['*']
 
 
@@ -93,6 +99,50 @@ DATABASES = {
     'default': env.db()
 }
 
+# Optional read replicas, e.g.
+# DATABASE_REPLICA_URLS=sqlite:////tmp/replica.sqlite3,postgres://...
+# Reads of the catalog models go to a replica unless the client wrote
+# recently (see app.routers).
+for indice, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    DATABASES[f'replica{indice}'] = {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+
+REPLICA_FIXACAO_SEGUNDOS = env.int('REPLICA_PIN_SECONDS', default=5)
+
+# Cache, e.g. CACHE_URL=rediscache://127.0.0.1:6379/1. The car detail cache
+# (app.carro_cache) is only consistent across processes with a shared backend;
+# the default local-memory cache is per process.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+if len(DATABASES) > 1:
+    DATABASE_ROUTERS = ['app.routers.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware') + 1,
+        'app.routers.ReplicaStickinessMiddleware',
+    )
+
+# Per-request SQL instrumentation (app.instrumentation): query count, DB time,
+# slowest statements and probable N+1 shapes, as Server-Timing headers and
+# JSON lines on the 'app.sql' logger. Sample a fraction of requests in production.
+SQL_INSTRUMENTACAO = env.bool('SQL_INSTRUMENTATION', default=False)
+SQL_INSTRUMENTACAO_AMOSTRAGEM = env.float('SQL_INSTRUMENTATION_SAMPLE_RATE', default=1.0)
+SQL_INSTRUMENTACAO_REPETICOES = env.int('SQL_INSTRUMENTATION_REPEAT_THRESHOLD', default=5)
+
+if SQL_INSTRUMENTACAO:
+    MIDDLEWARE.insert(0, 'app.instrumentation.SQLInstrumentationMiddleware')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'app.sql': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -112,6 +162,9 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# How long first-login invitations for bulk-onboarded accounts stay valid (app.onboarding).
+CONVITE_VALIDADE_DIAS = env.int('INVITE_DAYS', default=30)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.0/topics/i18n/
@@ -136,6 +189,58 @@ STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "app/static/app"),
 ]
 
+# Serve the collected STATIC_ROOT from the app with immutable caching and gzip
+# negotiation (app.static_files). Disable when a web server or CDN serves it.
+SERVIR_ESTATICOS = env.bool('SERVE_STATIC', default=True)
+
+if SERVIR_ESTATICOS:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'app.static_files.ArquivosEstaticosMiddleware',
+    )
+
+MEDIA_ROOT = env('MEDIA_ROOT', default=os.path.join(BASE_DIR, "media"))
+
+MEDIA_URL = 'media/'
+
+# Serve MEDIA_ROOT from Django (with immutable cache headers for photos).
+# In production let the web server or CDN serve it instead.
+SERVIR_MIDIA = env.bool('SERVE_MEDIA', default=DEBUG)
+
+STORAGES = {
+    # Also holds the files queued by `import_carros --em-segundo-plano`; with
+    # workers on several nodes it must be shared storage (S3, NFS, ...).
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Content-hashed names plus precompressed .gz variants (app.storage).
+    'staticfiles': {
+        'BACKEND': 'app.storage.ArmazenamentoEstatico',
+    },
+    # Car photos and their renditions, named by content hash (app.photos).
+    'fotos': {
+        'BACKEND': 'app.storage.ArmazenamentoConteudo',
+        'OPTIONS': {'subdiretorio': 'fotos'},
+    },
+}
+
+# Renditions are generated by the job queue workers (run_workers); set
+# FOTOS_PROCESSAMENTO_SINCRONO to generate them inline after the commit.
+FOTOS_PROCESSAMENTO_SINCRONO = env.bool('PHOTO_PROCESSING_SYNC', default=False)
+
+# Cars sold longer ago than this are moved to CarroArquivado by archive_sold.
+ARQUIVAR_VENDIDOS_DIAS = env.int('ARCHIVE_SOLD_AFTER_DAYS', default=180)
+
+# Background job queue (app.jobs), consumed by `manage.py run_workers` on any
+# number of nodes. Workers renew the visibility timeout of running jobs, so a
+# job is handed to another worker only when its worker stops responding;
+# failed jobs are retried with exponential backoff.
+FILA_WORKERS = env.int('JOB_WORKERS', default=4)
+FILA_VISIBILIDADE_SEGUNDOS = env.int('JOB_VISIBILITY_TIMEOUT', default=300)
+FILA_TENTATIVAS = env.int('JOB_MAX_ATTEMPTS', default=5)
+FILA_BACKOFF_SEGUNDOS = env.int('JOB_BACKOFF_SECONDS', default=10)
+FILA_RETENCAO_DIAS = env.int('JOB_RETENTION_DAYS', default=7)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
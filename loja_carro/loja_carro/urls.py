@@ -14,9 +14,16 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from app.views import servir_midia
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/', include('app.urls')),
 ]
+
+if settings.SERVIR_MIDIA:
+    urlpatterns.append(path(f'{settings.MEDIA_URL}<path:caminho>', servir_midia))